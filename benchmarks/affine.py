@@ -0,0 +1,73 @@
+from __future__ import print_function
+
+import random
+import timeit
+
+import numpy
+
+from expy.expression import Field
+from expy.expressions.math import Scalar, matrix
+from expy.expressions.transform import transform, euler
+from expy.contexts.constant_folding import ConstantFoldingContext
+from expy.contexts.numeric import NumpyContext
+from expy.contexts.python import compile_expression
+
+
+ScalarVar = type(Scalar)("ScalarVar", (Scalar,), {"tag": Field(str)})
+
+
+def _transforms(count):
+    rng = random.Random(0)
+    folding = ConstantFoldingContext()
+    return [
+        folding.get(transform(
+            translation=[rng.random() for _ in range(3)],
+            rotation=euler(*[rng.random() * 90 for _ in range(3)]),
+            scale=[rng.random() + 0.5 for _ in range(3)],
+        ).matrix)
+        for _ in range(count)
+    ]
+
+
+def _matrix(a, b):
+    return matrix(
+        a, 0, b, 0,
+        0, b, a, 0,
+        -b, 0, a, 0,
+        a, 2, b, 1,
+    )
+
+
+def bench_affine(count=5000, samples=100000):
+    matrices = _transforms(count)
+    inverse = min(timeit.repeat(
+        lambda: [ConstantFoldingContext().get(m.inverse()) for m in matrices],
+        number=1, repeat=3,
+    ))
+    product = min(timeit.repeat(
+        lambda: [ConstantFoldingContext().get(m * n) for m, n in zip(matrices, matrices[1:])],
+        number=1, repeat=3,
+    ))
+    a = ScalarVar("a")
+    b = ScalarVar("b")
+    rng = numpy.random.RandomState(0)
+    values = {a: rng.rand(samples) + 0.5, b: rng.rand(samples) + 0.5}
+    expression = _matrix(a, b).inverse()
+    batched = min(timeit.repeat(
+        lambda: NumpyContext(values).get(expression), number=1, repeat=3,
+    ))
+    compiled = compile_expression(expression, {"a": a, "b": b})
+    pairs = list(zip(values[a][:count].tolist(), values[b][:count].tolist()))
+    python = min(timeit.repeat(
+        lambda: [compiled(x, y) for x, y in pairs], number=1, repeat=3,
+    ))
+    print("{} affine matrices (ms)".format(count))
+    print("  folding inverses  {:8.2f}".format(inverse * 1e3))
+    print("  folding products  {:8.2f}".format(product * 1e3))
+    print("  compiled inverses {:8.2f}".format(python * 1e3))
+    print("{} samples (ms)".format(samples))
+    print("  NumpyContext inverse {:8.2f}".format(batched * 1e3))
+
+
+if __name__ == "__main__":
+    bench_affine()
@@ -0,0 +1,28 @@
+from __future__ import print_function
+
+import timeit
+
+import numpy
+
+from expy.expressions.animation import Keyframes
+from expy.contexts.numeric import sample_keyframes
+
+
+def bench_anim_curve(key_count=1000, count=1000000, python_count=20000):
+    rng = numpy.random.RandomState(0)
+    keys = Keyframes(numpy.arange(key_count).tolist(), rng.rand(key_count).tolist())
+    times = numpy.linspace(-10, key_count + 10, count)
+    python_times = times[:python_count].tolist()
+    python = min(timeit.repeat(
+        lambda: [keys.sample(t) for t in python_times], number=1, repeat=3,
+    )) / python_count * count
+    vectorized = min(timeit.repeat(
+        lambda: sample_keyframes(keys, times), number=1, repeat=3,
+    ))
+    print("{} keys, {} samples (s)".format(key_count, count))
+    print("  Keyframes.sample   {:8.3f}  (extrapolated)".format(python))
+    print("  sample_keyframes   {:8.3f}  ({:.0f}x)".format(vectorized, python / vectorized))
+
+
+if __name__ == "__main__":
+    bench_anim_curve()
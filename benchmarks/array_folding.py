@@ -0,0 +1,39 @@
+from __future__ import print_function
+
+import timeit
+
+import numpy
+
+from expy.expressions.math import MatrixConstant, VectorConstant, ScalarConstant
+from expy.expressions.arrays import matrix_array, vector_array, scalar_array
+from expy.contexts.constant_folding import ConstantFoldingContext
+
+
+def bench_array_folding(count=2000):
+    rng = numpy.random.RandomState(1)
+    matrices = [tuple(m) for m in rng.rand(count, 16).tolist()]
+    vectors = [tuple(v) for v in rng.rand(count, 3).tolist()]
+    weights = rng.rand(count).tolist()
+    offset = MatrixConstant(*rng.rand(16).tolist())
+
+    def separate():
+        folding = ConstantFoldingContext()
+        for m, v, w in zip(matrices, vectors, weights):
+            folding.get(
+                VectorConstant(*v) * (MatrixConstant(*m) * offset) * ScalarConstant(w)
+            )
+
+    def array():
+        folding = ConstantFoldingContext()
+        folding.get(
+            vector_array(vectors) * (matrix_array(matrices) * offset) * scalar_array(weights)
+        )
+
+    print("{} elements, v * (m * offset) * w (ms)".format(count))
+    for name, func in (("separate expressions", separate), ("array expression", array)):
+        elapsed = min(timeit.repeat(func, number=1, repeat=5))
+        print("  {:22s} {:8.2f}".format(name, elapsed * 1e3))
+
+
+if __name__ == "__main__":
+    bench_array_folding()
@@ -0,0 +1,36 @@
+from __future__ import print_function
+
+import functools
+import timeit
+
+from expy.expression import Field
+from expy.expressions.math import Scalar, ScalarAdd
+from expy.contexts.constant_folding import ConstantFoldingContext
+
+
+class ScalarVar(Scalar):
+    tag = Field(str)
+
+
+def bench_associative(counts=(1000, 4000, 16000)):
+    print("sum() of n terms, half of them constant (ms)")
+    print("  {:>6s} {:>10s} {:>10s} {:>16s}".format("n", "build", "fold", "binary chain"))
+    for count in counts:
+        terms = [ScalarVar(str(i)) if i % 2 else float(i) for i in range(count)]
+        build = min(timeit.repeat(lambda: sum(terms), number=1, repeat=3))
+        total = sum(terms)
+        fold = min(timeit.repeat(
+            lambda: ConstantFoldingContext().get(total), number=1, repeat=3,
+        ))
+        chain = functools.reduce(ScalarAdd, terms)
+        try:
+            chain_fold = "{:16.2f}".format(min(timeit.repeat(
+                lambda: ConstantFoldingContext().get(chain), number=1, repeat=3,
+            )) * 1e3)
+        except RecursionError:
+            chain_fold = "{:>16s}".format("RecursionError")
+        print("  {:6d} {:10.2f} {:10.2f} {}".format(count, build * 1e3, fold * 1e3, chain_fold))
+
+
+if __name__ == "__main__":
+    bench_associative()
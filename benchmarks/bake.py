@@ -0,0 +1,41 @@
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+import timeit
+
+import numpy
+
+from expy.expressions.animation import Keyframes, anim_curve
+from expy.contexts.numeric import bake, ChannelCache
+from .batch_plan import _rig
+
+
+def bench_bake(count=100000, joint_count=16):
+    rng = numpy.random.RandomState(0)
+    channels = [
+        anim_curve(Keyframes(numpy.arange(0, count + 100, 100).tolist(), rng.rand(count // 100 + 1).tolist()))
+        for _ in range(6)
+    ]
+    roots = dict(("tip{}".format(i), output) for i, output in enumerate(_rig(channels, joint_count)))
+    frames = numpy.arange(float(count))
+    directory = tempfile.mkdtemp()
+    try:
+        print("{} channels, {} frames".format(len(roots), count))
+        for compress in (False, True):
+            path = os.path.join(directory, "cache{}.bin".format(int(compress)))
+            elapsed = timeit.timeit(lambda: bake(path, roots, frames, compress=compress), number=1)
+            cache = ChannelCache(path)
+            lookups = rng.randint(0, count, 1000).astype(float).tolist()
+            lookup = timeit.timeit(lambda: [cache.frame(frame) for frame in lookups], number=1)
+            print("  {:12s} bake {:6.2f} s  {:7.1f} MB  random frame {:6.1f} us".format(
+                "compressed" if compress else "uncompressed",
+                elapsed, os.path.getsize(path) / 1e6, lookup / len(lookups) * 1e6,
+            ))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    bench_bake()
@@ -0,0 +1,65 @@
+from __future__ import print_function
+
+import timeit
+import tracemalloc
+
+import numpy
+
+from expy.expression import Field
+from expy.expressions.math import Scalar, vector
+from expy.expressions.transform import transform, euler
+from expy.contexts.numeric import BatchPlan
+
+
+ScalarVar = type(Scalar)("ScalarVar", (Scalar,), {"tag": Field(str)})
+
+
+def _rig(channels, joint_count):
+    # A tree of joints, each driven by a few of the animation channels
+    rng = numpy.random.RandomState(0)
+    worlds = []
+    for i in range(joint_count):
+        gains = rng.rand(6, 2).tolist()
+        tx, ty, tz, rx, ry, rz = [
+            channels[(i + k) % len(channels)] * gain + offset
+            for k, (gain, offset) in enumerate(gains)
+        ]
+        local = transform(
+            translation=vector(tx, ty, tz), rotation=euler(rx * 90, ry * 90, rz * 90),
+        ).matrix
+        if i:
+            local = local * worlds[(i - 1) // 2]
+        worlds.append(local)
+    # The tips of the leaf joints, summed per limb
+    leaves = worlds[joint_count // 2:]
+    outputs = [None] * 8
+    for i, world in enumerate(leaves):
+        limb = i * len(outputs) // len(leaves)
+        tip = vector(0, 1, 0) * world
+        outputs[limb] = tip if outputs[limb] is None else outputs[limb] + tip
+    return outputs
+
+
+def bench_batch_plan(count=100000, joint_count=240):
+    channels = [ScalarVar(str(i)) for i in range(6)]
+    rng = numpy.random.RandomState(1)
+    bindings = dict((channel, rng.rand(count)) for channel in channels)
+    outputs = _rig(channels, joint_count)
+
+    tracemalloc.start()
+    plan = BatchPlan(outputs, channels, count)
+    planned = timeit.timeit(lambda: plan.evaluate(bindings), number=1)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print("{} nodes, {} samples".format(len(plan._steps), count))
+    print("  unplanned temporaries (MB) {:8.1f}".format(plan.unplanned_bytes / 1e6))
+    print("  planned peak (MB)          {:8.1f}  ({} pooled buffers)".format(
+        plan.peak_bytes / 1e6, plan.buffer_count,
+    ))
+    print("  traced peak (MB)           {:8.1f}".format(peak / 1e6))
+    print("  evaluate (s)               {:8.3f}".format(planned))
+
+
+if __name__ == "__main__":
+    bench_batch_plan()
@@ -0,0 +1,67 @@
+from __future__ import print_function
+
+import timeit
+
+import numpy
+
+from expy.expression import Field
+from expy.expressions.math import *
+from expy.contexts.constant_folding import ConstantFoldingContext
+from expy.contexts.numeric.planner import _topological_order
+
+
+class ScalarVar(Scalar):
+    tag = Field(str)
+
+
+_CONSTANTS = (BooleanConstant, IntegerConstant, ScalarConstant, VectorConstant, MatrixConstant)
+
+
+def _blend(rng, a, b, w):
+    # The same blend, written with its operands in either order, as it is
+    # when several rig components compute it independently
+    terms = [a * w, b * (1 - w)]
+    if rng.rand() < 0.5:
+        terms.reverse()
+    return terms[0] + terms[1]
+
+
+def _rig(channels, joint_count):
+    rng = numpy.random.RandomState(0)
+    outputs = []
+    for i in range(joint_count):
+        a, b, w = [channels[(i + k) % len(channels)] for k in range(3)]
+        blend = _blend(rng, a, b, w)
+        again = _blend(rng, a, b, w)
+        twist = vector(blend, again, a * b).dot(vector(again, b * a, blend))
+        outputs.append((twist > 0.5) & ((blend > 0) | (again < 1)))
+    return outputs
+
+
+def _node_count(outputs):
+    return sum(
+        1 for expression in _topological_order(outputs, set())
+        if not isinstance(expression, _CONSTANTS + (ScalarVar,))
+    )
+
+
+def _fold(outputs):
+    folding = ConstantFoldingContext()
+    return [folding.get(output) for output in outputs]
+
+
+def bench_canonicalization(joint_count=500):
+    channels = [ScalarVar(str(i)) for i in range(12)]
+    outputs = _rig(channels, joint_count)
+    folding = ConstantFoldingContext()
+    folded = [folding.get(output) for output in outputs]
+    elapsed = min(timeit.repeat(lambda: _fold(outputs), number=1, repeat=3))
+    print("{} joints".format(joint_count))
+    print("  operation nodes unfolded {:8d}".format(_node_count(outputs)))
+    print("  operation nodes folded   {:8d}".format(_node_count(folded)))
+    print("  duplicates eliminated    {:8d}".format(folding.duplicates_eliminated))
+    print("  folding (ms)             {:8.1f}".format(elapsed * 1e3))
+
+
+if __name__ == "__main__":
+    bench_canonicalization()
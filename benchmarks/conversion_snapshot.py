@@ -0,0 +1,47 @@
+from __future__ import print_function
+
+import shutil
+import tempfile
+import timeit
+
+from expy import type_conversions
+import expy.expressions.math
+import expy.expressions.transform
+import expy.expressions.scene
+import expy.expressions.geometry
+
+
+def _cold_lookups(directory):
+    # Every lookup a long running session would eventually make, starting
+    # from an empty path cache as in a fresh process.
+    instance = type_conversions._instance
+    sources, destinations = instance._snapshot_types()
+    instance.set_snapshot_directory(directory)
+    instance._path_cache.clear()
+    instance._path_dependencies.clear()
+    instance._snapshot_keys.clear()
+    for to_type in destinations:
+        for from_type in sources:
+            instance.is_convertible(to_type, from_type)
+
+
+def bench_snapshot():
+    directory = tempfile.mkdtemp()
+    try:
+        saved = timeit.timeit(
+            lambda: type_conversions.save_snapshot(directory), number=1,
+        )
+        before = min(timeit.repeat(lambda: _cold_lookups(None), number=1, repeat=5))
+        after = min(timeit.repeat(lambda: _cold_lookups(directory), number=1, repeat=5))
+    finally:
+        type_conversions.set_snapshot_directory(None)
+        shutil.rmtree(directory)
+    print("full conversion table (ms)")
+    print("  save snapshot {:8.2f}".format(saved * 1e3))
+    print("  searched      {:8.2f}  from snapshot {:8.2f}".format(
+        before * 1e3, after * 1e3,
+    ))
+
+
+if __name__ == "__main__":
+    bench_snapshot()
@@ -0,0 +1,45 @@
+from __future__ import print_function
+
+import random
+import timeit
+
+from expy import type_conversions
+from expy.expressions.math import Vector, Matrix, vector, matrix
+
+
+def _time(func, number=3):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def bench_convert_many(count=10000):
+    rng = random.Random(0)
+    points = [tuple(rng.random() for _ in range(3)) for _ in range(count)]
+    rows = [
+        [[rng.random() for _ in range(4)] for _ in range(4)]
+        for _ in range(count)
+    ]
+    print("{} values (ms)".format(count))
+    before = _time(lambda: [vector(p) for p in points])
+    after = _time(lambda: type_conversions.convert_many(Vector, points))
+    print("  vector      one at a time {:8.2f}  convert_many {:8.2f}  ({:.0f}x)".format(
+        before * 1e3, after * 1e3, before / after,
+    ))
+    before = _time(lambda: [matrix(r) for r in rows])
+    after = _time(lambda: type_conversions.convert_many(Matrix, rows))
+    print("  matrix      one at a time {:8.2f}  convert_many {:8.2f}  ({:.0f}x)".format(
+        before * 1e3, after * 1e3, before / after,
+    ))
+    try:
+        import numpy
+    except ImportError:
+        return
+    point_array = numpy.array(points)
+    matrix_array = numpy.array(rows)
+    after = _time(lambda: type_conversions.convert_many(Vector, point_array))
+    print("  vector      numpy (N, 3)               {:8.2f}".format(after * 1e3))
+    after = _time(lambda: type_conversions.convert_many(Matrix, matrix_array))
+    print("  matrix      numpy (N, 4, 4)            {:8.2f}".format(after * 1e3))
+
+
+if __name__ == "__main__":
+    bench_convert_many()
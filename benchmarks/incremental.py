@@ -0,0 +1,34 @@
+from __future__ import print_function
+
+import timeit
+
+import numpy
+
+from expy.contexts.numeric import IncrementalEvaluator
+from .batch_plan import ScalarVar, _rig
+
+
+def bench_incremental(joint_count=240, channel_count=60, samples=20):
+    channels = [ScalarVar(str(i)) for i in range(channel_count)]
+    evaluator = IncrementalEvaluator(_rig(channels, joint_count), channels)
+    rng = numpy.random.RandomState(1)
+    evaluator.set_values(dict((channel, rng.rand()) for channel in channels))
+    evaluator.evaluate()
+    total = evaluator.recomputed
+
+    def scrub(changed):
+        for i in range(samples):
+            for channel in channels[:changed]:
+                evaluator.set_value(channel, rng.rand())
+            evaluator.evaluate()
+
+    print("{} nodes, {} channels (ms per sample)".format(total, channel_count))
+    for changed in (1, 6, channel_count):
+        elapsed = min(timeit.repeat(lambda: scrub(changed), number=1, repeat=3)) / samples
+        print("  {:3d} channels changed {:8.2f}  ({} nodes recomputed)".format(
+            changed, elapsed * 1e3, evaluator.recomputed,
+        ))
+
+
+if __name__ == "__main__":
+    bench_incremental()
@@ -0,0 +1,102 @@
+from __future__ import print_function
+
+import timeit
+
+import numpy
+
+from expy.expression import Field
+from expy.expressions.math import *
+from expy.expressions.transform import euler, transform
+from expy.contexts.constant_folding import ConstantFoldingContext
+from expy.contexts.numeric.planner import _topological_order
+
+
+class ScalarVar(Scalar):
+    tag = Field(str)
+
+
+_CONSTANTS = (BooleanConstant, IntegerConstant, ScalarConstant, VectorConstant, MatrixConstant)
+
+
+def _rig(channels, joint_count):
+    # A chain of joints, each with an offset matrix, an animated rotation
+    # and its parent's world matrix. Space switches bring each joint back
+    # into its parent's space, and into the space of the joint above it,
+    # multiplying by inverse world matrices.
+    rng = numpy.random.RandomState(0)
+    folding = ConstantFoldingContext()
+    worlds = []
+    outputs = []
+    for i in range(joint_count):
+        a, b, c = [channels[(i + k) % len(channels)] for k in range(3)]
+        offset = folding.get(transform(
+            rotation=euler(*(rng.rand(3) * 90).tolist()),
+            translation=vector(*rng.rand(3).tolist()),
+        ).matrix)
+        rotation = transform(rotation=euler(a * 90.0, b * 45.0, c * 30.0)).matrix
+        local = offset * rotation
+        world = local * worlds[-1] if worlds else local
+        if worlds:
+            outputs.append(world * worlds[-1].inverse())
+            if len(worlds) > 1:
+                outputs.append(world * (worlds[-1].inverse() * offset.inverse()))
+        worlds.append(world)
+    return outputs
+
+
+def _sparse_rig(channels, joint_count):
+    # Joints with animated translation-only and scale-only matrices, between
+    # constant offsets
+    rng = numpy.random.RandomState(0)
+    folding = ConstantFoldingContext()
+    outputs = []
+    for i in range(joint_count):
+        a, b, c = [channels[(i + k) % len(channels)] for k in range(3)]
+        offset = folding.get(transform(
+            rotation=euler(*(rng.rand(3) * 90).tolist()),
+            translation=vector(*rng.rand(3).tolist()),
+        ).matrix)
+        translate = MatrixFromScalar(a30=a, a31=b * 2.0, a32=0.5)
+        scale = MatrixFromScalar(a00=c, a11=c, a22=c)
+        outputs.append(scale * translate * offset)
+    return outputs
+
+
+def _node_count(outputs, types=None):
+    return sum(
+        1 for expression in _topological_order(outputs, set())
+        if not isinstance(expression, _CONSTANTS + (ScalarVar,))
+        and (types is None or isinstance(expression, types))
+    )
+
+
+def _fold(outputs):
+    folding = ConstantFoldingContext()
+    return [folding.get(output) for output in outputs]
+
+
+def bench_matrix_chains(joint_count=100):
+    channels = [ScalarVar(str(i)) for i in range(6)]
+    outputs = _rig(channels, joint_count)
+    folded = _fold(outputs)
+    elapsed = min(timeit.repeat(lambda: _fold(outputs), number=1, repeat=3))
+    print("{} joints (operation nodes)".format(joint_count))
+    print("  unfolded     {:8d}".format(_node_count(outputs)))
+    print("  folded       {:8d}".format(_node_count(folded)))
+    print("  folding (ms) {:8.1f}".format(elapsed * 1e3))
+
+
+def bench_sparse_products(joint_count=100):
+    channels = [ScalarVar(str(i)) for i in range(6)]
+    outputs = _sparse_rig(channels, joint_count)
+    folded = _fold(outputs)
+    print("{} joints, translation and scale matrices".format(joint_count))
+    print("  matrix products unfolded {:8d}".format(_node_count(outputs, MatrixMultiply)))
+    print("  matrix products folded   {:8d}".format(_node_count(folded, MatrixMultiply)))
+    print("  operation nodes unfolded {:8d}".format(_node_count(outputs)))
+    print("  operation nodes folded   {:8d}".format(_node_count(folded)))
+
+
+if __name__ == "__main__":
+    bench_matrix_chains()
+    bench_sparse_products()
@@ -0,0 +1,50 @@
+from __future__ import print_function
+
+import timeit
+
+import numpy
+
+from expy.expression import Field
+from expy.expressions.math import Scalar, vector, scalar
+from expy.expressions.transform import transform, euler
+from expy.contexts.constant_folding import ConstantFoldingContext
+from expy.contexts.numeric import NumpyContext
+
+
+ScalarVar = type(Scalar)("ScalarVar", (Scalar,), {"tag": Field(str)})
+
+
+def _rig(a, b):
+    parent = transform(
+        translation=vector(a, 0, b), rotation=euler(a * 10, 0, b), scale=vector(1, 1, 1),
+    )
+    child = transform(translation=vector(1, b, 0), rotation=euler(0, a, 0))
+    point = vector(a, b, 1) * (child.matrix * parent.matrix)
+    return point.normalized().dot(vector(0, 1, 0)) * b + point.length()
+
+
+def bench_numpy_context(count=100000, folded_count=200):
+    a = ScalarVar("a")
+    b = ScalarVar("b")
+    rng = numpy.random.RandomState(0)
+    a_values = rng.rand(count)
+    b_values = rng.rand(count)
+    expression = _rig(a, b)
+    batched = min(timeit.repeat(
+        lambda: NumpyContext({a: a_values, b: b_values}).get(expression),
+        number=1, repeat=3,
+    ))
+    folded = min(timeit.repeat(
+        lambda: [
+            ConstantFoldingContext().get(_rig(scalar(x), scalar(y)))
+            for x, y in zip(a_values[:folded_count].tolist(), b_values[:folded_count].tolist())
+        ],
+        number=1, repeat=3,
+    )) / folded_count * count
+    print("{} samples (s)".format(count))
+    print("  folding each sample {:8.3f}  (extrapolated)".format(folded))
+    print("  NumpyContext        {:8.3f}  ({:.0f}x)".format(batched, folded / batched))
+
+
+if __name__ == "__main__":
+    bench_numpy_context()
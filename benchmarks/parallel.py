@@ -0,0 +1,43 @@
+from __future__ import print_function
+
+import multiprocessing
+import timeit
+
+import numpy
+
+from expy.expression import Field
+from expy.expressions.math import Scalar
+from expy.contexts.numeric import BatchPlan, ParallelEvaluator
+from .batch_plan import _rig
+
+
+# Defined at module level so workers started with spawn can unpickle it
+class ScalarVar(Scalar):
+    tag = Field(str)
+
+
+def bench_parallel(count=1000000, joint_count=16):
+    channels = [ScalarVar(str(i)) for i in range(6)]
+    rng = numpy.random.RandomState(1)
+    bindings = dict((channel, rng.rand(count)) for channel in channels)
+    outputs = _rig(channels, joint_count)
+
+    plan = BatchPlan(outputs, channels, count)
+    single = min(timeit.repeat(lambda: plan.evaluate(bindings), number=1, repeat=3))
+    print("{} samples (samples per second)".format(count))
+    print("  BatchPlan                {:10.0f}".format(count / single))
+    processes = 1
+    while processes <= multiprocessing.cpu_count():
+        with ParallelEvaluator(outputs, channels, processes=processes) as evaluator:
+            evaluator.evaluate(bindings)
+            elapsed = min(timeit.repeat(
+                lambda: evaluator.evaluate(bindings), number=1, repeat=3,
+            ))
+        print("  {:3d} processes            {:10.0f}  ({:.1f}x)".format(
+            processes, count / elapsed, single / elapsed,
+        ))
+        processes *= 2
+
+
+if __name__ == "__main__":
+    bench_parallel()
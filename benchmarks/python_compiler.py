@@ -0,0 +1,51 @@
+from __future__ import print_function
+
+import random
+import timeit
+
+from expy.expression import Field
+from expy.expressions.math import Scalar, matrix, vector, scalar
+from expy.contexts.constant_folding import ConstantFoldingContext
+from expy.contexts.python import compile_expression
+
+
+ScalarVar = type(Scalar)("ScalarVar", (Scalar,), {"tag": Field(str)})
+
+
+def _rig(a, b):
+    parent = matrix(
+        a, 0, b, 0,
+        0, 1, 0, 0,
+        -b, 0, a, 0,
+        1, 2, 3, 1,
+    )
+    child = matrix(
+        1, 0, 0, 0,
+        0, a, b, 0,
+        0, -b, a, 0,
+        b, 0, a, 1,
+    )
+    point = vector(a, b, 1) * (child * parent.inverse())
+    return point.normalized().dot(vector(0, 1, 0)) * b + point.length()
+
+
+def bench_python_compiler(count=2000):
+    rng = random.Random(0)
+    samples = [(rng.random() + 0.5, rng.random() + 0.5) for _ in range(count)]
+    a = ScalarVar("a")
+    b = ScalarVar("b")
+    compiled = compile_expression(_rig(a, b), {"a": a, "b": b})
+    folded = min(timeit.repeat(
+        lambda: [ConstantFoldingContext().get(_rig(scalar(x), scalar(y))) for x, y in samples],
+        number=1, repeat=3,
+    ))
+    after = min(timeit.repeat(
+        lambda: [compiled(x, y) for x, y in samples], number=1, repeat=3,
+    ))
+    print("{} evaluations (ms)".format(count))
+    print("  folding   {:8.2f}".format(folded * 1e3))
+    print("  compiled  {:8.2f}  ({:.0f}x)".format(after * 1e3, folded / after))
+
+
+if __name__ == "__main__":
+    bench_python_compiler()
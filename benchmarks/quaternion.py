@@ -0,0 +1,87 @@
+from __future__ import print_function
+
+import functools
+import operator
+import random
+import timeit
+
+import numpy
+
+from expy.expression import Field
+from expy.expressions.math import Scalar
+from expy.expressions.transform import (
+    RotateOrder, EulerRotation, QuaternionFromRotation, QuaternionRotation, transform,
+)
+from expy.contexts.constant_folding import ConstantFoldingContext
+from expy.contexts.numeric import NumpyContext
+
+
+ScalarVar = type(Scalar)("ScalarVar", (Scalar,), {"tag": Field(str)})
+
+
+def _rotations(count, a=0, b=0):
+    rng = random.Random(0)
+    orders = list(RotateOrder)
+    return [
+        EulerRotation(
+            a * rng.random() + rng.random() * 360,
+            b * rng.random() + rng.random() * 180 - 90,
+            rng.random() * 360,
+            rng.choice(orders),
+        )
+        for _ in range(count)
+    ]
+
+
+def _matrix_chain(rotations):
+    return functools.reduce(
+        operator.mul, [transform(rotation=r).matrix for r in rotations],
+    )
+
+
+def _quaternion_chain(rotations):
+    product = functools.reduce(
+        operator.mul, [QuaternionFromRotation(r) for r in rotations],
+    )
+    return transform(rotation=QuaternionRotation(product)).matrix
+
+
+def _blend(rotations, weight):
+    start = QuaternionFromRotation(rotations[0])
+    end = QuaternionFromRotation(rotations[1])
+    return transform(rotation=QuaternionRotation(start.slerp(end, weight))).matrix
+
+
+def bench_quaternion(count=2000, chain=4, samples=100000):
+    rotations = _rotations(count * chain)
+    chains = [rotations[i:i + chain] for i in range(0, len(rotations), chain)]
+    folding = {}
+    for name, build in (("matrices", _matrix_chain), ("quaternions", _quaternion_chain)):
+        folding[name] = min(timeit.repeat(
+            lambda: [ConstantFoldingContext().get(build(c)) for c in chains],
+            number=1, repeat=3,
+        ))
+    a = ScalarVar("a")
+    b = ScalarVar("b")
+    rng = numpy.random.RandomState(0)
+    values = {a: rng.rand(samples) * 360, b: rng.rand(samples) * 180}
+    varying = _rotations(chain, a, b)
+    batched = {}
+    for name, expression in (
+        ("matrices", _matrix_chain(varying)),
+        ("quaternions", _quaternion_chain(varying)),
+        ("slerp", _blend(varying, a / 360)),
+    ):
+        batched[name] = min(timeit.repeat(
+            lambda: NumpyContext(values).get(expression), number=1, repeat=3,
+        ))
+    print("{} chains of {} rotations (ms)".format(count, chain))
+    for name, elapsed in sorted(folding.items()):
+        print("  folding {:12s} {:8.2f}".format(name, elapsed * 1e3))
+    print("{} samples (ms)".format(samples))
+    for name, elapsed in sorted(batched.items()):
+        print("  NumpyContext {:12s} {:8.2f}".format(name, elapsed * 1e3))
+
+
+if __name__ == "__main__":
+    bench_quaternion()
@@ -0,0 +1,66 @@
+from __future__ import print_function
+
+import numpy
+
+from expy.expression import Field
+from expy.expressions.math import *
+from expy.expressions.transform import euler, transform
+from expy.contexts.constant_folding import ConstantFoldingContext
+from expy.contexts.numeric.planner import _topological_order
+
+
+class ScalarVar(Scalar):
+    tag = Field(str)
+
+
+_CONSTANTS = (BooleanConstant, IntegerConstant, ScalarConstant, VectorConstant, MatrixConstant)
+
+
+def _rig(channels, joint_count):
+    # Joints written with the binary operations, as graphs built node by
+    # node usually are, with constants spread across nested nodes: offsets
+    # added to offset channels, gains on gains, and joint orients and rest
+    # offsets multiplied onto the local matrix one at a time.
+    rng = numpy.random.RandomState(0)
+    folding = ConstantFoldingContext()
+    worlds = []
+    tips = []
+    for i in range(joint_count):
+        a, b, c = [channels[(i + k) % len(channels)] for k in range(3)]
+        rx = ScalarMultiply(ScalarAdd(ScalarAdd(a, 0.5), rng.rand()), 90.0)
+        ry = ScalarMultiply(2.0, ScalarMultiply(b, rng.rand() * 45))
+        rz = ScalarAdd(ScalarMultiply(c, 30.0), ScalarAdd(rng.rand(), -0.25))
+        offset = VectorAdd(
+            VectorAdd(VectorFromScalar(a, b, 0.0), vector(*rng.rand(3).tolist())),
+            vector(0.0, 1.0, 0.0),
+        )
+        orient = folding.get(transform(rotation=euler(*(rng.rand(3) * 90).tolist())).matrix)
+        rest = folding.get(transform(translation=vector(*rng.rand(3).tolist())).matrix)
+        rotation = transform(rotation=euler(rx, ry, rz)).matrix
+        local = MatrixMultiply(MatrixMultiply(rotation, orient), rest)
+        if i:
+            local = MatrixMultiply(local, worlds[(i - 1) // 2])
+        worlds.append(local)
+        tips.append(VectorAdd(VectorMatrixMultiply(offset, local), offset))
+    return tips
+
+
+def _node_count(outputs):
+    # Operation nodes, as Maya would create them: neither constants nor leaves
+    return sum(
+        1 for expression in _topological_order(outputs, set())
+        if not isinstance(expression, _CONSTANTS + (ScalarVar,))
+    )
+
+
+def bench_reassociation(joint_count=120):
+    channels = [ScalarVar(str(i)) for i in range(6)]
+    outputs = _rig(channels, joint_count)
+    folded = [ConstantFoldingContext().get(output) for output in outputs]
+    print("{} joints (operation nodes)".format(joint_count))
+    print("  unfolded {:8d}".format(_node_count(outputs)))
+    print("  folded   {:8d}".format(_node_count(folded)))
+
+
+if __name__ == "__main__":
+    bench_reassociation()
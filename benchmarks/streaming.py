@@ -0,0 +1,44 @@
+from __future__ import print_function
+
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import numpy
+
+from expy.contexts.numeric import evaluate_to_files
+from .batch_plan import ScalarVar, _rig
+
+
+def bench_streaming(count=2000000, joint_count=16, chunk_size=65536):
+    directory = tempfile.mkdtemp()
+    try:
+        channels = [ScalarVar(str(i)) for i in range(6)]
+        rng = numpy.random.RandomState(1)
+        bindings = {}
+        for channel in channels:
+            bindings[channel] = os.path.join(directory, channel.tag + ".npy")
+            numpy.save(bindings[channel], rng.rand(count))
+        outputs = _rig(channels, joint_count)
+        paths = [os.path.join(directory, "out{}.npy".format(i)) for i in range(len(outputs))]
+
+        tracemalloc.start()
+        start = time.time()
+        for _ in evaluate_to_files(outputs, bindings, paths, chunk_size=chunk_size):
+            pass
+        elapsed = time.time() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        file_size = sum(os.path.getsize(path) for path in list(bindings.values()) + paths)
+    finally:
+        shutil.rmtree(directory)
+    print("{} samples, chunks of {}".format(count, chunk_size))
+    print("  input and output files (MB) {:8.1f}".format(file_size / 1e6))
+    print("  traced peak (MB)            {:8.1f}".format(peak / 1e6))
+    print("  samples per second          {:8.0f}".format(count / elapsed))
+
+
+if __name__ == "__main__":
+    bench_streaming()
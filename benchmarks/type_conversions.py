@@ -0,0 +1,67 @@
+from __future__ import print_function
+
+import timeit
+
+from expy import type_conversions
+from expy.expressions.math import Scalar, ScalarConstant
+
+
+class _UncachedTypeConversions(type_conversions.TypeConversions):
+    # Type hook resolution as it was before it was cached per type.
+
+    def _typeof(self, value):
+        result = type(value)
+        for base in result.mro():
+            try:
+                return self._type_hooks[base](value)
+            except KeyError:
+                continue
+        return result
+
+
+def _uncached_instance():
+    result = _UncachedTypeConversions()
+    instance = type_conversions._instance
+    result._conversions = instance._conversions
+    result._type_hooks = instance._type_hooks
+    return result
+
+
+def _time(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def bench_typeof(number=200000):
+    uncached = _uncached_instance()
+    cached = type_conversions._instance
+    expression = ScalarConstant(1.0)
+    print("per-field type resolution (ns)")
+    for name, value in (("float", 1.0), ("int", 1), ("Expression", expression)):
+        before = _time(lambda: uncached._typeof(value), number)
+        after = _time(lambda: cached._typeof(value), number)
+        print("  {:<12} uncached {:8.1f}  cached {:8.1f}".format(
+            name, before * 1e9, after * 1e9,
+        ))
+
+
+def bench_convert(number=100000):
+    # Field.construct is a call to convert() with the field type.
+    uncached = _uncached_instance()
+    cached = type_conversions._instance
+    expression = ScalarConstant(1.0)
+    print("per-field convert (ns)")
+    for name, to_type, value in (
+        ("float", float, 1.0),
+        ("int", float, 1),
+        ("Expression", Scalar, expression),
+    ):
+        before = _time(lambda: uncached.convert(to_type, value), number)
+        after = _time(lambda: cached.convert(to_type, value), number)
+        print("  {:<12} uncached {:8.1f}  cached {:8.1f}".format(
+            name, before * 1e9, after * 1e9,
+        ))
+
+
+if __name__ == "__main__":
+    bench_typeof()
+    bench_convert()
@@ -1,3 +1,4 @@
+import importlib
 from collections import namedtuple
 
 
@@ -26,10 +27,168 @@ def _default_handler(context, value):
     raise NotImplementedError("Unsupported value: {}".format(value))
 
 
+# Structural pattern for ContextHandler.register_pattern. Field sub-patterns
+# are given by field name and may be a Pattern, a type (instance check), a
+# callable (predicate on the field value) or any other value (equality check).
+# `where` is an optional predicate on the whole value, checked last.
+class Pattern(object):
+
+    def __init__(self, type=object, where=None, **fields):
+        self.type = type
+        self.where = where
+        self.fields = fields
+
+    def _tests(self, path=()):
+        tests = []
+        if path:
+            tests.append((path, _TYPE, self.type))
+        field_patterns = []
+        for name, sub_pattern in self.fields.items():
+            field = getattr(self.type, name)
+            field_patterns.append((field.index(self.type), sub_pattern))
+        for index, sub_pattern in sorted(field_patterns, key=lambda f: f[0]):
+            sub_path = path + (index,)
+            if isinstance(sub_pattern, Pattern):
+                tests.extend(sub_pattern._tests(sub_path))
+            elif isinstance(sub_pattern, type):
+                tests.append((sub_path, _TYPE, sub_pattern))
+            elif callable(sub_pattern):
+                tests.append((sub_path, _PREDICATE, sub_pattern))
+            else:
+                tests.append((sub_path, _EQUALS, sub_pattern))
+        if self.where is not None:
+            tests.append((path, _PREDICATE, self.where))
+        return tuple(tests)
+
+
+_TYPE = "type"
+_EQUALS = "equals"
+_PREDICATE = "predicate"
+
+
+def _value_at(value, path):
+    for index in path:
+        value = value._values[index]
+    return value
+
+
+def _find_test(tests, path, kind):
+    for i, (test_path, test_kind, arg) in enumerate(tests):
+        if test_path == path and test_kind == kind:
+            return i, arg
+    return None, None
+
+
+def _specialize(rows, path, kind, decide):
+    # Resolves the test of the given kind at the given path in every row.
+    # decide(arg) returns True if the test passes, False if it fails and None
+    # if this switch does not decide it. Row order is preserved.
+    result = []
+    for tests, handler in rows:
+        i, arg = _find_test(tests, path, kind)
+        passed = None if i is None else decide(arg)
+        if passed is None:
+            result.append((tests, handler))
+        elif passed:
+            result.append((tests[:i] + tests[i + 1:], handler))
+    return result
+
+
+def _compile_rows(rows):
+    # Builds a decision tree which checks each (path, kind) once for all
+    # patterns, instead of matching every pattern in turn.
+    if not rows:
+        return None
+    tests, handler = rows[0]
+    if not tests:
+        return _Leaf(handler)
+    path, kind, arg = tests[0]
+    if kind == _TYPE:
+        return _TypeSwitch(path, rows)
+    elif kind == _EQUALS:
+        return _EqualsSwitch(path, rows)
+    return _PredicateSwitch(path, arg, rows)
+
+
+class _Leaf(object):
+
+    def __init__(self, handler):
+        self.handler = handler
+
+
+class _TypeSwitch(object):
+
+    def __init__(self, path, rows):
+        self.path = path
+        self.rows = rows
+        self.branches = {}
+
+    def next(self, value):
+        cls = type(_value_at(value, self.path))
+        try:
+            return self.branches[cls]
+        except KeyError:
+            # Branches are specialized lazily for each concrete type
+            branch = _compile_rows(_specialize(
+                self.rows, self.path, _TYPE, lambda t: issubclass(cls, t),
+            ))
+            self.branches[cls] = branch
+            return branch
+
+
+class _EqualsSwitch(object):
+
+    def __init__(self, path, rows):
+        self.path = path
+        self.branches = {}
+        for tests, handler in rows:
+            i, arg = _find_test(tests, path, _EQUALS)
+            if i is not None and arg not in self.branches:
+                self.branches[arg] = _compile_rows(_specialize(
+                    rows, path, _EQUALS, lambda a, arg=arg: a == arg,
+                ))
+        self.default = _compile_rows(_specialize(
+            rows, path, _EQUALS, lambda a: False,
+        ))
+
+    def next(self, value):
+        try:
+            return self.branches.get(_value_at(value, self.path), self.default)
+        except TypeError:
+            # Unhashable values never equal a pattern constant
+            return self.default
+
+
+class _PredicateSwitch(object):
+
+    def __init__(self, path, predicate, rows):
+        self.path = path
+        self.predicate = predicate
+        # Predicates may rely on the structure checked before them, so only
+        # rows which have nothing else left to check before it are decided.
+        test = (path, _PREDICATE, predicate)
+        self.if_true = _compile_rows([
+            (tests[1:] if tests[:1] == (test,) else tests, handler)
+            for tests, handler in rows
+        ])
+        self.if_false = _compile_rows([
+            (tests, handler) for tests, handler in rows
+            if tests[:1] != (test,)
+        ])
+
+    def next(self, value):
+        if self.predicate(_value_at(value, self.path)):
+            return self.if_true
+        return self.if_false
+
+
 class ContextHandler(object):
 
     def __init__(self):
         self._handlers = {}
+        self._patterns = []
+        self._decision_trees = {}
+        self._lazy_handlers = {}
         self.default_handler = _default_handler
 
     def register_handler(self, value_type, handler):
@@ -41,6 +200,30 @@ class ContextHandler(object):
             return func
         return decorator
 
+    def register_pattern(self, pattern, handler):
+        self._patterns.append((pattern, handler))
+        self._decision_trees = {}
+
+    def pattern(self, *args, **kwargs):
+        if len(args) == 1 and not kwargs and isinstance(args[0], Pattern):
+            pattern = args[0]
+        else:
+            pattern = Pattern(*args, **kwargs)
+        def decorator(func):
+            self.register_pattern(pattern, func)
+            return func
+        return decorator
+
+    def register_lazy_handlers(self, expression_module, handler_module):
+        # The handler module is imported the first time a value whose type
+        # (or one of its bases) is defined in expression_module is handled.
+        self._lazy_handlers.setdefault(expression_module, []).append(handler_module)
+
+    def _load_lazy_handlers(self, value_type):
+        for base in value_type.mro():
+            for handler_module in self._lazy_handlers.pop(base.__module__, ()):
+                importlib.import_module(handler_module)
+
     def default(self):
         def decorator(func):
             self.default_handler = func
@@ -50,6 +233,8 @@ class ContextHandler(object):
     def get_handler(self, value_type):
         if not isinstance(value_type, type):
             value_type = type(value_type)
+        if self._lazy_handlers:
+            self._load_lazy_handlers(value_type)
         for base in value_type.mro():
             try:
                 return self._handlers[base]
@@ -57,5 +242,27 @@ class ContextHandler(object):
                 continue
         return self.default_handler
 
+    def match(self, value):
+        value_type = type(value)
+        try:
+            node = self._decision_trees[value_type]
+        except KeyError:
+            if self._lazy_handlers:
+                self._load_lazy_handlers(value_type)
+            node = _compile_rows([
+                (pattern._tests(), handler)
+                for pattern, handler in self._patterns
+                if issubclass(value_type, pattern.type)
+            ])
+            self._decision_trees[value_type] = node
+        while node is not None:
+            if isinstance(node, _Leaf):
+                return node.handler
+            node = node.next(value)
+        return None
+
     def __call__(self, context, value):
-        return self.get_handler(value)(context, value)
+        handler = self.match(value)
+        if handler is None:
+            handler = self.get_handler(value)
+        return handler(context, value)
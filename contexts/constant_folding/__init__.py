@@ -1,6 +1,12 @@
 from __future__ import absolute_import
 
-from . import math as _math
-from . import transform as _transform
-from . import scene as _scene
-from .context import ConstantFoldingContext
+from ... import expressions as _expressions
+from .context import constant_folding, ConstantFoldingContext
+
+# Handlers for each expression family are imported when an expression of that
+# family is first folded, so unused families are never imported.
+for _family in ("math", "transform", "scene", "animation", "arrays"):
+    constant_folding.register_lazy_handlers(
+        "{}.{}".format(_expressions.__name__, _family),
+        "{}.{}".format(__name__, _family),
+    )
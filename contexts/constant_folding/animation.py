@@ -0,0 +1,21 @@
+from __future__ import absolute_import
+
+from ...expressions.math import ScalarConstant
+from ...expressions.animation import *
+from .context import constant_folding
+
+
+@constant_folding.handler(ScalarAnimCurve)
+def _handle_scalar_anim_curve(context, expression):
+    keys = expression.keys
+    time = context.get(expression.time)
+    if isinstance(time, ScalarConstant):
+        return ScalarConstant(keys.sample(time.value))
+    # Flat curves have the same value at any time
+    if (
+        len(set(keys.values)) == 1
+        and not any(keys.in_slopes)
+        and not any(keys.out_slopes)
+    ):
+        return ScalarConstant(keys.values[0])
+    return ScalarAnimCurve(keys, time)
@@ -0,0 +1,205 @@
+from __future__ import absolute_import, division
+
+import functools
+import itertools
+import math
+import operator
+
+from ...expressions.math import (
+    ScalarConstant, VectorConstant, MatrixConstant,
+    ScalarAdd, ScalarSubtract, ScalarMultiply, ScalarDivide, ScalarPower,
+    VectorAdd, VectorSubtract, VectorMultiply, VectorDivide,
+    VectorDotProduct, VectorCrossProduct, VectorLength, VectorNormalize,
+    VectorMatrixMultiply,
+    MatrixAdd, MatrixSubtract, MatrixMultiply, MatrixScalarMultiply,
+    MatrixInverse, MatrixTranspose,
+)
+from ...expressions.arrays import *
+from .context import constant_folding
+from .math import _matrix_inverse, _matrix_product
+
+
+# Constant arrays are folded whole: the operation is applied to the plain
+# values of every element in one pass, without building an expression per
+# element. An array broadcast from a constant takes part with its one value
+# repeated. When every operand is a broadcast, the operation is folded once
+# on the broadcast values and the result broadcast.
+
+# Array type: (constant type, broadcast type, element access type, element
+# value to constant)
+_ARRAY_TYPES = {
+    ScalarArray: (ScalarArrayConstant, ScalarArrayFromScalar, ScalarArrayElement, ScalarConstant),
+    VectorArray: (VectorArrayConstant, VectorArrayFromVector, VectorArrayElement, VectorConstant._from_values),
+    MatrixArray: (MatrixArrayConstant, MatrixArrayFromMatrix, MatrixArrayElement, MatrixConstant._from_values),
+}
+
+_ELEMENT_CONSTANTS = {
+    ScalarConstant: lambda constant: constant.value,
+    VectorConstant: lambda constant: constant._values,
+    MatrixConstant: lambda constant: constant._values,
+}
+
+# Element-wise operations: the operation on single elements, used for
+# broadcasts and element access, and a function on plain element values
+_ELEMENTWISE = {}
+
+
+def _array_type(expression):
+    for array_type in _ARRAY_TYPES:
+        if isinstance(expression, array_type):
+            return array_type
+    raise TypeError("Not an array expression: {!r}".format(expression))
+
+
+class _Repeat(object):
+    # The value of a constant broadcast to any length
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+def _constant_values(array):
+    # The element values of a constant array, a _Repeat for a broadcast
+    # constant, or None
+    if isinstance(array, (ScalarArrayConstant, VectorArrayConstant, MatrixArrayConstant)):
+        return array.values
+    broadcast_type = _ARRAY_TYPES[_array_type(array)][1]
+    if isinstance(array, broadcast_type):
+        value = _ELEMENT_CONSTANTS.get(type(array.value))
+        if value is not None:
+            return _Repeat(value(array.value))
+    return None
+
+
+def _handle_elementwise(element_type, func, context, expression):
+    operands = [context.get(operand) for operand in expression._values]
+    constant_type, broadcast_type, _, _ = _ARRAY_TYPES[_array_type(expression)]
+    broadcast_types = tuple(_ARRAY_TYPES[_array_type(o)][1] for o in operands)
+    if all(isinstance(o, t) for o, t in zip(operands, broadcast_types)):
+        return broadcast_type(context.get(element_type(*(o.value for o in operands))))
+    values = [_constant_values(operand) for operand in operands]
+    if all(v is not None for v in values):
+        lengths = set(len(v) for v in values if not isinstance(v, _Repeat))
+        if len(lengths) > 1:
+            raise ValueError("Array lengths differ: {}".format(sorted(lengths)))
+        columns = [
+            itertools.repeat(v.value) if isinstance(v, _Repeat) else v
+            for v in values
+        ]
+        return constant_type(tuple(itertools.starmap(func, zip(*columns))))
+    return type(expression)(*operands)
+
+
+def _elementwise(array_op, element_op, func):
+    _ELEMENTWISE[array_op] = (element_op, func)
+    constant_folding.register_handler(
+        array_op, functools.partial(_handle_elementwise, element_op, func),
+    )
+
+
+def _handle_element(context, expression):
+    # Elements of folded arrays are folded; elements of element-wise
+    # operations are the operation on the operands' elements.
+    array = context.get(expression.array)
+    index = expression.index
+    _, broadcast_type, element_type, element_constant = _ARRAY_TYPES[_array_type(array)]
+    values = _constant_values(array)
+    if isinstance(values, _Repeat):
+        return array.value
+    elif values is not None:
+        return element_constant(values[index])
+    elif isinstance(array, broadcast_type):
+        return array.value
+    elif type(array) in _ELEMENTWISE:
+        element_op, _ = _ELEMENTWISE[type(array)]
+        return context.get(element_op(*(
+            _ARRAY_TYPES[_array_type(operand)][2](operand, index)
+            for operand in array._values
+        )))
+    return type(expression)(array, index)
+
+
+for _element_type in (ScalarArrayElement, VectorArrayElement, MatrixArrayElement):
+    constant_folding.register_handler(_element_type, _handle_element)
+
+
+def _vector_scale(v, s):
+    return (v[0] * s, v[1] * s, v[2] * s)
+
+
+def _vector_divide(v, s):
+    return (v[0] / s, v[1] / s, v[2] / s)
+
+
+def _vector_dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _vector_cross(a, b):
+    return (
+        a[1] * b[2] - a[2] * b[1],
+        a[2] * b[0] - a[0] * b[2],
+        a[0] * b[1] - a[1] * b[0],
+    )
+
+
+def _vector_length(v):
+    return math.sqrt(_vector_dot(v, v))
+
+
+def _vector_normalize(v):
+    return _vector_divide(v, _vector_length(v))
+
+
+def _vector_matrix_multiply(v, m):
+    x, y, z = v
+    return (
+        x*m[0] + y*m[4] + z*m[8],
+        x*m[1] + y*m[5] + z*m[9],
+        x*m[2] + y*m[6] + z*m[10],
+    )
+
+
+def _componentwise(func):
+    return lambda a, b: tuple(map(func, a, b))
+
+
+def _matrix_scale(m, s):
+    return tuple(a * s for a in m)
+
+
+def _matrix_multiply(a, b):
+    return _matrix_product(MatrixConstant._from_values(a), MatrixConstant._from_values(b))._values
+
+
+def _matrix_inverse_values(m):
+    return _matrix_inverse(MatrixConstant._from_values(m))._values
+
+
+def _matrix_transpose(m):
+    return tuple(m[4 * j + i] for i in range(4) for j in range(4))
+
+
+_elementwise(ScalarArrayAdd, ScalarAdd, operator.add)
+_elementwise(ScalarArraySubtract, ScalarSubtract, operator.sub)
+_elementwise(ScalarArrayMultiply, ScalarMultiply, operator.mul)
+_elementwise(ScalarArrayDivide, ScalarDivide, operator.truediv)
+_elementwise(ScalarArrayPower, ScalarPower, operator.pow)
+
+_elementwise(VectorArrayAdd, VectorAdd, _componentwise(operator.add))
+_elementwise(VectorArraySubtract, VectorSubtract, _componentwise(operator.sub))
+_elementwise(VectorArrayMultiply, VectorMultiply, _vector_scale)
+_elementwise(VectorArrayDivide, VectorDivide, _vector_divide)
+_elementwise(VectorArrayDotProduct, VectorDotProduct, _vector_dot)
+_elementwise(VectorArrayCrossProduct, VectorCrossProduct, _vector_cross)
+_elementwise(VectorArrayLength, VectorLength, _vector_length)
+_elementwise(VectorArrayNormalize, VectorNormalize, _vector_normalize)
+_elementwise(VectorArrayMatrixMultiply, VectorMatrixMultiply, _vector_matrix_multiply)
+
+_elementwise(MatrixArrayAdd, MatrixAdd, _componentwise(operator.add))
+_elementwise(MatrixArraySubtract, MatrixSubtract, _componentwise(operator.sub))
+_elementwise(MatrixArrayMultiply, MatrixMultiply, _matrix_multiply)
+_elementwise(MatrixArrayScalarMultiply, MatrixScalarMultiply, _matrix_scale)
+_elementwise(MatrixArrayInverse, MatrixInverse, _matrix_inverse_values)
+_elementwise(MatrixArrayTranspose, MatrixTranspose, _matrix_transpose)
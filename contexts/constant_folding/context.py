@@ -4,6 +4,19 @@ from ...context import Context, ContextHandler
 
 constant_folding = ContextHandler()
 
+# Algebraic identities, matched by pattern against expressions whose operands
+# have already been folded. Unmatched expressions are returned unchanged.
+identities = ContextHandler()
+
+# Operations whose operands may be given in any order. Folded expressions of
+# these types have their operands sorted by structural digest, so that
+# a + b and b + a fold to the same expression, and are cached and built once.
+commutative_types = set()
+
+
+def register_commutative(*expression_types):
+    commutative_types.update(expression_types)
+
 
 @constant_folding.handler(Expression)
 def _constant_folding_default_handler(context, expression):
@@ -11,6 +24,63 @@ def _constant_folding_default_handler(context, expression):
     return type(expression)(*(map(fold, expression._values)))
 
 
+@identities.default()
+def _identities_default_handler(context, expression):
+    return expression
+
+
 class ConstantFoldingContext(Context):
     def __init__(self):
         super(ConstantFoldingContext, self).__init__(handler=constant_folding)
+        self._digests = {}
+        self._operand_orders = {}
+        # Folded commutative expressions that were the same as one folded
+        # before, but for the order of their operands
+        self.duplicates_eliminated = 0
+
+    def _handle(self, value):
+        result = super(ConstantFoldingContext, self)._handle(value)
+        if type(result) in commutative_types:
+            result = self._canonical(result)
+        return result
+
+    def _canonical(self, expression):
+        operands = expression._values
+        canonical = type(expression)._from_values(tuple(sorted(operands, key=self.digest)))
+        orders = self._operand_orders.setdefault(canonical, set())
+        if operands not in orders:
+            orders.add(operands)
+            if len(orders) > 1:
+                self.duplicates_eliminated += 1
+        return canonical
+
+    def digest(self, expression):
+        # A digest of the structure of an expression, stable from one run to
+        # the next, unlike hashes. hashlib is only imported when needed, as it
+        # is slow to import.
+        digests = self._digests
+        if expression in digests:
+            return digests[expression]
+        import hashlib
+        stack = [expression]
+        while stack:
+            current = stack[-1]
+            if current in digests:
+                stack.pop()
+                continue
+            pending = [
+                value for value in current._values
+                if isinstance(value, Expression) and value not in digests
+            ]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            data = [type(current).__module__, type(current).__name__]
+            for value in current._values:
+                if isinstance(value, Expression):
+                    data.append(digests[value])
+                else:
+                    data.append("{}:{!r}".format(type(value).__name__, value))
+            digests[current] = hashlib.sha1("\0".join(data).encode("utf-8")).hexdigest()
+        return digests[expression]
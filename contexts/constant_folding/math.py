@@ -5,7 +5,28 @@ import operator
 import functools
 
 from ...expressions.math import *
-from .context import constant_folding
+from ...context import Pattern
+from .context import constant_folding, identities, register_commutative
+
+
+def _loperand(context, expression):
+    return expression.loperand
+
+
+def _roperand(context, expression):
+    return expression.roperand
+
+
+def _operands_equal(expression):
+    return expression.loperand == expression.roperand
+
+
+def _returns(value):
+    return lambda context, expression: value
+
+
+def _raise_zero_division(context, expression):
+    raise ZeroDivisionError
 
 
 def _handle_unary_op(constant_type, func, context, expression):
@@ -42,9 +63,7 @@ def _handle_boolean_and(context, expression):
     right = context.get(expression.roperand)
     if isinstance(left, BooleanConstant) and isinstance(right, BooleanConstant):
         return BooleanConstant(left.value and right.value)
-    elif right == BooleanConstant(False):
-        return BooleanConstant(False)
-    return BooleanAnd(left, right)
+    return identities(context, BooleanAnd(left, right))
 
 
 @constant_folding.handler(BooleanOr)
@@ -55,9 +74,15 @@ def _handle_boolean_or(context, expression):
     right = context.get(expression.roperand)
     if isinstance(left, BooleanConstant) and isinstance(right, BooleanConstant):
         return BooleanConstant(left.value or right.value)
-    elif right == BooleanConstant(True):
-        return BooleanConstant(True)
-    return BooleanOr(left, right)
+    return identities(context, BooleanOr(left, right))
+
+
+identities.register_pattern(
+    Pattern(BooleanAnd, roperand=BooleanConstant(False)), _roperand
+)
+identities.register_pattern(
+    Pattern(BooleanOr, roperand=BooleanConstant(True)), _roperand
+)
 
 
 @constant_folding.handler(ScalarFromInteger)
@@ -120,183 +145,171 @@ def _handle_boolean_from_integer(context, expression):
     return BooleanFromInteger(value)
 
 
-def _handle_add(constant_type, context, expression):
-    left = context.get(expression.loperand)
-    right = context.get(expression.roperand)
-    if isinstance(left, constant_type) and isinstance(right, constant_type):
-        return constant_type(left.value + right.value)
-    elif left == constant_type(0):
-        # Identity: 0 + a = a
-        return right
-    elif right == constant_type(0):
-        # Identity: a + 0 = a
-        return left
-    return type(expression)(left, right)
-
-constant_folding.register_handler(
-    ScalarAdd, functools.partial(_handle_add, ScalarConstant)
-)
-constant_folding.register_handler(
-    IntegerAdd, functools.partial(_handle_add, IntegerConstant)
-)
-
-
-def _handle_subtract(constant_type, context, expression):
-    left = context.get(expression.loperand)
-    right = context.get(expression.roperand)
-    if isinstance(left, constant_type) and isinstance(right, constant_type):
-        return constant_type(left.value - right.value)
-    elif right == constant_type(0):
-        # Identity: a - 0 = a
-        return left
-    elif left == right:
-        # Identity: a - a = 0
-        return constant_type(0)
-    return type(expression)(left, right)
-
-constant_folding.register_handler(
-    ScalarSubtract, functools.partial(_handle_subtract, ScalarConstant)
-)
-constant_folding.register_handler(
-    IntegerSubtract, functools.partial(_handle_subtract, IntegerConstant)
-)
-
-
-def _handle_multiply(constant_type, context, expression):
+def _handle_binary_arithmetic(constant_type, func, context, expression):
     left = context.get(expression.loperand)
     right = context.get(expression.roperand)
     if isinstance(left, constant_type) and isinstance(right, constant_type):
-        return constant_type(left.value * right.value)
-    elif left == constant_type(1):
-        # Identity: 1 * a = a
-        return right
-    elif right == constant_type(1):
-        # Identity: a * 1 = a
-        return left
-    elif left == constant_type(0):
-        # Identity: 0 * a = 0
-        return left
-    elif right == constant_type(0):
-        # Identity: a * 0 = 0
-        return right
-    return type(expression)(left, right)
-
-constant_folding.register_handler(
-    ScalarMultiply, functools.partial(_handle_multiply, ScalarConstant)
-)
-constant_folding.register_handler(
-    IntegerMultiply, functools.partial(_handle_multiply, IntegerConstant)
+        return constant_type(func(left.value, right.value))
+    return identities(context, type(expression)(left, right))
+
+
+def _handle_associative(constant_type, combine, identity, absorbing, context, expression):
+    # Folds every operand, splicing in the operands of folded operands of the
+    # same operation, and combines all the constant operands in one step.
+    # Constants are combined as tuples of their field values.
+    expression_type = type(expression)
+    operands = []
+    constant = identity
+    for operand in expression.operands:
+        operand = context.get(operand)
+        for operand in (
+            operand.operands if type(operand) is expression_type else (operand,)
+        ):
+            if isinstance(operand, constant_type):
+                constant = combine(constant, operand._values)
+            else:
+                operands.append(operand)
+    if constant == absorbing or not operands:
+        return constant_type._from_values(constant)
+    if constant != identity:
+        operands.append(constant_type._from_values(constant))
+    if len(operands) == 1:
+        return operands[0]
+    return expression_type._from_values(tuple(operands))
+
+
+def _combine_components(func):
+    return lambda a, b: tuple(map(func, a, b))
+
+
+for expression_type, constant_type, combine, identity, absorbing in (
+    (IntegerSum, IntegerConstant, _combine_components(operator.add), (0,), None),
+    (IntegerProduct, IntegerConstant, _combine_components(operator.mul), (1,), (0,)),
+    (ScalarSum, ScalarConstant, _combine_components(operator.add), (0.0,), None),
+    (ScalarProduct, ScalarConstant, _combine_components(operator.mul), (1.0,), (0.0,)),
+    (VectorSum, VectorConstant, _combine_components(operator.add), (0.0, 0.0, 0.0), None),
+):
+    constant_folding.register_handler(expression_type, functools.partial(
+        _handle_associative, constant_type, combine, identity, absorbing,
+    ))
+
+
+register_commutative(
+    IntegerSum, IntegerProduct, ScalarSum, ScalarProduct, VectorSum,
+    BooleanAnd, BooleanOr, BooleanEquals, BooleanNotEquals,
+    IntegerEquals, IntegerNotEquals, ScalarEquals, ScalarNotEquals,
+    VectorDotProduct, MatrixAdd,
 )
 
 
-def _handle_divide(constant_type, context, expression):
-    left = context.get(expression.loperand)
-    right = context.get(expression.roperand)
-    if isinstance(left, constant_type) and isinstance(right, constant_type):
-        return constant_type(left.value / right.value)
-    elif right == constant_type(1):
-        # Identity: a / 1 = a
-        return left
-    elif left == constant_type(0):
-        # Identity: 0 / a = 0 (a != 0)
-        return left
-    elif right == constant_type(0):
-        # Identity: 0 / a = 0 (a != 0)
-        raise ZeroDivisionError
-    elif left == right:
-        # Identity: a / a = 1 (a != 0)
-        return constant_type(1)
-    return type(expression)(left, right)
-
-constant_folding.register_handler(
-    ScalarDivide, functools.partial(_handle_divide, ScalarConstant)
+def _handle_reassociated(associative_type, context, expression):
+    # Binary operations are folded as their n-ary form, so that constants
+    # anywhere in a tree of them are brought together and combined, and the
+    # operands of nested operations are spliced into one node
+    return context.get(associative_type(expression.loperand, expression.roperand))
+
+
+for expression_type, associative_type in (
+    (IntegerAdd, IntegerSum),
+    (IntegerMultiply, IntegerProduct),
+    (ScalarAdd, ScalarSum),
+    (ScalarMultiply, ScalarProduct),
+    (VectorAdd, VectorSum),
+):
+    constant_folding.register_handler(
+        expression_type, functools.partial(_handle_reassociated, associative_type),
+    )
+
+
+for expression_type, constant_type in (
+    (ScalarSubtract, ScalarConstant),
+    (IntegerSubtract, IntegerConstant),
+):
+    constant_folding.register_handler(expression_type, functools.partial(
+        _handle_binary_arithmetic, constant_type, operator.sub,
+    ))
+    # Identity: a - 0 = a
+    identities.register_pattern(
+        Pattern(expression_type, roperand=constant_type(0)), _loperand
+    )
+    # Identity: a - a = 0
+    identities.register_pattern(
+        Pattern(expression_type, where=_operands_equal),
+        _returns(constant_type(0)),
+    )
+
+
+for expression_type, constant_type in (
+    (ScalarDivide, ScalarConstant),
+    (IntegerDivide, IntegerConstant),
+):
+    constant_folding.register_handler(expression_type, functools.partial(
+        _handle_binary_arithmetic, constant_type, operator.truediv,
+    ))
+    # Identity: a / 1 = a
+    identities.register_pattern(
+        Pattern(expression_type, roperand=constant_type(1)), _loperand
+    )
+    # Identity: 0 / a = 0 (a != 0)
+    identities.register_pattern(
+        Pattern(expression_type, loperand=constant_type(0)), _loperand
+    )
+    identities.register_pattern(
+        Pattern(expression_type, roperand=constant_type(0)), _raise_zero_division
+    )
+    # Identity: a / a = 1 (a != 0)
+    identities.register_pattern(
+        Pattern(expression_type, where=_operands_equal),
+        _returns(constant_type(1)),
+    )
+
+
+constant_folding.register_handler(ScalarPower, functools.partial(
+    _handle_binary_arithmetic, ScalarConstant, operator.pow,
+))
+# Identity: a ** 1 = a
+identities.register_pattern(
+    Pattern(ScalarPower, roperand=ScalarConstant(1)), _loperand
 )
-constant_folding.register_handler(
-    IntegerDivide, functools.partial(_handle_divide, IntegerConstant)
+# Identity: a ** 0 = 1
+identities.register_pattern(
+    Pattern(ScalarPower, roperand=ScalarConstant(0)), _returns(ScalarConstant(1))
 )
-
-
-def _handle_power(constant_type, context, expression):
-    left = context.get(expression.loperand)
-    right = context.get(expression.roperand)
-    if isinstance(left, constant_type) and isinstance(right, constant_type):
-        return constant_type(left.value ** right.value)
-    elif right == constant_type(1):
-        # Identity: a ** 1 = a
-        return left
-    elif right == constant_type(0):
-        # Identity: a ** 0 = 1
-        return constant_type(1)
-    elif left == constant_type(1):
-        # Identity: 1 ** a = 1
-        return left
-    return type(expression)(left, right)
-
-constant_folding.register_handler(
-    ScalarPower, functools.partial(_handle_power, ScalarConstant)
+# Identity: 1 ** a = 1
+identities.register_pattern(
+    Pattern(ScalarPower, loperand=ScalarConstant(1)), _loperand
 )
 
 
-def _handle_equals(constant_type, func, context, expression):
+def _handle_comparison(constant_type, func, context, expression):
     left = context.get(expression.loperand)
     right = context.get(expression.roperand)
     if isinstance(left, constant_type) and isinstance(right, constant_type):
         return BooleanConstant(func(left.value, right.value))
-    elif left == right:
-        return BooleanConstant(True)
-    return type(expression)(left, right)
-
-
-constant_folding.register_handler(
-    IntegerEquals, functools.partial(_handle_equals, IntegerConstant, operator.eq)
-)
-constant_folding.register_handler(
-    IntegerLessThanEquals, functools.partial(_handle_equals, IntegerConstant, operator.le)
-)
-constant_folding.register_handler(
-    IntegerGreaterThanEquals, functools.partial(_handle_equals, IntegerConstant, operator.ge)
-)
-
-constant_folding.register_handler(
-    ScalarEquals, functools.partial(_handle_equals, ScalarConstant, operator.eq)
-)
-constant_folding.register_handler(
-    ScalarLessThanEquals, functools.partial(_handle_equals, ScalarConstant, operator.le)
-)
-constant_folding.register_handler(
-    ScalarGreaterThanEquals, functools.partial(_handle_equals, ScalarConstant, operator.ge)
-)
-
-
-def _handle_not_equals(constant_type, func, context, expression):
-    left = context.get(expression.loperand)
-    right = context.get(expression.roperand)
-    if isinstance(left, constant_type) and isinstance(right, constant_type):
-        return BooleanConstant(func(left.value, right.value))
-    elif left == right:
-        return BooleanConstant(False)
-    return type(expression)(left, right)
-
-
-constant_folding.register_handler(
-    IntegerNotEquals, functools.partial(_handle_not_equals, IntegerConstant, operator.ne)
-)
-constant_folding.register_handler(
-    IntegerLessThan, functools.partial(_handle_not_equals, IntegerConstant, operator.lt)
-)
-constant_folding.register_handler(
-    IntegerGreaterThan, functools.partial(_handle_not_equals, IntegerConstant, operator.gt)
-)
-
-constant_folding.register_handler(
-    ScalarNotEquals, functools.partial(_handle_not_equals, ScalarConstant, operator.ne)
-)
-constant_folding.register_handler(
-    ScalarLessThan, functools.partial(_handle_not_equals, ScalarConstant, operator.lt)
-)
-constant_folding.register_handler(
-    ScalarGreaterThan, functools.partial(_handle_not_equals, ScalarConstant, operator.gt)
-)
+    return identities(context, type(expression)(left, right))
+
+
+for expression_type, constant_type, func, reflexive in (
+    (IntegerEquals, IntegerConstant, operator.eq, True),
+    (IntegerLessThanEquals, IntegerConstant, operator.le, True),
+    (IntegerGreaterThanEquals, IntegerConstant, operator.ge, True),
+    (ScalarEquals, ScalarConstant, operator.eq, True),
+    (ScalarLessThanEquals, ScalarConstant, operator.le, True),
+    (ScalarGreaterThanEquals, ScalarConstant, operator.ge, True),
+    (IntegerNotEquals, IntegerConstant, operator.ne, False),
+    (IntegerLessThan, IntegerConstant, operator.lt, False),
+    (IntegerGreaterThan, IntegerConstant, operator.gt, False),
+    (ScalarNotEquals, ScalarConstant, operator.ne, False),
+    (ScalarLessThan, ScalarConstant, operator.lt, False),
+    (ScalarGreaterThan, ScalarConstant, operator.gt, False),
+):
+    constant_folding.register_handler(expression_type, functools.partial(
+        _handle_comparison, constant_type, func,
+    ))
+    identities.register_pattern(
+        Pattern(expression_type, where=_operands_equal),
+        _returns(BooleanConstant(reflexive)),
+    )
 
 
 @constant_folding.handler(VectorComponent)
@@ -335,23 +348,6 @@ def _handle_vector_from_scalar(context, expression):
     return VectorFromScalar(x, y, z)
 
 
-@constant_folding.handler(VectorAdd)
-def _handle_vector_add(context, expression):
-    left = context.get(expression.loperand)
-    right = context.get(expression.roperand)
-    if isinstance(left, VectorConstant) and isinstance(right, VectorConstant):
-        return VectorConstant(
-            left.xvalue + right.xvalue,
-            left.yvalue + right.yvalue,
-            left.zvalue + right.zvalue,
-        )
-    elif left == VectorConstant(0, 0, 0):
-        return right
-    elif right == VectorConstant(0, 0, 0):
-        return left
-    return VectorAdd(left, right)
-
-
 @constant_folding.handler(VectorSubtract)
 def _handle_vector_subtract(context, expression):
     left = context.get(expression.loperand)
@@ -362,9 +358,10 @@ def _handle_vector_subtract(context, expression):
             left.yvalue - right.yvalue,
             left.zvalue - right.zvalue,
         )
-    elif right == VectorConstant(0, 0, 0):
-        return left
-    return VectorSubtract(left, right)
+    return identities(context, VectorSubtract(left, right))
+
+
+identities.register_pattern(Pattern(VectorSubtract, roperand=Vector.ZERO), _loperand)
 
 
 @constant_folding.handler(VectorMultiply)
@@ -377,13 +374,16 @@ def _handle_vector_multiply(context, expression):
             vector.yvalue * scalar.value,
             vector.zvalue * scalar.value,
         )
-    elif scalar == ScalarConstant(1):
-        return vector
-    elif scalar == ScalarConstant(0):
-        return VectorConstant(0, 0, 0)
-    elif vector == VectorConstant(0, 0, 0):
-        return VectorConstant(0, 0, 0)
-    return VectorMultiply(vector, scalar)
+    return identities(context, VectorMultiply(vector, scalar))
+
+
+identities.register_pattern(
+    Pattern(VectorMultiply, roperand=ScalarConstant(1)), _loperand
+)
+identities.register_pattern(
+    Pattern(VectorMultiply, roperand=ScalarConstant(0)), _returns(Vector.ZERO)
+)
+identities.register_pattern(Pattern(VectorMultiply, loperand=Vector.ZERO), _loperand)
 
 
 @constant_folding.handler(VectorDivide)
@@ -396,13 +396,16 @@ def _handle_vector_divide(context, expression):
             vector.yvalue / scalar.value,
             vector.zvalue / scalar.value,
         )
-    elif scalar == ScalarConstant(1):
-        return vector
-    elif scalar == ScalarConstant(0):
-        raise ZeroDivisionError
-    elif vector == VectorConstant(0, 0, 0):
-        return vector
-    return VectorDivide(vector, scalar)
+    return identities(context, VectorDivide(vector, scalar))
+
+
+identities.register_pattern(
+    Pattern(VectorDivide, roperand=ScalarConstant(1)), _loperand
+)
+identities.register_pattern(
+    Pattern(VectorDivide, roperand=ScalarConstant(0)), _raise_zero_division
+)
+identities.register_pattern(Pattern(VectorDivide, loperand=Vector.ZERO), _loperand)
 
 
 @constant_folding.handler(VectorDotProduct)
@@ -415,19 +418,25 @@ def _handle_dot_product(context, expression):
             + left.yvalue * right.yvalue
             + left.zvalue * right.zvalue
         )
-    elif left == VectorConstant(0, 0, 0) or right == VectorConstant(0, 0, 0):
-        return ScalarConstant(0)
-    for a, b in ((left, right), (right, left)):
-        if a == VectorConstant(1, 0, 0) and isinstance(b, VectorFromScalar):
-            # Identity: (1,0,0)*(x,y,z) = x
-            return b.x
-        elif a == VectorConstant(0, 1, 0) and isinstance(b, VectorFromScalar):
-            # Identity: (0,1,0)*(x,y,z) = y
-            return b.y
-        elif a == VectorConstant(0, 0, 1) and isinstance(b, VectorFromScalar):
-            # Identity: (0,0,1)*(x,y,z) = z
-            return b.z
-    return VectorDotProduct(left, right)
+    return identities(context, VectorDotProduct(left, right))
+
+
+identities.register_pattern(
+    Pattern(VectorDotProduct, loperand=Vector.ZERO), _returns(ScalarConstant(0))
+)
+identities.register_pattern(
+    Pattern(VectorDotProduct, roperand=Vector.ZERO), _returns(ScalarConstant(0))
+)
+for axis, component in ((Vector.X, "x"), (Vector.Y, "y"), (Vector.Z, "z")):
+    # Identity: (1,0,0)*(x,y,z) = x, etc.
+    identities.register_pattern(
+        Pattern(VectorDotProduct, loperand=axis, roperand=VectorFromScalar),
+        lambda c, e, component=component: getattr(e.roperand, component),
+    )
+    identities.register_pattern(
+        Pattern(VectorDotProduct, loperand=VectorFromScalar, roperand=axis),
+        lambda c, e, component=component: getattr(e.loperand, component),
+    )
 
 
 @constant_folding.handler(VectorCrossProduct)
@@ -440,13 +449,15 @@ def _handle_cross_product(context, expression):
             left.zvalue * right.xvalue - left.xvalue * right.zvalue,
             left.xvalue * right.yvalue - left.yvalue * right.xvalue,
         )
-    elif (
-        left == right
-        or left == VectorConstant(0, 0, 0)
-        or right == VectorConstant(0, 0, 0)
-    ):
-        return VectorConstant(0, 0, 0)
-    return VectorCrossProduct(left, right)
+    return identities(context, VectorCrossProduct(left, right))
+
+
+for pattern in (
+    Pattern(VectorCrossProduct, where=_operands_equal),
+    Pattern(VectorCrossProduct, loperand=Vector.ZERO),
+    Pattern(VectorCrossProduct, roperand=Vector.ZERO),
+):
+    identities.register_pattern(pattern, _returns(Vector.ZERO))
 
 
 @constant_folding.handler(VectorNormalize)
@@ -510,11 +521,11 @@ def _handle_matrix_add(context, expression):
         return MatrixConstant(
             *(a + b for a,b in zip(left._values, right._values))
         )
-    elif left == Matrix.ZERO:
-        return right
-    elif right == Matrix.ZERO:
-        return left
-    return MatrixAdd(left, right)
+    return identities(context, MatrixAdd(left, right))
+
+
+identities.register_pattern(Pattern(MatrixAdd, loperand=Matrix.ZERO), _roperand)
+identities.register_pattern(Pattern(MatrixAdd, roperand=Matrix.ZERO), _loperand)
 
 
 @constant_folding.handler(MatrixSubtract)
@@ -525,11 +536,13 @@ def _handle_matrix_subtract(context, expression):
         return MatrixConstant(
             *(a - b for a,b in zip(left._values, right._values))
         )
-    if right == Matrix.ZERO:
-        return left
-    elif left == right:
-        return Matrix.ZERO
-    return MatrixSubtract(left, right)
+    return identities(context, MatrixSubtract(left, right))
+
+
+identities.register_pattern(Pattern(MatrixSubtract, roperand=Matrix.ZERO), _loperand)
+identities.register_pattern(
+    Pattern(MatrixSubtract, where=_operands_equal), _returns(Matrix.ZERO)
+)
 
 
 @constant_folding.handler(MatrixScalarMultiply)
@@ -538,11 +551,18 @@ def _handle_matrix_scalar_multiply(context, operator):
     scalar = context.get(operator.roperand)
     if isinstance(matrix, MatrixConstant) and isinstance(scalar, ScalarConstant):
         return MatrixConstant(*(a * scalar.value for a in matrix._values))
-    elif scalar == ScalarConstant(1):
-        return matrix
-    elif scalar == ScalarConstant(0) or matrix == Matrix.ZERO:
-        return Matrix.ZERO
-    return MatrixScalarMultiply(matrix, scalar)
+    return identities(context, MatrixScalarMultiply(matrix, scalar))
+
+
+identities.register_pattern(
+    Pattern(MatrixScalarMultiply, roperand=ScalarConstant(1)), _loperand
+)
+identities.register_pattern(
+    Pattern(MatrixScalarMultiply, roperand=ScalarConstant(0)), _returns(Matrix.ZERO)
+)
+identities.register_pattern(
+    Pattern(MatrixScalarMultiply, loperand=Matrix.ZERO), _loperand
+)
 
 
 @constant_folding.handler(MatrixDivide)
@@ -552,13 +572,16 @@ def _handle_matrix_divide(context, operator):
     if isinstance(matrix, MatrixConstant) and isinstance(scalar, ScalarConstant):
         s = scalar.value
         return MatrixConstant(*(a / s for a in matrix._values))
-    elif scalar == ScalarConstant(1):
-        return matrix
-    elif scalar == ScalarConstant(0):
-        raise ZeroDivisionError
-    elif matrix == Matrix.ZERO:
-        return Matrix.ZERO
-    return MatrixDivide(matrix, scalar)
+    return identities(context, MatrixDivide(matrix, scalar))
+
+
+identities.register_pattern(
+    Pattern(MatrixDivide, roperand=ScalarConstant(1)), _loperand
+)
+identities.register_pattern(
+    Pattern(MatrixDivide, roperand=ScalarConstant(0)), _raise_zero_division
+)
+identities.register_pattern(Pattern(MatrixDivide, loperand=Matrix.ZERO), _loperand)
 
 
 @constant_folding.handler(MatrixVectorMultiply)
@@ -576,7 +599,7 @@ def _handle_matrix_vector_multiply(context, expression):
         return vector
     elif matrix == Matrix.ZERO:
         return VectorConstant(0, 0, 0)
-    return VectorMatrixMultiply(vector, matrix)
+    return MatrixVectorMultiply(matrix, vector)
 
 
 @constant_folding.handler(VectorMatrixMultiply)
@@ -597,40 +620,284 @@ def _handle_vector_matrix_multiply(context, expression):
     return VectorMatrixMultiply(vector, matrix)
 
 
+# Most matrices are affine, with a last column of 0, 0, 0, 1, and are
+# multiplied and inverted in their 12 value form: the 3x3 linear part and
+# the translation, row by row. Only constants are checked, and only an
+# exact last column counts: anything else takes the general path.
+def _affine_values(m):
+    # The 12 value form of an affine matrix constant, or None
+    v = m._values
+    if v[3] == 0 and v[7] == 0 and v[11] == 0 and v[15] == 1:
+        return v[0:3] + v[4:7] + v[8:11] + v[12:15]
+    return None
+
+
+def _from_affine_values(v):
+    return MatrixConstant._from_values((
+        v[0], v[1], v[2], 0.0,
+        v[3], v[4], v[5], 0.0,
+        v[6], v[7], v[8], 0.0,
+        v[9], v[10], v[11], 1.0,
+    ))
+
+
+def _affine_product(a, b):
+    a00, a01, a02, a10, a11, a12, a20, a21, a22, a30, a31, a32 = a
+    b00, b01, b02, b10, b11, b12, b20, b21, b22, b30, b31, b32 = b
+    return (
+        a00*b00 + a01*b10 + a02*b20, a00*b01 + a01*b11 + a02*b21, a00*b02 + a01*b12 + a02*b22,
+        a10*b00 + a11*b10 + a12*b20, a10*b01 + a11*b11 + a12*b21, a10*b02 + a11*b12 + a12*b22,
+        a20*b00 + a21*b10 + a22*b20, a20*b01 + a21*b11 + a22*b21, a20*b02 + a21*b12 + a22*b22,
+        a30*b00 + a31*b10 + a32*b20 + b30,
+        a30*b01 + a31*b11 + a32*b21 + b31,
+        a30*b02 + a31*b12 + a32*b22 + b32,
+    )
+
+
+def _affine_inverse(m):
+    # The inverse of the linear part from its adjugate, and the translation
+    # moved back through it
+    a00, a01, a02, a10, a11, a12, a20, a21, a22, t0, t1, t2 = m
+    c00 = a11*a22 - a12*a21
+    c01 = a02*a21 - a01*a22
+    c02 = a01*a12 - a02*a11
+    c10 = a12*a20 - a10*a22
+    c11 = a00*a22 - a02*a20
+    c12 = a02*a10 - a00*a12
+    c20 = a10*a21 - a11*a20
+    c21 = a01*a20 - a00*a21
+    c22 = a00*a11 - a01*a10
+    det = 1.0 / (a00*c00 + a01*c10 + a02*c20)
+    i00, i01, i02 = c00 * det, c01 * det, c02 * det
+    i10, i11, i12 = c10 * det, c11 * det, c12 * det
+    i20, i21, i22 = c20 * det, c21 * det, c22 * det
+    return (
+        i00, i01, i02,
+        i10, i11, i12,
+        i20, i21, i22,
+        -(t0*i00 + t1*i10 + t2*i20),
+        -(t0*i01 + t1*i11 + t2*i21),
+        -(t0*i02 + t1*i12 + t2*i22),
+    )
+
+
+def _matrix_product(m1, m2):
+    a = _affine_values(m1)
+    b = _affine_values(m2)
+    if a is not None and b is not None:
+        return _from_affine_values(_affine_product(a, b))
+    return MatrixConstant(
+        m1.a00*m2.a00 + m1.a01*m2.a10 + m1.a02*m2.a20 + m1.a03*m2.a30,
+        m1.a00*m2.a01 + m1.a01*m2.a11 + m1.a02*m2.a21 + m1.a03*m2.a31,
+        m1.a00*m2.a02 + m1.a01*m2.a12 + m1.a02*m2.a22 + m1.a03*m2.a32,
+        m1.a00*m2.a03 + m1.a01*m2.a13 + m1.a02*m2.a23 + m1.a03*m2.a33,
+        m1.a10*m2.a00 + m1.a11*m2.a10 + m1.a12*m2.a20 + m1.a13*m2.a30,
+        m1.a10*m2.a01 + m1.a11*m2.a11 + m1.a12*m2.a21 + m1.a13*m2.a31,
+        m1.a10*m2.a02 + m1.a11*m2.a12 + m1.a12*m2.a22 + m1.a13*m2.a32,
+        m1.a10*m2.a03 + m1.a11*m2.a13 + m1.a12*m2.a23 + m1.a13*m2.a33,
+        m1.a20*m2.a00 + m1.a21*m2.a10 + m1.a22*m2.a20 + m1.a23*m2.a30,
+        m1.a20*m2.a01 + m1.a21*m2.a11 + m1.a22*m2.a21 + m1.a23*m2.a31,
+        m1.a20*m2.a02 + m1.a21*m2.a12 + m1.a22*m2.a22 + m1.a23*m2.a32,
+        m1.a20*m2.a03 + m1.a21*m2.a13 + m1.a22*m2.a23 + m1.a23*m2.a33,
+        m1.a30*m2.a00 + m1.a31*m2.a10 + m1.a32*m2.a20 + m1.a33*m2.a30,
+        m1.a30*m2.a01 + m1.a31*m2.a11 + m1.a32*m2.a21 + m1.a33*m2.a31,
+        m1.a30*m2.a02 + m1.a31*m2.a12 + m1.a32*m2.a22 + m1.a33*m2.a32,
+        m1.a30*m2.a03 + m1.a31*m2.a13 + m1.a32*m2.a23 + m1.a33*m2.a33,
+    )
+
+
+# Products of matrices whose entries are known, constant or not, such as
+# translation-only or scale-only matrices, are folded entry by entry when
+# that takes only a few scalar operations: terms with a known zero are
+# skipped, known ones need no multiplication, and constant terms are
+# combined. Each scalar operation is a node of its own, or an operation on
+# whole arrays when evaluated numerically, so denser products are left as
+# one matrix product.
+_SPARSE_PRODUCT_OPERATIONS = 3
+
+
+def _matrix_entries(matrix):
+    if isinstance(matrix, MatrixConstant):
+        return [ScalarConstant(value) for value in matrix._values]
+    return list(matrix._values)
+
+
+def _is_zero(scalar):
+    return isinstance(scalar, ScalarConstant) and scalar.value == 0
+
+
+def _is_one(scalar):
+    return isinstance(scalar, ScalarConstant) and scalar.value == 1
+
+
+def _sparse_product(context, left, right):
+    # The product of left and right as a matrix of scalars, or None
+    if not (
+        isinstance(left, (MatrixConstant, MatrixFromScalar))
+        and isinstance(right, (MatrixConstant, MatrixFromScalar))
+    ):
+        return None
+    a = _matrix_entries(left)
+    b = _matrix_entries(right)
+    terms = [
+        [
+            (a[4 * i + k], b[4 * k + j]) for k in range(4)
+            if not _is_zero(a[4 * i + k]) and not _is_zero(b[4 * k + j])
+        ]
+        for i in range(4) for j in range(4)
+    ]
+    operations = 0
+    for entry in terms:
+        unknown = [
+            (x, y) for x, y in entry
+            if not (isinstance(x, ScalarConstant) and isinstance(y, ScalarConstant))
+        ]
+        if unknown:
+            operations += sum(1 for x, y in unknown if not (_is_one(x) or _is_one(y)))
+            summands = len(unknown) + (len(unknown) < len(entry))
+            operations += summands - 1
+    if operations > _SPARSE_PRODUCT_OPERATIONS:
+        return None
+    entries = []
+    for entry in terms:
+        products = [ScalarProduct(x, y) for x, y in entry]
+        if not products:
+            entries.append(ScalarConstant(0))
+        elif len(products) == 1:
+            entries.append(products[0])
+        else:
+            entries.append(ScalarSum(*products))
+    return context.get(MatrixFromScalar(*entries))
+
+
+# A chain of factors is kept as a stack of products, the next factor on top:
+# the last factor for the left operand of a product, the first for the right
+# one, in reverse. Products are split only as far as factors are taken off.
+def _split(factors, reverse):
+    product = factors.pop()
+    if reverse:
+        factors.extend((product.roperand, product.loperand))
+    else:
+        factors.extend((product.loperand, product.roperand))
+
+
+def _next_factor(factors, reverse):
+    factor = factors[-1]
+    while isinstance(factor, MatrixMultiply):
+        factor = factor.loperand if reverse else factor.roperand
+    return factor
+
+
+def _pop_factor(factors, reverse):
+    while isinstance(factors[-1], MatrixMultiply):
+        _split(factors, reverse)
+    factors.pop()
+
+
+def _without_product(factors, product, reverse):
+    # A copy of factors without the factors of product, if they come next,
+    # or None. Products are compared whole before being split, so a product
+    # shared by both is matched at once.
+    factors = list(factors)
+    expected = [product]
+    while expected:
+        if not factors:
+            return None
+        elif factors[-1] == expected[-1]:
+            factors.pop()
+            expected.pop()
+        elif isinstance(factors[-1], MatrixMultiply):
+            _split(factors, reverse)
+        elif isinstance(expected[-1], MatrixMultiply):
+            _split(expected, reverse)
+        else:
+            return None
+    return factors
+
+
+def _cancel(lefts, rights, last, first):
+    # The factors left when an inverse first or last cancels with the
+    # factors before or after it, or None
+    if isinstance(first, MatrixInverse):
+        remaining = _without_product(lefts, first.operand, False)
+        if remaining is not None:
+            _pop_factor(rights, True)
+            return remaining, rights
+    if isinstance(last, MatrixInverse):
+        remaining = _without_product(rights, last.operand, True)
+        if remaining is not None:
+            _pop_factor(lefts, False)
+            return lefts, remaining
+    return None
+
+
 @constant_folding.handler(MatrixMultiply)
 def _handle_matrix_multiply(context, expression):
     left = context.get(expression.loperand)
     right = context.get(expression.roperand)
     if isinstance(left, MatrixConstant) and isinstance(right, MatrixConstant):
-        m1, m2 = left, right
-        return MatrixConstant(
-            m1.a00*m2.a00 + m1.a01*m2.a10 + m1.a02*m2.a20 + m1.a03*m2.a30,
-            m1.a00*m2.a01 + m1.a01*m2.a11 + m1.a02*m2.a21 + m1.a03*m2.a31,
-            m1.a00*m2.a02 + m1.a01*m2.a12 + m1.a02*m2.a22 + m1.a03*m2.a32,
-            m1.a00*m2.a03 + m1.a01*m2.a13 + m1.a02*m2.a23 + m1.a03*m2.a33,
-            m1.a10*m2.a00 + m1.a11*m2.a10 + m1.a12*m2.a20 + m1.a13*m2.a30,
-            m1.a10*m2.a01 + m1.a11*m2.a11 + m1.a12*m2.a21 + m1.a13*m2.a31,
-            m1.a10*m2.a02 + m1.a11*m2.a12 + m1.a12*m2.a22 + m1.a13*m2.a32,
-            m1.a10*m2.a03 + m1.a11*m2.a13 + m1.a12*m2.a23 + m1.a13*m2.a33,
-            m1.a20*m2.a00 + m1.a21*m2.a10 + m1.a22*m2.a20 + m1.a23*m2.a30,
-            m1.a20*m2.a01 + m1.a21*m2.a11 + m1.a22*m2.a21 + m1.a23*m2.a31,
-            m1.a20*m2.a02 + m1.a21*m2.a12 + m1.a22*m2.a22 + m1.a23*m2.a32,
-            m1.a20*m2.a03 + m1.a21*m2.a13 + m1.a22*m2.a23 + m1.a23*m2.a33,
-            m1.a30*m2.a00 + m1.a31*m2.a10 + m1.a32*m2.a20 + m1.a33*m2.a30,
-            m1.a30*m2.a01 + m1.a31*m2.a11 + m1.a32*m2.a21 + m1.a33*m2.a31,
-            m1.a30*m2.a02 + m1.a31*m2.a12 + m1.a32*m2.a22 + m1.a33*m2.a32,
-            m1.a30*m2.a03 + m1.a31*m2.a13 + m1.a32*m2.a23 + m1.a33*m2.a33,
-        )
-    elif left == Matrix.IDENTITY or right == Matrix.ZERO:
-        return right
-    elif right == Matrix.IDENTITY or left == Matrix.ZERO:
-        return left
-    elif (
-        (isinstance(left, MatrixInverse) and left.operand == right)
-        or (isinstance(right, MatrixInverse) and right.operand == left)
-    ):
-        return Matrix.IDENTITY
-    return MatrixMultiply(left, right)
+        return _matrix_product(left, right)
+    # Both operands are folded chains, in which no two constants are next to
+    # each other and nothing cancels, so the chain of their product can only
+    # be reduced where they meet: constant factors, and factors with known
+    # entries making a sparse product, are multiplied together, and M * M^-1
+    # cancels out for M a factor or a run of factors, which may bring further
+    # factors together. Matrix products do not commute, so factors separated
+    # by others stay apart. The operands are only split into factors as far
+    # as needed, so products shared with other expressions, such as parent
+    # transforms, stay shared.
+    lefts = [left]
+    rights = [right]
+    changed = False
+    while lefts and rights:
+        last = _next_factor(lefts, False)
+        first = _next_factor(rights, True)
+        if isinstance(last, MatrixConstant) and isinstance(first, MatrixConstant):
+            product = _matrix_product(last, first)
+        else:
+            product = _sparse_product(context, last, first)
+        if product is not None:
+            _pop_factor(lefts, False)
+            _pop_factor(rights, True)
+            if product != Matrix.IDENTITY:
+                rights.append(product)
+        else:
+            cancelled = _cancel(lefts, rights, last, first)
+            if cancelled is None:
+                break
+            lefts, rights = cancelled
+        changed = True
+    if not changed:
+        return identities(context, MatrixMultiply(left, right))
+    result = None
+    for factor in reversed(lefts):
+        result = factor if result is None else MatrixMultiply(factor, result)
+    for factor in reversed(rights):
+        result = factor if result is None else identities(context, MatrixMultiply(result, factor))
+    return Matrix.IDENTITY if result is None else result
+
+
+identities.register_pattern(Pattern(MatrixMultiply, loperand=Matrix.IDENTITY), _roperand)
+identities.register_pattern(Pattern(MatrixMultiply, roperand=Matrix.ZERO), _roperand)
+identities.register_pattern(Pattern(MatrixMultiply, roperand=Matrix.IDENTITY), _loperand)
+identities.register_pattern(Pattern(MatrixMultiply, loperand=Matrix.ZERO), _loperand)
+# Identity: M^-1 * M = M * M^-1 = I
+identities.register_pattern(
+    Pattern(
+        MatrixMultiply,
+        loperand=MatrixInverse,
+        where=lambda e: e.loperand.operand == e.roperand,
+    ),
+    _returns(Matrix.IDENTITY),
+)
+identities.register_pattern(
+    Pattern(
+        MatrixMultiply,
+        roperand=MatrixInverse,
+        where=lambda e: e.roperand.operand == e.loperand,
+    ),
+    _returns(Matrix.IDENTITY),
+)
 
 
 @constant_folding.handler(MatrixTranspose)
@@ -656,60 +923,66 @@ def _handle_matrix_inverse(context, expression):
     elif isinstance(operand, MatrixInverse):
         return operand.operand
     elif isinstance(operand, MatrixConstant):
-        m = operand
-        aa = (m.a11 * m.a22 * m.a33 - m.a11 * m.a23 * m.a32 -
-              m.a21 * m.a12 * m.a33 + m.a21 * m.a13 * m.a32 +
-              m.a31 * m.a12 * m.a23 - m.a31 * m.a13 * m.a22)
-        ba = (-m.a10 * m.a22 * m.a33 + m.a10 * m.a23 * m.a32 +
-              m.a20 * m.a12 * m.a33 - m.a20 * m.a13 * m.a32 -
-              m.a30 * m.a12 * m.a23 + m.a30 * m.a13 * m.a22)
-        ca = (m.a10 * m.a21 * m.a33 - m.a10 * m.a23 * m.a31 -
-              m.a20 * m.a11 * m.a33 + m.a20 * m.a13 * m.a31 +
-              m.a30 * m.a11 * m.a23 - m.a30 * m.a13 * m.a21)
-        da = (-m.a10  * m.a21 * m.a32 + m.a10  * m.a22 * m.a31 +
-              m.a20 * m.a11 * m.a32 - m.a20 * m.a12 * m.a31 -
-              m.a30 * m.a11 * m.a22 + m.a30 * m.a12 * m.a21)
-        ab = (-m.a01 * m.a22 * m.a33 + m.a01 * m.a23 * m.a32 +
-              m.a21 * m.a02 * m.a33 - m.a21 * m.a03 * m.a32 -
-              m.a31 * m.a02 * m.a23 + m.a31 * m.a03 * m.a22)
-        bb = (m.a00 * m.a22 * m.a33 - m.a00 * m.a23 * m.a32 -
-              m.a20 * m.a02 * m.a33 + m.a20 * m.a03 * m.a32 +
-              m.a30 * m.a02 * m.a23 - m.a30 * m.a03 * m.a22)
-        cb = (-m.a00  * m.a21 * m.a33 + m.a00 * m.a23 * m.a31 +
-              m.a20 * m.a01 * m.a33 - m.a20 * m.a03 * m.a31 -
-              m.a30 * m.a01 * m.a23 + m.a30 * m.a03 * m.a21)
-        db = (m.a00 * m.a21 * m.a32 - m.a00 * m.a22 * m.a31 -
-              m.a20 * m.a01 * m.a32 + m.a20 * m.a02 * m.a31 +
-              m.a30 * m.a01 * m.a22 - m.a30 * m.a02 * m.a21)
-        ac = (m.a01 * m.a12 * m.a33 - m.a01 * m.a13 * m.a32 -
-              m.a11 * m.a02 * m.a33 + m.a11 * m.a03 * m.a32 +
-              m.a31 * m.a02 * m.a13 - m.a31 * m.a03 * m.a12)
-        bc = (-m.a00 * m.a12 * m.a33 + m.a00 * m.a13 * m.a32 +
-              m.a10 * m.a02 * m.a33 - m.a10 * m.a03 * m.a32 -
-              m.a30 * m.a02 * m.a13 + m.a30 * m.a03 * m.a12)
-        cc = (m.a00 * m.a11 * m.a33 - m.a00 * m.a13 * m.a31 -
-              m.a10 * m.a01 * m.a33 + m.a10 * m.a03 * m.a31 +
-              m.a30 * m.a01 * m.a13 - m.a30 * m.a03 * m.a11)
-        dc = (-m.a00 * m.a11 * m.a32 + m.a00 * m.a12 * m.a31 +
-              m.a10 * m.a01 * m.a32 - m.a10 * m.a02 * m.a31 -
-              m.a30 * m.a01 * m.a12 + m.a30 * m.a02 * m.a11)
-        ad = (-m.a01 * m.a12 * m.a23 + m.a01 * m.a13 * m.a22 +
-              m.a11 * m.a02 * m.a23 - m.a11 * m.a03 * m.a22 -
-              m.a21 * m.a02 * m.a13 + m.a21 * m.a03 * m.a12)
-        bd = (m.a00 * m.a12 * m.a23 - m.a00 * m.a13 * m.a22 -
-              m.a10 * m.a02 * m.a23 + m.a10 * m.a03 * m.a22 +
-              m.a20 * m.a02 * m.a13 - m.a20 * m.a03 * m.a12)
-        cd = (-m.a00 * m.a11 * m.a23 + m.a00 * m.a13 * m.a21 +
-              m.a10 * m.a01 * m.a23 - m.a10 * m.a03 * m.a21 -
-              m.a20 * m.a01 * m.a13 + m.a20 * m.a03 * m.a11)
-        dd = (m.a00 * m.a11 * m.a22 - m.a00 * m.a12 * m.a21 - 
-              m.a10 * m.a01 * m.a22 + m.a10 * m.a02 * m.a21 + 
-              m.a20 * m.a01 * m.a12 - m.a20 * m.a02 * m.a11)
-        det = 1.0 / (m.a00 * aa + m.a01 * ba + m.a02 * ca + m.a03 * da)
-        return MatrixConstant(
-            aa * det, ab * det, ac * det, ad * det,
-            ba * det, bb * det, bc * det, bd * det,
-            ca * det, cb * det, cc * det, cd * det,
-            da * det, db * det, dc * det, dd * det,
-        )
+        return _matrix_inverse(operand)
     return MatrixInverse(operand)
+
+
+def _matrix_inverse(m):
+    affine = _affine_values(m)
+    if affine is not None:
+        return _from_affine_values(_affine_inverse(affine))
+    aa = (m.a11 * m.a22 * m.a33 - m.a11 * m.a23 * m.a32 -
+          m.a21 * m.a12 * m.a33 + m.a21 * m.a13 * m.a32 +
+          m.a31 * m.a12 * m.a23 - m.a31 * m.a13 * m.a22)
+    ba = (-m.a10 * m.a22 * m.a33 + m.a10 * m.a23 * m.a32 +
+          m.a20 * m.a12 * m.a33 - m.a20 * m.a13 * m.a32 -
+          m.a30 * m.a12 * m.a23 + m.a30 * m.a13 * m.a22)
+    ca = (m.a10 * m.a21 * m.a33 - m.a10 * m.a23 * m.a31 -
+          m.a20 * m.a11 * m.a33 + m.a20 * m.a13 * m.a31 +
+          m.a30 * m.a11 * m.a23 - m.a30 * m.a13 * m.a21)
+    da = (-m.a10  * m.a21 * m.a32 + m.a10  * m.a22 * m.a31 +
+          m.a20 * m.a11 * m.a32 - m.a20 * m.a12 * m.a31 -
+          m.a30 * m.a11 * m.a22 + m.a30 * m.a12 * m.a21)
+    ab = (-m.a01 * m.a22 * m.a33 + m.a01 * m.a23 * m.a32 +
+          m.a21 * m.a02 * m.a33 - m.a21 * m.a03 * m.a32 -
+          m.a31 * m.a02 * m.a23 + m.a31 * m.a03 * m.a22)
+    bb = (m.a00 * m.a22 * m.a33 - m.a00 * m.a23 * m.a32 -
+          m.a20 * m.a02 * m.a33 + m.a20 * m.a03 * m.a32 +
+          m.a30 * m.a02 * m.a23 - m.a30 * m.a03 * m.a22)
+    cb = (-m.a00  * m.a21 * m.a33 + m.a00 * m.a23 * m.a31 +
+          m.a20 * m.a01 * m.a33 - m.a20 * m.a03 * m.a31 -
+          m.a30 * m.a01 * m.a23 + m.a30 * m.a03 * m.a21)
+    db = (m.a00 * m.a21 * m.a32 - m.a00 * m.a22 * m.a31 -
+          m.a20 * m.a01 * m.a32 + m.a20 * m.a02 * m.a31 +
+          m.a30 * m.a01 * m.a22 - m.a30 * m.a02 * m.a21)
+    ac = (m.a01 * m.a12 * m.a33 - m.a01 * m.a13 * m.a32 -
+          m.a11 * m.a02 * m.a33 + m.a11 * m.a03 * m.a32 +
+          m.a31 * m.a02 * m.a13 - m.a31 * m.a03 * m.a12)
+    bc = (-m.a00 * m.a12 * m.a33 + m.a00 * m.a13 * m.a32 +
+          m.a10 * m.a02 * m.a33 - m.a10 * m.a03 * m.a32 -
+          m.a30 * m.a02 * m.a13 + m.a30 * m.a03 * m.a12)
+    cc = (m.a00 * m.a11 * m.a33 - m.a00 * m.a13 * m.a31 -
+          m.a10 * m.a01 * m.a33 + m.a10 * m.a03 * m.a31 +
+          m.a30 * m.a01 * m.a13 - m.a30 * m.a03 * m.a11)
+    dc = (-m.a00 * m.a11 * m.a32 + m.a00 * m.a12 * m.a31 +
+          m.a10 * m.a01 * m.a32 - m.a10 * m.a02 * m.a31 -
+          m.a30 * m.a01 * m.a12 + m.a30 * m.a02 * m.a11)
+    ad = (-m.a01 * m.a12 * m.a23 + m.a01 * m.a13 * m.a22 +
+          m.a11 * m.a02 * m.a23 - m.a11 * m.a03 * m.a22 -
+          m.a21 * m.a02 * m.a13 + m.a21 * m.a03 * m.a12)
+    bd = (m.a00 * m.a12 * m.a23 - m.a00 * m.a13 * m.a22 -
+          m.a10 * m.a02 * m.a23 + m.a10 * m.a03 * m.a22 +
+          m.a20 * m.a02 * m.a13 - m.a20 * m.a03 * m.a12)
+    cd = (-m.a00 * m.a11 * m.a23 + m.a00 * m.a13 * m.a21 +
+          m.a10 * m.a01 * m.a23 - m.a10 * m.a03 * m.a21 -
+          m.a20 * m.a01 * m.a13 + m.a20 * m.a03 * m.a11)
+    dd = (m.a00 * m.a11 * m.a22 - m.a00 * m.a12 * m.a21 - 
+          m.a10 * m.a01 * m.a22 + m.a10 * m.a02 * m.a21 + 
+          m.a20 * m.a01 * m.a12 - m.a20 * m.a02 * m.a11)
+    det = 1.0 / (m.a00 * aa + m.a01 * ba + m.a02 * ca + m.a03 * da)
+    return MatrixConstant(
+        aa * det, ab * det, ac * det, ad * det,
+        ba * det, bb * det, bc * det, bd * det,
+        ca * det, cb * det, cc * det, cd * det,
+        da * det, db * det, dc * det, dd * det,
+    )
@@ -4,9 +4,11 @@ import math
 import operator
 import functools
 
-from ...expressions.math import Vector, ScalarConstant
+from ...expressions.math import Vector, ScalarConstant, VectorComponent
 from ...expressions.transform import *
-from .context import constant_folding, ConstantFoldingContext
+from ...context import Pattern
+from .context import constant_folding, identities, ConstantFoldingContext
+from .math import _loperand, _roperand, _returns
 
 
 def _translation_matrix(x, y, z):
@@ -21,6 +23,11 @@ def _translation_matrix(x, y, z):
 def _is_constant_rotation(expression):
     if isinstance(expression, RotationIdentity):
         return True
+    if (
+        isinstance(expression, QuaternionRotation)
+        and isinstance(expression.value, QuaternionConstant)
+    ):
+        return True
     if (
         isinstance(expression, EulerRotation)
         and isinstance(expression.x, ScalarConstant)
@@ -91,6 +98,8 @@ def _rotation_matrix(rotation):
             rotation.z.value,
             rotation.order,
         )
+    if isinstance(rotation, QuaternionRotation):
+        return _quaternion_matrix(rotation.value._values)
     raise NotImplementedError("Unsupported rotation constant: {}".format(rotation))
 
 
@@ -103,6 +112,104 @@ def _scale_matrix(x, y, z):
     )
 
 
+# Quaternions are folded as (x, y, z, w) tuples. a * b rotates by a, then
+# by b, so is the Hamilton product b a.
+def _quaternion_product(a, b):
+    ax, ay, az, aw = a
+    bx, by, bz, bw = b
+    return (
+        bw * ax + bx * aw + by * az - bz * ay,
+        bw * ay - bx * az + by * aw + bz * ax,
+        bw * az + bx * ay - by * ax + bz * aw,
+        bw * aw - bx * ax - by * ay - bz * az,
+    )
+
+
+def _quaternion_inverse(q):
+    x, y, z, w = q
+    n = x * x + y * y + z * z + w * w
+    return (-x / n, -y / n, -z / n, w / n)
+
+
+def _quaternion_normalize(q):
+    n = math.sqrt(sum(c * c for c in q))
+    return tuple(c / n for c in q)
+
+
+def _axis_quaternion(axis, deg):
+    half = math.radians(deg) / 2
+    q = [0.0, 0.0, 0.0, math.cos(half)]
+    q[axis] = math.sin(half)
+    return tuple(q)
+
+
+def _euler_quaternion(x, y, z, order):
+    Q1, Q2, Q3 = RotateOrder.sort(
+        _axis_quaternion(0, x), _axis_quaternion(1, y), _axis_quaternion(2, z), order,
+    )
+    return _quaternion_product(_quaternion_product(Q1, Q2), Q3)
+
+
+def _quaternion_rows(q):
+    # The rows of the rotation matrix, scaled back to a unit quaternion
+    x, y, z, w = q
+    s = 2.0 / (x * x + y * y + z * z + w * w)
+    return (
+        (1 - s * (y * y + z * z), s * (x * y + z * w), s * (x * z - y * w)),
+        (s * (x * y - z * w), 1 - s * (x * x + z * z), s * (y * z + x * w)),
+        (s * (x * z + y * w), s * (y * z - x * w), 1 - s * (x * x + y * y)),
+    )
+
+
+def _quaternion_matrix(q):
+    r0, r1, r2 = _quaternion_rows(q)
+    return MatrixConstant(
+        r0[0], r0[1], r0[2], 0,
+        r1[0], r1[1], r1[2], 0,
+        r2[0], r2[1], r2[2], 0,
+        0, 0, 0, 1,
+    )
+
+
+def _euler_axes(order):
+    # The axes in the order they rotate, and the sign of their permutation
+    i, j, k = RotateOrder.sort(0, 1, 2, order)
+    return i, j, k, 1 if (j - i) % 3 == 1 else -1
+
+
+def _quaternion_euler(q, order):
+    # Angles that rotate about the first axis, then the second and the
+    # third. At gimbal lock, the third angle is zero.
+    rows = _quaternion_rows(q)
+    i, j, k, sign = _euler_axes(order)
+    r = lambda a, b: rows[b][a]
+    s = max(-1.0, min(1.0, -sign * r(k, i)))
+    angles = [0.0] * 3
+    angles[j] = math.asin(s)
+    if abs(s) < 1 - 1e-12:
+        angles[i] = math.atan2(sign * r(k, j), r(k, k))
+        angles[k] = math.atan2(sign * r(j, i), r(i, i))
+    else:
+        angles[i] = math.atan2(-sign * r(j, k), r(j, j))
+    return tuple(math.degrees(a) for a in angles)
+
+
+def _slerp(a, b, t):
+    # Along the shortest arc, and linearly when a and b are too close for
+    # the arc's sine to be accurate
+    dot = sum(x * y for x, y in zip(a, b))
+    if dot < 0:
+        b = tuple(-c for c in b)
+        dot = -dot
+    if dot > 0.9995:
+        return _quaternion_normalize(tuple(x + t * (y - x) for x, y in zip(a, b)))
+    theta = math.acos(dot)
+    sin = math.sin(theta)
+    wa = math.sin((1 - t) * theta) / sin
+    wb = math.sin(t * theta) / sin
+    return tuple(wa * x + wb * y for x, y in zip(a, b))
+
+
 def _decompose_translation(m):
     translation = VectorConstant(m.a30, m.a31, m.a32)
     linear = MatrixConstant(
@@ -285,3 +392,179 @@ def _handle_matrix_from_transform(context, expression):
             # Unsupported rotation constant
             pass
     return MatrixFromTransform(transform)
+
+
+@constant_folding.handler(QuaternionFromScalar)
+def _handle_quaternion_from_scalar(context, expression):
+    components = [context.get(c) for c in expression._values]
+    if all(isinstance(c, ScalarConstant) for c in components):
+        return QuaternionConstant(*(c.value for c in components))
+    return QuaternionFromScalar(*components)
+
+
+@constant_folding.handler(QuaternionMultiply)
+def _handle_quaternion_multiply(context, expression):
+    left = context.get(expression.loperand)
+    right = context.get(expression.roperand)
+    if isinstance(left, QuaternionConstant) and isinstance(right, QuaternionConstant):
+        return QuaternionConstant(*_quaternion_product(left._values, right._values))
+    return identities(context, QuaternionMultiply(left, right))
+
+
+identities.register_pattern(
+    Pattern(QuaternionMultiply, loperand=Quaternion.IDENTITY), _roperand
+)
+identities.register_pattern(
+    Pattern(QuaternionMultiply, roperand=Quaternion.IDENTITY), _loperand
+)
+# Identity: q^-1 * q = q * q^-1 = 1
+identities.register_pattern(
+    Pattern(
+        QuaternionMultiply,
+        loperand=QuaternionInverse,
+        where=lambda e: e.loperand.operand == e.roperand,
+    ),
+    _returns(Quaternion.IDENTITY),
+)
+identities.register_pattern(
+    Pattern(
+        QuaternionMultiply,
+        roperand=QuaternionInverse,
+        where=lambda e: e.roperand.operand == e.loperand,
+    ),
+    _returns(Quaternion.IDENTITY),
+)
+
+
+def _operand_of_operand(context, expression):
+    return expression.operand.operand
+
+
+def _operand(context, expression):
+    return expression.operand
+
+
+@constant_folding.handler(QuaternionInverse)
+def _handle_quaternion_inverse(context, expression):
+    operand = context.get(expression.operand)
+    if isinstance(operand, QuaternionConstant):
+        return QuaternionConstant(*_quaternion_inverse(operand._values))
+    return identities(context, QuaternionInverse(operand))
+
+
+identities.register_pattern(
+    Pattern(QuaternionInverse, operand=QuaternionInverse), _operand_of_operand
+)
+
+
+@constant_folding.handler(QuaternionNormalize)
+def _handle_quaternion_normalize(context, expression):
+    operand = context.get(expression.operand)
+    if isinstance(operand, QuaternionConstant):
+        return QuaternionConstant(*_quaternion_normalize(operand._values))
+    return identities(context, QuaternionNormalize(operand))
+
+
+# Already unit length
+identities.register_pattern(
+    Pattern(QuaternionNormalize, operand=QuaternionNormalize), _operand
+)
+identities.register_pattern(
+    Pattern(QuaternionNormalize, operand=QuaternionFromRotation), _operand
+)
+
+
+@constant_folding.handler(QuaternionSlerp)
+def _handle_quaternion_slerp(context, expression):
+    start = context.get(expression.start)
+    end = context.get(expression.end)
+    weight = context.get(expression.weight)
+    if (
+        isinstance(start, QuaternionConstant)
+        and isinstance(end, QuaternionConstant)
+        and isinstance(weight, ScalarConstant)
+    ):
+        return QuaternionConstant(*_slerp(start._values, end._values, weight.value))
+    return identities(context, QuaternionSlerp(start, end, weight))
+
+
+identities.register_pattern(
+    Pattern(QuaternionSlerp, weight=ScalarConstant(0)), lambda context, e: e.start
+)
+identities.register_pattern(
+    Pattern(QuaternionSlerp, weight=ScalarConstant(1)), lambda context, e: e.end
+)
+identities.register_pattern(
+    Pattern(QuaternionSlerp, where=lambda e: e.start == e.end), lambda context, e: e.start
+)
+
+
+@constant_folding.handler(EulerFromQuaternion)
+def _handle_euler_from_quaternion(context, expression):
+    value = context.get(expression.value)
+    if isinstance(value, QuaternionConstant):
+        return VectorConstant(*_quaternion_euler(value._values, expression.order))
+    return EulerFromQuaternion(value, expression.order)
+
+
+def _value_of_value(context, expression):
+    return expression.value.value
+
+
+def _normalized_value_of_value(context, expression):
+    # Quaternions taken from rotations are unit length
+    return context.get(QuaternionNormalize(expression.value.value))
+
+
+def _euler_quaternion_source(rotation):
+    # The quaternion whose Euler angles a rotation was built from, or None
+    angles = set()
+    for i, component in enumerate((rotation.x, rotation.y, rotation.z)):
+        if not isinstance(component, VectorComponent) or component.index != i:
+            return None
+        angles.add(component.value)
+    if len(angles) != 1:
+        return None
+    angles = angles.pop()
+    if isinstance(angles, EulerFromQuaternion) and angles.order == rotation.order:
+        return angles.value
+    return None
+
+
+@constant_folding.handler(QuaternionFromRotation)
+def _handle_quaternion_from_rotation(context, expression):
+    rotation = context.get(expression.value)
+    if isinstance(rotation, RotationIdentity):
+        return Quaternion.IDENTITY
+    if isinstance(rotation, EulerRotation) and _is_constant_rotation(rotation):
+        return QuaternionConstant(*_euler_quaternion(
+            rotation.x.value, rotation.y.value, rotation.z.value, rotation.order,
+        ))
+    return identities(context, QuaternionFromRotation(rotation))
+
+
+identities.register_pattern(
+    Pattern(QuaternionFromRotation, value=QuaternionRotation), _normalized_value_of_value
+)
+# Euler angles of a quaternion, converted back
+identities.register_pattern(
+    Pattern(
+        QuaternionFromRotation,
+        value=EulerRotation,
+        where=lambda e: _euler_quaternion_source(e.value) is not None,
+    ),
+    lambda context, e: context.get(QuaternionNormalize(_euler_quaternion_source(e.value))),
+)
+
+
+@constant_folding.handler(QuaternionRotation)
+def _handle_quaternion_rotation(context, expression):
+    return identities(context, QuaternionRotation(context.get(expression.value)))
+
+
+identities.register_pattern(
+    Pattern(QuaternionRotation, value=Quaternion.IDENTITY), _returns(Rotation.IDENTITY)
+)
+identities.register_pattern(
+    Pattern(QuaternionRotation, value=QuaternionFromRotation), _value_of_value
+)
@@ -1,9 +1,14 @@
 from __future__ import absolute_import
 
-from .context import MayaBuildContext
-from . import (
-    math as _math,
-    transform as _transform,
-    scene as _scene,
-    geometry as _geometry,
-)
+import sys
+
+# Importing pymel takes seconds, so the build context (and with it pymel and
+# the Maya handlers) is only imported when MayaBuildContext is first used.
+if sys.version_info < (3, 7):
+    from .context import MayaBuildContext
+else:
+    def __getattr__(name):
+        if name == "MayaBuildContext":
+            from .context import MayaBuildContext
+            return MayaBuildContext
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -1,12 +1,19 @@
 import pymel.core as pm
 import pymel.core.datatypes as dt
 
+from ... import expressions
 from ...contexts.constant_folding import ConstantFoldingContext
 from ...context import Context, ContextHandler
 
 
 maya_builder = ContextHandler()
 
+for _family in ("math", "transform", "scene", "geometry"):
+    maya_builder.register_lazy_handlers(
+        "{}.{}".format(expressions.__name__, _family),
+        "{}.{}".format(__name__.rsplit(".", 1)[0], _family),
+    )
+
 
 class MayaBuildContext(Context):
     def __init__(self):
@@ -241,3 +248,28 @@ class EulerRotationResult(object):
     def assign_compose_matrix(self, compose):
         self.assign_euler_and_order(compose.inputRotate, compose.inputRotateOrder)
         compose.useEulerRotation.set(True)
+
+    def to_quaternion(self):
+        pm.loadPlugin("quatNodes", quiet=True)
+        node = pm.createNode("eulerToQuat")
+        self.assign_euler_and_order(node.inputRotate, node.inputRotateOrder)
+        return AttributeResult(node.outputQuat)
+
+
+class QuaternionRotationResult(object):
+    def __init__(self, quaternion):
+        self.quaternion = quaternion
+
+    def assign_transform(self, transform):
+        pm.loadPlugin("quatNodes", quiet=True)
+        node = pm.createNode("quatToEuler")
+        self.quaternion.assign(node.inputQuat)
+        transform.rotateOrder.connect(node.inputRotateOrder)
+        node.outputRotate.connect(transform.rotate, f=True)
+
+    def assign_compose_matrix(self, compose):
+        self.quaternion.assign(compose.inputQuat)
+        compose.useEulerRotation.set(False)
+
+    def to_quaternion(self):
+        return self.quaternion
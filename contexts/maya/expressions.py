@@ -86,8 +86,9 @@ is_point_attr = _predicate_from_attr_map(POINT_ATTRS)
 def maya_attr_expression(name, value_type, attr_types, predicate=None):
     tag_name = "_{}Tag".format(name)
     tag_type = _type_hook.register_type(tag_name, attr_types, predicate=predicate)
-    result = cast_expression(name, value_type, tag_type)
-    type_conversions.register_conversion(pm.Attribute, result)
+    with type_conversions.bulk_registration():
+        result = cast_expression(name, value_type, tag_type)
+        type_conversions.register_conversion(pm.Attribute, result)
     return result
 
 
@@ -136,6 +136,11 @@ def _handle_scalar_add(context, expression):
     return _handle_scalar_plus_minus_average(context, values, 1)
 
 
+@maya_builder.handler(ScalarSum)
+def _handle_scalar_sum(context, expression):
+    return _handle_scalar_plus_minus_average(context, expression.operands, 1)
+
+
 @maya_builder.handler(ScalarSubtract)
 def _handle_scalar_subtract(context, expression):
     values = _expand_associative_binary_op(expression, left_associative=True)
@@ -155,6 +160,19 @@ def _handle_scalar_multiply(context, expression):
     return _handle_scalar_multiply_divide_power(context, expression, 1)
 
 
+@maya_builder.handler(ScalarProduct)
+def _handle_scalar_product(context, expression):
+    # multiplyDivide takes two inputs, so products are chained
+    operands = iter(expression.operands)
+    result = context.get(next(operands))
+    for operand in operands:
+        util_node = pm.createNode("multiplyDivide")
+        result.assign(util_node.input1X)
+        context.get(operand).assign(util_node.input2X)
+        result = AttributeResult(util_node.outputX)
+    return result
+
+
 @maya_builder.handler(ScalarDivide)
 def _handle_scalar_divide(context, expression):
     return _handle_scalar_multiply_divide_power(context, expression, 2)
@@ -193,6 +211,11 @@ def _handle_vector_add(context, expression):
     return _handle_vector_plus_minus_average(context, values, 1)
 
 
+@maya_builder.handler(VectorSum)
+def _handle_vector_sum(context, expression):
+    return _handle_vector_plus_minus_average(context, expression.operands, 1)
+
+
 @maya_builder.handler(VectorSubtract)
 def _handle_vector_subtract(context, expression):
     values = _expand_associative_binary_op(expression, left_associative=True)
@@ -13,6 +13,7 @@ from .context import (
     TransformResult,
     MatrixTransformResult,
     EulerRotationResult,
+    QuaternionRotationResult,
 )
 from .expressions import (
     MayaBooleanAttribute,
@@ -134,3 +135,69 @@ def _handle_transform_from_matrix(context, expression):
         return matrix_result.decompose
     except AttributeError:
         return MatrixTransformResult(matrix_result)
+
+
+@maya_builder.handler(QuaternionConstant)
+def _handle_quaternion_constant(context, expression):
+    return ValueResult(dt.Quaternion(*expression._values))
+
+
+@maya_builder.handler(QuaternionFromScalar)
+def _handle_quaternion_from_scalar(context, expression):
+    return CompoundResult(*(context.get(c) for c in expression._values))
+
+
+def _quaternion_node(node_type, **inputs):
+    pm.loadPlugin("quatNodes", quiet=True)
+    node = pm.createNode(node_type)
+    for name, value in inputs.items():
+        value.assign(node.attr(name))
+    return AttributeResult(node.outputQuat)
+
+
+@maya_builder.handler(QuaternionMultiply)
+def _handle_quaternion_multiply(context, expression):
+    return _quaternion_node(
+        "quatProd",
+        input1Quat=context.get(expression.loperand),
+        input2Quat=context.get(expression.roperand),
+    )
+
+
+@maya_builder.handler(QuaternionInverse)
+def _handle_quaternion_inverse(context, expression):
+    return _quaternion_node("quatInvert", inputQuat=context.get(expression.operand))
+
+
+@maya_builder.handler(QuaternionNormalize)
+def _handle_quaternion_normalize(context, expression):
+    return _quaternion_node("quatNormalize", inputQuat=context.get(expression.operand))
+
+
+@maya_builder.handler(QuaternionSlerp)
+def _handle_quaternion_slerp(context, expression):
+    return _quaternion_node(
+        "quatSlerp",
+        input1Quat=context.get(expression.start),
+        input2Quat=context.get(expression.end),
+        inputT=context.get(expression.weight),
+    )
+
+
+@maya_builder.handler(EulerFromQuaternion)
+def _handle_euler_from_quaternion(context, expression):
+    pm.loadPlugin("quatNodes", quiet=True)
+    node = pm.createNode("quatToEuler")
+    context.get(expression.value).assign(node.inputQuat)
+    node.inputRotateOrder.set(_ROTATE_ORDERS[expression.order])
+    return AttributeResult(node.outputRotate)
+
+
+@maya_builder.handler(QuaternionRotation)
+def _handle_quaternion_rotation(context, expression):
+    return QuaternionRotationResult(context.get(expression.value))
+
+
+@maya_builder.handler(QuaternionFromRotation)
+def _handle_quaternion_from_rotation(context, expression):
+    return context.get(expression.value).to_quaternion()
@@ -0,0 +1,11 @@
+from __future__ import absolute_import
+
+from .context import NumpyContext, kernel, kernels, register_kernel, store
+from .planner import BatchPlan
+from .streaming import evaluate_chunks, evaluate_to_files
+from .incremental import IncrementalEvaluator
+from .parallel import ParallelEvaluator
+from .animation import sample_keyframes
+from .bake import bake, ChannelCache
+from . import math as _math
+from . import transform as _transform
@@ -0,0 +1,55 @@
+from __future__ import absolute_import
+
+import numpy
+
+from ...expressions.animation import *
+from .context import kernel, store
+
+
+def _segments(keys):
+    # The Hermite polynomial between each pair of keys, as the coefficients
+    # of a cubic in s, the fraction of the way from one key to the next
+    if keys._arrays is None:
+        times, v0, m1, m0 = [
+            numpy.array(column)
+            for column in (keys.times, keys.values, keys.in_slopes, keys.out_slopes)
+        ]
+        h = numpy.diff(times)
+        v0, v1 = v0[:-1], v0[1:]
+        m0 = m0[:-1] * h
+        m1 = m1[1:] * h
+        coefficients = numpy.stack((
+            v0,
+            m0,
+            3 * (v1 - v0) - 2 * m0 - m1,
+            2 * (v0 - v1) + m0 + m1,
+        ), axis=-1)
+        keys._arrays = (times, 1.0 / h, coefficients)
+    return keys._arrays
+
+
+def sample_keyframes(keys, times, out=None):
+    # Keyframes.sample for an array of times, finding the keys around each
+    # time by binary search
+    times = numpy.asarray(times, dtype=float)
+    if len(keys) == 1:
+        return store(numpy.full(times.shape, keys.values[0]), out)
+    key_times, inverse_lengths, coefficients = _segments(keys)
+    times = numpy.clip(times, key_times[0], key_times[-1])
+    i = numpy.searchsorted(key_times, times, side="right") - 1
+    # Not in place: for a single time, i is a numpy integer
+    i = numpy.minimum(i, len(key_times) - 2)
+    s = (times - key_times[i]) * inverse_lengths[i]
+    c = coefficients[i]
+    result = c[..., 3] * s
+    result += c[..., 2]
+    result *= s
+    result += c[..., 1]
+    result *= s
+    result += c[..., 0]
+    return store(result, out)
+
+
+@kernel(ScalarAnimCurve)
+def _scalar_anim_curve(expression, time, out=None):
+    return sample_keyframes(expression.keys, time, out)
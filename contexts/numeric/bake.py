@@ -0,0 +1,201 @@
+from __future__ import absolute_import
+
+import json
+import struct
+import zlib
+
+import numpy
+
+from ...expressions.animation import CURRENT_TIME
+from .planner import _layout
+from .streaming import DEFAULT_CHUNK_SIZE, _evaluate_chunks
+
+# A channel cache file starts with a header holding the offset of its index,
+# followed by the frame times and the channels' data, and ends with the
+# index: JSON describing the channels and where each chunk of each channel
+# is stored. Uncompressed channels are stored contiguously, chunk after
+# chunk, so they can be memory mapped whole. Compressed chunks have their
+# bytes grouped by significance before compressing, which compresses floats
+# much better.
+_MAGIC = b"EXPYBAKE"
+_HEADER = struct.Struct("<8sQ")
+_VERSION = 1
+
+DEFAULT_BAKE_CHUNK_SIZE = 1024
+
+
+def bake(path, roots, frames, bindings=None, chunk_size=DEFAULT_BAKE_CHUNK_SIZE, compress=False):
+    # Evaluates roots, a mapping of channel names to expressions, at each of
+    # the increasing frame times, with CURRENT_TIME bound to the frame.
+    # bindings may give other inputs as arrays with a value for each frame.
+    # Results are stored in chunks of chunk_size frames, zlib compressed if
+    # compress is set, and evaluated several chunks at a time.
+    names = list(roots)
+    outputs = [roots[name] for name in names]
+    frames = numpy.asarray(frames, dtype=float)
+    if not len(frames):
+        raise ValueError("No frames to bake")
+    if numpy.any(frames[1:] <= frames[:-1]):
+        raise ValueError("Frame times must be increasing")
+    inputs = [CURRENT_TIME]
+    arrays = [frames]
+    for input_, array in (bindings or {}).items():
+        array = numpy.asarray(array)
+        if len(array) != len(frames):
+            raise ValueError("Expected {} samples for {!r}, got {}".format(
+                len(frames), input_, len(array),
+            ))
+        inputs.append(input_)
+        arrays.append(array)
+
+    layouts = [_layout(output) for output in outputs]
+    frame_sizes = [int(numpy.prod(shape)) * dtype.itemsize for shape, dtype in layouts]
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, 0))
+        frame_block = _write_block(f, frames, False)
+        # Uncompressed channels get a contiguous region each
+        regions = []
+        offset = f.tell()
+        for frame_size in frame_sizes:
+            regions.append(offset)
+            offset += len(frames) * frame_size
+        chunks = []
+        batch_size = chunk_size * max(DEFAULT_CHUNK_SIZE // chunk_size, 1)
+        batches = _evaluate_chunks(outputs, inputs, arrays, len(frames), batch_size)
+        for batch_start, batch_stop, values in batches:
+            for start in range(batch_start, batch_stop, chunk_size):
+                stop = min(start + chunk_size, batch_stop)
+                blocks = []
+                for region, frame_size, value in zip(regions, frame_sizes, values):
+                    if not compress:
+                        f.seek(region + start * frame_size)
+                    blocks.append(_write_block(
+                        f, value[start - batch_start:stop - batch_start], compress,
+                    ))
+                chunks.append({"start": start, "stop": stop, "blocks": blocks})
+        f.seek(0, 2)
+        index_offset = f.tell()
+        f.write(json.dumps({
+            "version": _VERSION,
+            "compressed": bool(compress),
+            "chunk_size": chunk_size,
+            "frames": frame_block,
+            "channels": [
+                {"name": name, "dtype": dtype.str, "shape": list(shape)}
+                for name, (shape, dtype) in zip(names, layouts)
+            ],
+            "chunks": chunks,
+        }).encode("utf-8"))
+        f.seek(0)
+        f.write(_HEADER.pack(_MAGIC, index_offset))
+
+
+def _shuffle(array):
+    data = numpy.frombuffer(numpy.ascontiguousarray(array).tobytes(), numpy.uint8)
+    return data.reshape(-1, array.dtype.itemsize).T.tobytes()
+
+
+def _unshuffle(data, dtype):
+    data = numpy.frombuffer(data, numpy.uint8)
+    return numpy.frombuffer(data.reshape(dtype.itemsize, -1).T.tobytes(), dtype)
+
+
+def _write_block(f, array, compress):
+    if compress:
+        data = zlib.compress(_shuffle(array))
+    else:
+        data = numpy.ascontiguousarray(array).tobytes()
+    offset = f.tell()
+    f.write(data)
+    return [offset, len(data)]
+
+
+# Reads a channel cache written by bake. Channels are read as arrays with a
+# leading frame axis: memory maps of the file for uncompressed caches, and
+# decompressed a chunk at a time otherwise.
+class ChannelCache(object):
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, index_offset = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != _MAGIC or not index_offset:
+                raise ValueError("Not a channel cache: {}".format(path))
+            f.seek(index_offset)
+            index = json.loads(f.read().decode("utf-8"))
+        if index["version"] != _VERSION:
+            raise ValueError("Unsupported channel cache version {}".format(index["version"]))
+        self.compressed = index["compressed"]
+        self.chunk_size = index["chunk_size"]
+        self._chunks = index["chunks"]
+        self._channels = dict(
+            (channel["name"], (i, numpy.dtype(channel["dtype"]), tuple(channel["shape"])))
+            for i, channel in enumerate(index["channels"])
+        )
+        self.names = [channel["name"] for channel in index["channels"]]
+        offset, size = index["frames"]
+        self.frames = numpy.memmap(
+            path, dtype=float, mode="r", offset=offset,
+            shape=(size // numpy.dtype(float).itemsize,),
+        )
+        self._arrays = {}
+        self._bytes = None
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __contains__(self, name):
+        return name in self._channels
+
+    def __getitem__(self, name):
+        return self.read(name)
+
+    def _array(self, name, chunk=None):
+        # The memory map of an uncompressed channel, or the decompressed
+        # values of a chunk of a compressed one. Keeps the last chunk read of
+        # each channel.
+        key, array = self._arrays.get(name, (None, None))
+        if array is None or key != chunk:
+            i, dtype, shape = self._channels[name]
+            offset, size = self._chunks[chunk or 0]["blocks"][i]
+            if chunk is None:
+                array = numpy.memmap(
+                    self.path, dtype=dtype, mode="r", offset=offset,
+                    shape=(len(self),) + shape,
+                )
+            else:
+                if self._bytes is None:
+                    self._bytes = numpy.memmap(self.path, dtype=numpy.uint8, mode="r")
+                data = zlib.decompress(self._bytes[offset:offset + size])
+                array = _unshuffle(data, dtype).reshape((-1,) + shape)
+            self._arrays[name] = (chunk, array)
+        return array
+
+    def read(self, name, start=0, stop=None):
+        # Values of a channel for frames start to stop, by position
+        try:
+            i, dtype, shape = self._channels[name]
+        except KeyError:
+            raise KeyError("No channel {!r}".format(name))
+        start, stop, _ = slice(start, stop).indices(len(self))
+        stop = max(start, stop)
+        if not self.compressed:
+            return self._array(name)[start:stop]
+        first = start // self.chunk_size
+        last = -(-stop // self.chunk_size)
+        parts = [
+            self._array(name, chunk)[
+                max(start - chunk * self.chunk_size, 0):stop - chunk * self.chunk_size
+            ]
+            for chunk in range(first, last)
+        ]
+        if not parts:
+            return numpy.zeros((0,) + shape, dtype)
+        return numpy.concatenate(parts)
+
+    def frame(self, time):
+        # The value of each channel at a frame time
+        i = int(numpy.searchsorted(self.frames, time))
+        if i == len(self) or self.frames[i] != time:
+            raise KeyError("No frame at {}".format(time))
+        return dict((name, self.read(name, i, i + 1)[0]) for name in self.names)
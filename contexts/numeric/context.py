@@ -0,0 +1,81 @@
+from __future__ import absolute_import
+
+import functools
+
+import numpy
+
+from ...expression import Expression
+from ...context import Context, ContextHandler
+from ..constant_folding import ConstantFoldingContext
+
+
+numpy_evaluator = ContextHandler()
+
+# Kernels compute the value of an expression from the values of its
+# expression fields, in field order. Other fields (e.g. a component index)
+# are read from the expression itself. Values are arrays with a leading
+# batch axis, or without one if they are the same for every sample, such as
+# constants, and are broadcast against each other:
+#   Boolean, Integer, Scalar  (N,)
+#   Vector                    (N, 3)
+#   Quaternion                (N, 4)
+#   Matrix, Rotation, Transform  (N, 4, 4)
+# Kernels also accept an out keyword argument: a preallocated array of the
+# result's shape that the result is written to, and which is returned.
+kernels = {}
+
+
+def register_kernel(expression_type, func):
+    kernels[expression_type] = func
+    numpy_evaluator.register_handler(
+        expression_type, functools.partial(_handle_kernel, func),
+    )
+
+
+def kernel(*expression_types):
+    def decorator(func):
+        for expression_type in expression_types:
+            register_kernel(expression_type, func)
+        return func
+    return decorator
+
+
+def _handle_kernel(func, context, expression):
+    operands = [
+        context.get(value) for value in expression._values
+        if isinstance(value, Expression)
+    ]
+    return func(expression, *operands)
+
+
+def store(value, out):
+    if out is None:
+        return value
+    out[...] = value
+    return out
+
+
+@numpy_evaluator.default()
+def _unbound_handler(context, expression):
+    raise KeyError("No value bound for {!r}".format(expression))
+
+
+# Evaluates expressions for a whole batch of samples in one pass over the
+# graph. Leaf expressions (e.g. Maya attributes) are bound to arrays holding
+# their value for each sample.
+class NumpyContext(Context):
+
+    def __init__(self, bindings=None):
+        super(NumpyContext, self).__init__(
+            handler=numpy_evaluator,
+            parent=ConstantFoldingContext(),
+        )
+        self.bindings = {}
+        for expression, value in (bindings or {}).items():
+            self.bindings[expression] = numpy.asarray(value)
+
+    def _handle(self, value):
+        try:
+            return self.bindings[value]
+        except KeyError:
+            return self.handler(self, value)
@@ -0,0 +1,94 @@
+from __future__ import absolute_import
+
+import numpy
+
+from .planner import _find_kernel, _fold, _operands, _topological_order
+
+
+# Keeps the value of every node between evaluations, and recomputes only
+# the nodes downstream of inputs whose values changed, as Maya's dependency
+# graph does. Setting an input marks its consumers dirty, following a
+# consumer index built up front and stopping at nodes already dirty, and
+# evaluate recomputes the dirty nodes in topological order. The work per
+# update is proportional to the number of nodes depending on what changed.
+#
+# Values may be single samples or batches, as for NumpyContext.
+class IncrementalEvaluator(object):
+
+    def __init__(self, outputs, inputs):
+        self.outputs = list(outputs)
+        self.inputs = list(inputs)
+        self.recomputed = 0
+
+        folded_outputs, folded_inputs = _fold(self.outputs, self.inputs)
+        order = _topological_order(folded_outputs + folded_inputs, set(folded_inputs))
+        indices = dict((expression, i) for i, expression in enumerate(order))
+        self._nodes = order
+        self._kernels = [None] * len(order)
+        self._operands = [()] * len(order)
+        self._consumers = [[] for _ in order]
+        self._values = [None] * len(order)
+        self._dirty = [False] * len(order)
+        self._dirty_nodes = []
+        self._input_nodes = [indices[input_] for input_ in folded_inputs]
+        self._input_indices = dict(zip(self.inputs, self._input_nodes))
+        self._output_nodes = [indices[output] for output in folded_outputs]
+
+        varying = set(self._input_nodes)
+        for i, expression in enumerate(order):
+            if i in varying:
+                continue
+            operands = tuple(indices[operand] for operand in _operands(expression))
+            self._kernels[i] = _find_kernel(expression)
+            self._operands[i] = operands
+            if any(operand in varying for operand in operands):
+                varying.add(i)
+                for operand in set(operands):
+                    self._consumers[operand].append(i)
+                self._mark(i)
+            else:
+                self._values[i] = self._compute(i)
+
+    def _compute(self, i):
+        return self._kernels[i](
+            self._nodes[i], *[self._values[operand] for operand in self._operands[i]]
+        )
+
+    def _mark(self, i):
+        stack = [i]
+        while stack:
+            i = stack.pop()
+            if not self._dirty[i]:
+                self._dirty[i] = True
+                self._dirty_nodes.append(i)
+                stack.extend(self._consumers[i])
+
+    def set_value(self, input_, value):
+        try:
+            i = self._input_indices[input_]
+        except KeyError:
+            raise KeyError("Not an input: {!r}".format(input_))
+        # Copied, so a caller updating its array in place is noticed
+        value = numpy.array(value)
+        previous = self._values[i]
+        if previous is not None and numpy.array_equal(previous, value):
+            return
+        self._values[i] = value
+        for consumer in self._consumers[i]:
+            self._mark(consumer)
+
+    def set_values(self, bindings):
+        for input_, value in bindings.items():
+            self.set_value(input_, value)
+
+    def evaluate(self):
+        for i in self._input_nodes:
+            if self._values[i] is None:
+                raise KeyError("No value bound for {!r}".format(self._nodes[i]))
+        dirty_nodes = sorted(self._dirty_nodes)
+        for i in dirty_nodes:
+            self._values[i] = self._compute(i)
+            self._dirty[i] = False
+        self._dirty_nodes = []
+        self.recomputed = len(dirty_nodes)
+        return [self._values[i] for i in self._output_nodes]
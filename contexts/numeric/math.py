@@ -0,0 +1,248 @@
+from __future__ import absolute_import, division
+
+import numpy
+
+from ...expressions.math import *
+from .context import kernel, register_kernel, store
+
+
+@kernel(BooleanConstant)
+def _boolean_constant(expression, out=None):
+    return store(numpy.asarray(expression.value, dtype=bool), out)
+
+
+@kernel(IntegerConstant)
+def _integer_constant(expression, out=None):
+    return store(numpy.asarray(expression.value, dtype=int), out)
+
+
+@kernel(ScalarConstant)
+def _scalar_constant(expression, out=None):
+    return store(numpy.asarray(expression.value, dtype=float), out)
+
+
+@kernel(VectorConstant)
+def _vector_constant(expression, out=None):
+    return store(numpy.array(expression._values), out)
+
+
+@kernel(MatrixConstant)
+def _matrix_constant(expression, out=None):
+    return store(numpy.array(expression._values).reshape(4, 4), out)
+
+
+@kernel(ScalarFromInteger, ScalarFromBoolean)
+def _scalar_cast(expression, value, out=None):
+    if out is None:
+        return value.astype(float)
+    return store(value, out)
+
+
+@kernel(IntegerFromScalar, IntegerFromBoolean)
+def _integer_cast(expression, value, out=None):
+    # int() truncates towards zero, as do astype and assignment
+    if out is None:
+        return value.astype(int)
+    return store(value, out)
+
+
+@kernel(BooleanFromScalar, BooleanFromInteger)
+def _boolean_cast(expression, value, out=None):
+    return numpy.not_equal(value, 0, out=out)
+
+
+def _unary_kernel(func):
+    return lambda expression, operand, out=None: func(operand, out=out)
+
+
+def _binary_kernel(func):
+    return lambda expression, left, right, out=None: func(left, right, out=out)
+
+
+def _associative_kernel(func):
+    # Accumulates into out, which is never one of the operands. Operations
+    # on single values give numpy scalars, which can't be written to, so
+    # the first result is made an array.
+    def kernel(expression, first, second, *rest, **kwargs):
+        out = numpy.asarray(func(first, second, out=kwargs.get("out")))
+        for operand in rest:
+            if out.shape == numpy.broadcast_shapes(out.shape, numpy.shape(operand)):
+                func(out, operand, out=out)
+            else:
+                out = func(out, operand)
+        return out
+    return kernel
+
+
+def _cross(left, right, out=None):
+    return store(numpy.cross(left, right), out)
+
+
+register_kernel(BooleanInverse, _unary_kernel(numpy.logical_not))
+
+for expression_type, func in (
+    (IntegerSum, numpy.add),
+    (IntegerProduct, numpy.multiply),
+    (ScalarSum, numpy.add),
+    (ScalarProduct, numpy.multiply),
+    (VectorSum, numpy.add),
+):
+    register_kernel(expression_type, _associative_kernel(func))
+
+for expression_type, func in (
+    (BooleanAnd, numpy.logical_and),
+    (BooleanOr, numpy.logical_or),
+    (BooleanEquals, numpy.equal),
+    (BooleanNotEquals, numpy.not_equal),
+    (IntegerAdd, numpy.add),
+    (IntegerSubtract, numpy.subtract),
+    (IntegerMultiply, numpy.multiply),
+    (IntegerEquals, numpy.equal),
+    (IntegerNotEquals, numpy.not_equal),
+    (IntegerGreaterThan, numpy.greater),
+    (IntegerGreaterThanEquals, numpy.greater_equal),
+    (IntegerLessThan, numpy.less),
+    (IntegerLessThanEquals, numpy.less_equal),
+    (ScalarAdd, numpy.add),
+    (ScalarSubtract, numpy.subtract),
+    (ScalarMultiply, numpy.multiply),
+    (ScalarDivide, numpy.true_divide),
+    (ScalarPower, numpy.power),
+    (ScalarEquals, numpy.equal),
+    (ScalarNotEquals, numpy.not_equal),
+    (ScalarGreaterThan, numpy.greater),
+    (ScalarGreaterThanEquals, numpy.greater_equal),
+    (ScalarLessThan, numpy.less),
+    (ScalarLessThanEquals, numpy.less_equal),
+    (VectorAdd, numpy.add),
+    (VectorSubtract, numpy.subtract),
+    (VectorCrossProduct, _cross),
+    (MatrixAdd, numpy.add),
+    (MatrixSubtract, numpy.subtract),
+    (MatrixMultiply, numpy.matmul),
+):
+    register_kernel(expression_type, _binary_kernel(func))
+
+
+@kernel(IntegerDivide)
+def _integer_divide(expression, left, right, out=None):
+    # Constant folding divides and truncates the quotient towards zero
+    return store(numpy.trunc(numpy.true_divide(left, right)).astype(int), out)
+
+
+@kernel(VectorComponent)
+def _vector_component(expression, vector, out=None):
+    return store(vector[..., expression.index], out)
+
+
+@kernel(VectorFromScalar)
+def _vector_from_scalar(expression, x, y, z, out=None):
+    if out is None:
+        out = numpy.empty(numpy.broadcast(x, y, z).shape + (3,))
+    for i, component in enumerate((x, y, z)):
+        out[..., i] = component
+    return out
+
+
+@kernel(VectorMultiply)
+def _vector_multiply(expression, vector, scalar, out=None):
+    return numpy.multiply(vector, scalar[..., None], out=out)
+
+
+@kernel(VectorDivide)
+def _vector_divide(expression, vector, scalar, out=None):
+    return numpy.true_divide(vector, scalar[..., None], out=out)
+
+
+@kernel(VectorDotProduct)
+def _vector_dot_product(expression, left, right, out=None):
+    return numpy.einsum("...i,...i->...", left, right, out=out)
+
+
+def _length(vector, out=None):
+    squared = numpy.einsum("...i,...i->...", vector, vector, out=out)
+    return numpy.sqrt(squared, out=out)
+
+
+@kernel(VectorLength)
+def _vector_length(expression, vector, out=None):
+    return _length(vector, out)
+
+
+@kernel(VectorNormalize)
+def _vector_normalize(expression, vector, out=None):
+    return numpy.true_divide(vector, _length(vector)[..., None], out=out)
+
+
+@kernel(MatrixFromScalar)
+def _matrix_from_scalar(expression, *scalars, **kwargs):
+    out = kwargs.get("out")
+    if out is None:
+        out = numpy.empty(numpy.broadcast(*scalars).shape + (4, 4))
+    for i, component in enumerate(scalars):
+        out[..., i // 4, i % 4] = component
+    return out
+
+
+@kernel(MatrixComponent)
+def _matrix_component(expression, matrix, out=None):
+    return store(matrix[..., expression.row, expression.column], out)
+
+
+def _is_affine(matrix):
+    return not numpy.any(matrix[..., :3, 3]) and numpy.all(matrix[..., 3, 3] == 1)
+
+
+def _affine_inverse(matrix, out=None):
+    # The inverse of the linear part from its adjugate, and the translation
+    # moved back through it, which is much faster than a general inverse
+    r0 = matrix[..., 0, :3]
+    r1 = matrix[..., 1, :3]
+    r2 = matrix[..., 2, :3]
+    adjugate = numpy.stack((_cross(r1, r2), _cross(r2, r0), _cross(r0, r1)), axis=-1)
+    det = numpy.einsum("...i,...i->...", r0, adjugate[..., :, 0])
+    if not numpy.all(det):
+        raise numpy.linalg.LinAlgError("Singular matrix")
+    if out is None:
+        out = numpy.empty(matrix.shape)
+    numpy.true_divide(adjugate, det[..., None, None], out=out[..., :3, :3])
+    numpy.negative(
+        numpy.einsum("...i,...ij->...j", matrix[..., 3, :3], out[..., :3, :3]),
+        out=out[..., 3, :3],
+    )
+    out[..., :3, 3] = 0
+    out[..., 3, 3] = 1
+    return out
+
+
+@kernel(MatrixInverse)
+def _matrix_inverse(expression, matrix, out=None):
+    if _is_affine(matrix):
+        return _affine_inverse(matrix, out)
+    return store(numpy.linalg.inv(matrix), out)
+
+
+@kernel(MatrixTranspose)
+def _matrix_transpose(expression, matrix, out=None):
+    return store(numpy.swapaxes(matrix, -1, -2), out)
+
+
+@kernel(MatrixScalarMultiply)
+def _matrix_scalar_multiply(expression, matrix, scalar, out=None):
+    return numpy.multiply(matrix, scalar[..., None, None], out=out)
+
+
+@kernel(MatrixDivide)
+def _matrix_divide(expression, matrix, scalar, out=None):
+    return numpy.true_divide(matrix, scalar[..., None, None], out=out)
+
+
+@kernel(VectorMatrixMultiply)
+def _vector_matrix_multiply(expression, vector, matrix, out=None):
+    # Directions: v * M with translation ignored
+    return numpy.einsum("...i,...ij->...j", vector, matrix[..., :3, :3], out=out)
+
+
+@kernel(MatrixVectorMultiply)
+def _matrix_vector_multiply(expression, matrix, vector, out=None):
+    return numpy.einsum("...ij,...j->...i", matrix[..., :3, :3], vector, out=out)
@@ -0,0 +1,174 @@
+from __future__ import absolute_import, division
+
+import multiprocessing
+
+import numpy
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:
+    shared_memory = None
+
+from .planner import BatchPlan, _layout
+from .streaming import DEFAULT_CHUNK_SIZE
+
+
+# State of a worker process, set up once by _initialize_worker
+_worker = {}
+
+
+def _initialize_worker(outputs, inputs):
+    _worker["outputs"] = outputs
+    _worker["inputs"] = inputs
+    _worker["plans"] = {}
+    _worker["blocks"] = {}
+
+
+def _attach(name):
+    # Workers only map the parent's blocks, the parent unlinks them
+    blocks = _worker["blocks"]
+    try:
+        return blocks[name]
+    except KeyError:
+        block = blocks[name] = shared_memory.SharedMemory(name=name)
+        return block
+
+
+def _view(spec, start, stop):
+    name, shape, dtype = spec
+    array = numpy.ndarray(shape, dtype, buffer=_attach(name).buf)
+    return array[start:stop]
+
+
+def _release(names):
+    blocks = _worker["blocks"]
+    for name in list(blocks):
+        if name not in names:
+            blocks.pop(name).close()
+
+
+def _evaluate_range(task):
+    start, stop, input_specs, output_specs = task
+    _release(set(spec[0] for spec in input_specs + output_specs))
+    plans = _worker["plans"]
+    try:
+        plan = plans[stop - start]
+    except KeyError:
+        plan = plans[stop - start] = BatchPlan(
+            _worker["outputs"], _worker["inputs"], stop - start,
+        )
+    bindings = dict(
+        (input_, _view(spec, start, stop))
+        for input_, spec in zip(_worker["inputs"], input_specs)
+    )
+    plan.evaluate(bindings, out=[_view(spec, start, stop) for spec in output_specs])
+
+
+class _SharedArray(object):
+
+    def __init__(self, shape, dtype):
+        dtype = numpy.dtype(dtype)
+        size = max(int(numpy.prod(shape)) * dtype.itemsize, 1)
+        self.block = shared_memory.SharedMemory(create=True, size=size)
+        self.array = numpy.ndarray(shape, dtype, buffer=self.block.buf)
+        self.spec = (self.block.name, shape, dtype.str)
+
+    def release(self):
+        self.array = None
+        self.block.close()
+        self.block.unlink()
+
+
+# Evaluates outputs for batches of samples on a pool of worker processes,
+# each evaluating a range of the batch with a BatchPlan. The outputs and
+# inputs are sent to each worker once, when the pool starts. Inputs are
+# copied to, and outputs computed in, shared memory blocks that the workers
+# map, so the tasks sent to them only hold a range and the blocks' names.
+#
+# The blocks are kept for following calls with the same number of samples.
+# Close the evaluator, or use it as a context manager, to stop the workers
+# and free the blocks.
+class ParallelEvaluator(object):
+
+    def __init__(self, outputs, inputs, processes=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        if shared_memory is None:
+            raise NotImplementedError("Parallel evaluation requires Python 3.8 or later")
+        self.outputs = list(outputs)
+        self.inputs = list(inputs)
+        self.processes = processes or multiprocessing.cpu_count()
+        self.chunk_size = chunk_size
+        self._layouts = (
+            [_layout(input_) for input_ in self.inputs],
+            [_layout(output) for output in self.outputs],
+        )
+        self._frame_count = None
+        self._input_arrays = []
+        self._output_arrays = []
+        # Workers must share the parent's resource tracker, or their own
+        # would unlink the blocks they attached to when they exit
+        resource_tracker.ensure_running()
+        self._pool = multiprocessing.Pool(
+            self.processes, _initialize_worker, (self.outputs, self.inputs),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _allocate(self, frame_count):
+        if frame_count == self._frame_count:
+            return
+        self._release()
+        input_layouts, output_layouts = self._layouts
+        self._input_arrays = [
+            _SharedArray((frame_count,) + shape, dtype) for shape, dtype in input_layouts
+        ]
+        self._output_arrays = [
+            _SharedArray((frame_count,) + shape, dtype) for shape, dtype in output_layouts
+        ]
+        self._frame_count = frame_count
+
+    def _release(self):
+        for shared in self._input_arrays + self._output_arrays:
+            shared.release()
+        self._input_arrays = []
+        self._output_arrays = []
+        self._frame_count = None
+
+    def _tasks(self, frame_count):
+        # Ranges of at most chunk_size samples, with at least one per worker
+        step = min(self.chunk_size, -(-frame_count // self.processes))
+        input_specs = [shared.spec for shared in self._input_arrays]
+        output_specs = [shared.spec for shared in self._output_arrays]
+        return [
+            (start, min(start + step, frame_count), input_specs, output_specs)
+            for start in range(0, frame_count, max(step, 1))
+        ]
+
+    def evaluate(self, bindings):
+        arrays = []
+        for input_ in self.inputs:
+            try:
+                arrays.append(numpy.asarray(bindings[input_]))
+            except KeyError:
+                raise KeyError("No value bound for {!r}".format(input_))
+        lengths = set(len(array) for array in arrays)
+        if not lengths:
+            raise ValueError("No inputs bound")
+        if len(lengths) > 1:
+            raise ValueError("Inputs have different lengths: {}".format(sorted(lengths)))
+        frame_count = lengths.pop()
+        self._allocate(frame_count)
+        for shared, array in zip(self._input_arrays, arrays):
+            shared.array[...] = array
+        self._pool.map(_evaluate_range, self._tasks(frame_count), chunksize=1)
+        return [shared.array.copy() for shared in self._output_arrays]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        self._release()
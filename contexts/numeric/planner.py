@@ -0,0 +1,213 @@
+from __future__ import absolute_import
+
+from collections import defaultdict
+
+import numpy
+
+from ...expression import Expression
+from ...expressions.math import Boolean, Integer, Scalar, Vector, Matrix
+from ...expressions.transform import Rotation, Transform, Quaternion
+from ..constant_folding import ConstantFoldingContext
+from .context import kernels, store
+
+
+_LAYOUTS = (
+    (Boolean, (), numpy.dtype(bool)),
+    (Integer, (), numpy.dtype(int)),
+    (Scalar, (), numpy.dtype(float)),
+    (Vector, (3,), numpy.dtype(float)),
+    (Quaternion, (4,), numpy.dtype(float)),
+    ((Matrix, Rotation, Transform), (4, 4), numpy.dtype(float)),
+)
+
+
+def _layout(expression):
+    # The per sample shape and dtype of an expression's value
+    for expression_type, shape, dtype in _LAYOUTS:
+        if isinstance(expression, expression_type):
+            return shape, dtype
+    raise TypeError("Cannot evaluate {!r} in batches".format(expression))
+
+
+def _find_kernel(expression):
+    for base in type(expression).mro():
+        try:
+            return kernels[base]
+        except KeyError:
+            continue
+    raise KeyError("No value bound for {!r}".format(expression))
+
+
+def _operands(expression):
+    return [
+        value for value in expression._values if isinstance(value, Expression)
+    ]
+
+
+def _topological_order(roots, leaves):
+    # Post order over the graph, without recursing so deep graphs are fine
+    order = []
+    visited = set()
+    for root in roots:
+        if root in visited:
+            continue
+        visited.add(root)
+        stack = [(root, iter(() if root in leaves else _operands(root)))]
+        while stack:
+            expression, operands = stack[-1]
+            for operand in operands:
+                if operand not in visited:
+                    visited.add(operand)
+                    stack.append((
+                        operand,
+                        iter(() if operand in leaves else _operands(operand)),
+                    ))
+                    break
+            else:
+                stack.pop()
+                order.append(expression)
+    return order
+
+
+def _fold(outputs, inputs):
+    # Folding operands first keeps the folding context's recursion shallow
+    # on deep graphs. Returns the folded outputs and inputs.
+    folding = ConstantFoldingContext()
+    for expression in _topological_order(outputs, set(inputs)):
+        folding.get(expression)
+    return (
+        [folding.get(output) for output in outputs],
+        [folding.get(input_) for input_ in inputs],
+    )
+
+
+def _copy(expression, value, out=None):
+    return store(value, out)
+
+
+# Evaluates expressions for batches of batch_size samples with a fixed set of
+# preallocated arrays. Nodes are run in topological order, and once the last
+# node reading a value has run, the value's array is returned to a pool and
+# written to by the kernel of a later node through its out argument. The
+# arrays are allocated once by the plan, so evaluating adds no temporaries
+# beyond those inside the kernels themselves.
+#
+# Inputs are the leaf expressions bound to an array of samples on each call
+# to evaluate. Anything not depending on an input is computed once, without
+# a batch axis.
+class BatchPlan(object):
+
+    def __init__(self, outputs, inputs, batch_size):
+        self.outputs = list(outputs)
+        self.inputs = list(inputs)
+        self.batch_size = batch_size
+        self.buffer_count = 0
+        self.peak_bytes = 0
+        self.unplanned_bytes = 0
+        self._registers = []
+        self._steps = []
+
+        folded_outputs, folded_inputs = _fold(self.outputs, self.inputs)
+        registers = {}
+        for input_ in folded_inputs:
+            if input_ not in registers:
+                registers[input_] = len(self._registers)
+                self._registers.append(None)
+        self._input_registers = [registers[input_] for input_ in folded_inputs]
+
+        batched = set(folded_inputs)
+        steps = []
+        for expression in _topological_order(folded_outputs, batched):
+            if expression in batched:
+                continue
+            operands = _operands(expression)
+            if any(operand in batched for operand in operands):
+                batched.add(expression)
+                steps.append((expression, operands))
+            else:
+                registers[expression] = len(self._registers)
+                self._registers.append(_find_kernel(expression)(
+                    expression, *[self._registers[registers[operand]] for operand in operands]
+                ))
+
+        last_use = {}
+        for index, (expression, operands) in enumerate(steps):
+            for operand in operands:
+                last_use[operand] = index
+
+        # Outputs get arrays of their own, so the arrays evaluate returns are
+        # not overwritten by later nodes.
+        output_set = set(folded_outputs)
+        pool = defaultdict(list)
+        pooled = {}
+        for index, (expression, operands) in enumerate(steps):
+            layout = _layout(expression)
+            self.unplanned_bytes += self._nbytes(layout)
+            if expression in output_set:
+                register = self._allocate(layout)
+            elif pool[layout]:
+                register = pool[layout].pop()
+            else:
+                register = self._allocate(layout)
+                self.buffer_count += 1
+                pooled[register] = layout
+            registers[expression] = register
+            self._steps.append((
+                _find_kernel(expression),
+                expression,
+                [registers[operand] for operand in operands],
+                register,
+            ))
+            for operand in set(operands):
+                if last_use[operand] == index and registers[operand] in pooled:
+                    pool[pooled[registers[operand]]].append(registers[operand])
+
+        # Inputs and values computed once are copied to an output array
+        copies = {}
+        for output in folded_outputs:
+            if output in batched and output not in folded_inputs:
+                continue
+            if output not in copies:
+                copies[output] = self._allocate(_layout(output))
+                self._steps.append((_copy, output, [registers[output]], copies[output]))
+        self._output_registers = [
+            copies.get(output, registers[output]) for output in folded_outputs
+        ]
+
+    def _nbytes(self, layout):
+        shape, dtype = layout
+        return self.batch_size * int(numpy.prod(shape)) * dtype.itemsize
+
+    def _allocate(self, layout):
+        shape, dtype = layout
+        self._registers.append(numpy.empty((self.batch_size,) + shape, dtype))
+        self.peak_bytes += self._nbytes(layout)
+        return len(self._registers) - 1
+
+    def evaluate(self, bindings, out=None):
+        # Returns an array for each output. Unless out gives the arrays to
+        # write to, these are the plan's own and are overwritten by the next
+        # call.
+        registers = list(self._registers)
+        for input_, register in zip(self.inputs, self._input_registers):
+            try:
+                value = numpy.asarray(bindings[input_])
+            except KeyError:
+                raise KeyError("No value bound for {!r}".format(input_))
+            if len(value) != self.batch_size:
+                raise ValueError(
+                    "Expected {} samples for {!r}, got {}".format(
+                        self.batch_size, input_, len(value),
+                    )
+                )
+            registers[register] = value
+        if out is not None:
+            for register, array in zip(self._output_registers, out):
+                registers[register] = array
+        for func, expression, operands, register in self._steps:
+            func(
+                expression,
+                *[registers[operand] for operand in operands],
+                out=registers[register]
+            )
+        return [registers[register] for register in self._output_registers]
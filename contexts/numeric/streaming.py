@@ -0,0 +1,83 @@
+from __future__ import absolute_import
+
+import six
+import numpy
+from numpy.lib.format import open_memmap
+
+from .planner import BatchPlan, _layout
+
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def _open_inputs(bindings):
+    # Paths are opened as read only memory maps of .npy files
+    inputs = []
+    arrays = []
+    for expression, value in bindings.items():
+        if isinstance(value, six.string_types):
+            value = numpy.load(value, mmap_mode="r")
+        inputs.append(expression)
+        arrays.append(value)
+    lengths = set(len(array) for array in arrays)
+    if not lengths:
+        raise ValueError("No inputs bound")
+    if len(lengths) > 1:
+        raise ValueError("Inputs have different lengths: {}".format(sorted(lengths)))
+    return inputs, arrays, lengths.pop()
+
+
+def _evaluate_chunks(outputs, inputs, arrays, frame_count, chunk_size, out=None):
+    # The last chunk may be shorter, and gets a plan of its own
+    plans = {}
+    for start in range(0, frame_count, chunk_size):
+        stop = min(start + chunk_size, frame_count)
+        try:
+            plan = plans[stop - start]
+        except KeyError:
+            plan = plans[stop - start] = BatchPlan(outputs, inputs, stop - start)
+        chunk = dict(
+            (expression, array[start:stop]) for expression, array in zip(inputs, arrays)
+        )
+        values = plan.evaluate(
+            chunk, out=None if out is None else [array[start:stop] for array in out],
+        )
+        yield start, stop, values
+
+
+# Evaluates outputs over inputs longer than fit in memory, such as memory
+# mapped .npy files, a chunk of chunk_size samples at a time. Memory use is
+# bounded by the chunk size: each chunk is evaluated by a BatchPlan whose
+# arrays are reused for every chunk.
+#
+# Yields (start, stop, values) for each chunk, values holding an array for
+# each output. They are overwritten by the next chunk.
+def evaluate_chunks(outputs, bindings, chunk_size=DEFAULT_CHUNK_SIZE):
+    inputs, arrays, frame_count = _open_inputs(bindings)
+    for chunk in _evaluate_chunks(list(outputs), inputs, arrays, frame_count, chunk_size):
+        yield chunk
+
+
+# As evaluate_chunks, but writes each output to a .npy file at the
+# corresponding path, through a memory map. Yields (start, stop) once a
+# chunk has been written and flushed.
+def evaluate_to_files(outputs, bindings, paths, chunk_size=DEFAULT_CHUNK_SIZE):
+    outputs = list(outputs)
+    paths = list(paths)
+    if len(paths) != len(outputs):
+        raise ValueError("Expected {} paths, got {}".format(len(outputs), len(paths)))
+    inputs, arrays, frame_count = _open_inputs(bindings)
+    files = []
+    for output, path in zip(outputs, paths):
+        shape, dtype = _layout(output)
+        files.append(open_memmap(path, mode="w+", dtype=dtype, shape=(frame_count,) + shape))
+    chunks = _evaluate_chunks(outputs, inputs, arrays, frame_count, chunk_size, out=files)
+    try:
+        for start, stop, values in chunks:
+            for array in files:
+                array.flush()
+            yield start, stop
+    finally:
+        for array in files:
+            array.flush()
+        del files[:]
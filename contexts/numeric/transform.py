@@ -0,0 +1,255 @@
+from __future__ import absolute_import, division
+
+import numpy
+
+from ...expressions.transform import *
+from .context import kernel, store
+
+
+# Rotations and transforms are evaluated to their (N, 4, 4) matrices, using
+# the same row vector convention as constant folding.
+
+
+def _identity(expression, out=None):
+    return store(numpy.eye(4), out)
+
+
+kernel(RotationIdentity, TransformIdentity)(_identity)
+
+
+def _axis_rotation(degrees, i, j):
+    radians = numpy.radians(degrees)
+    cos = numpy.cos(radians)
+    sin = numpy.sin(radians)
+    result = numpy.zeros(numpy.shape(radians) + (4, 4))
+    result[...] = numpy.eye(4)
+    result[..., i, i] = cos
+    result[..., i, j] = sin
+    result[..., j, i] = -sin
+    result[..., j, j] = cos
+    return result
+
+
+@kernel(EulerRotation)
+def _euler_rotation(expression, x, y, z, out=None):
+    X = _axis_rotation(x, 1, 2)
+    Y = _axis_rotation(y, 2, 0)
+    Z = _axis_rotation(z, 0, 1)
+    R1, R2, R3 = RotateOrder.sort(X, Y, Z, expression.order)
+    return numpy.matmul(numpy.matmul(R1, R2), R3, out=out)
+
+
+@kernel(ComposeTransform)
+def _compose_transform(expression, translation, rotation, scale, out=None):
+    # S * R * T
+    result = out
+    if result is None:
+        batch_shape = numpy.broadcast(
+            translation[..., 0], rotation[..., 0, 0], scale[..., 0],
+        ).shape
+        result = numpy.empty(batch_shape + (4, 4))
+    result[...] = rotation
+    result[..., :3, :] *= scale[..., :, None]
+    result[..., 3, :3] = translation
+    return result
+
+
+@kernel(TransformFromMatrix, MatrixFromTransform)
+def _matrix_cast(expression, value, out=None):
+    return store(value, out)
+
+
+@kernel(LocalToWorldTransform)
+def _local_to_world(expression, parent, transform, out=None):
+    return numpy.matmul(transform, parent, out=out)
+
+
+@kernel(WorldToLocalTransform)
+def _world_to_local(expression, parent, transform, out=None):
+    return numpy.matmul(transform, numpy.linalg.inv(parent), out=out)
+
+
+@kernel(Transform.translation)
+def _transform_translation(expression, transform, out=None):
+    return store(transform[..., 3, :3], out)
+
+
+def _dot(a, b):
+    return numpy.einsum("...i,...i->...", a, b)
+
+
+def _project(vector, onto):
+    return onto * (_dot(vector, onto) / _dot(onto, onto))[..., None]
+
+
+def _decompose_scale(matrix):
+    # Removes shear (as constant folding's _unskew) and splits the rows into
+    # their scale and unit directions. Returns (scale, unit rows).
+    i = matrix[..., 0, :3]
+    j = matrix[..., 1, :3]
+    k = matrix[..., 2, :3]
+    j = j - _project(j, i)
+    k = k - _project(k, i)
+    k = k - _project(k, j)
+    rows = numpy.stack((i, j, k), axis=-2)
+    scale = numpy.sqrt(numpy.einsum("...ij,...ij->...i", rows, rows))
+    sign = numpy.where(_dot(numpy.cross(i, j), k) >= 0, 1.0, -1.0)
+    scale[..., 2] *= sign
+    inverse = numpy.where(scale != 0, 1.0 / numpy.where(scale != 0, scale, 1.0), 1.0)
+    return scale, rows * inverse[..., None]
+
+
+@kernel(Transform.scale)
+def _transform_scale(expression, transform, out=None):
+    scale, unit = _decompose_scale(transform)
+    return store(scale, out)
+
+
+@kernel(Transform.rotation)
+def _transform_rotation(expression, transform, out=None):
+    scale, unit = _decompose_scale(transform)
+    result = out
+    if result is None:
+        result = numpy.empty(unit.shape[:-2] + (4, 4))
+    result[..., 3, :] = 0.0
+    result[..., :3, 3] = 0.0
+    result[..., :3, :3] = unit
+    result[..., 3, 3] = 1.0
+    return result
+
+
+# Quaternions are evaluated to (N, 4) arrays of (x, y, z, w)
+
+
+@kernel(QuaternionConstant)
+def _quaternion_constant(expression, out=None):
+    return store(numpy.array(expression._values), out)
+
+
+@kernel(QuaternionFromScalar)
+def _quaternion_from_scalar(expression, x, y, z, w, out=None):
+    if out is None:
+        out = numpy.empty(numpy.broadcast(x, y, z, w).shape + (4,))
+    for i, component in enumerate((x, y, z, w)):
+        out[..., i] = component
+    return out
+
+
+@kernel(QuaternionMultiply)
+def _quaternion_multiply(expression, a, b, out=None):
+    # Rotates by a, then by b: the Hamilton product b a
+    ax, ay, az, aw = numpy.moveaxis(a, -1, 0)
+    bx, by, bz, bw = numpy.moveaxis(b, -1, 0)
+    if out is None:
+        out = numpy.empty(numpy.broadcast(a, b).shape)
+    out[..., 0] = bw * ax + bx * aw + by * az - bz * ay
+    out[..., 1] = bw * ay - bx * az + by * aw + bz * ax
+    out[..., 2] = bw * az + bx * ay - by * ax + bz * aw
+    out[..., 3] = bw * aw - bx * ax - by * ay - bz * az
+    return out
+
+
+@kernel(QuaternionInverse)
+def _quaternion_inverse(expression, q, out=None):
+    conjugate = q * numpy.array([-1.0, -1.0, -1.0, 1.0])
+    return numpy.true_divide(conjugate, _dot(q, q)[..., None], out=out)
+
+
+@kernel(QuaternionNormalize)
+def _quaternion_normalize(expression, q, out=None):
+    return numpy.true_divide(q, numpy.sqrt(_dot(q, q))[..., None], out=out)
+
+
+@kernel(QuaternionSlerp)
+def _quaternion_slerp(expression, start, end, weight, out=None):
+    # Along the shortest arc, and linearly where the ends are too close for
+    # the arc's sine to be accurate
+    dot = _dot(start, end)
+    end = numpy.where((dot < 0)[..., None], -end, end)
+    dot = numpy.abs(dot)
+    near = dot > 0.9995
+    theta = numpy.arccos(numpy.minimum(dot, 1.0))
+    sin = numpy.where(near, 1.0, numpy.sin(theta))
+    weight = numpy.asarray(weight, dtype=float)
+    wa = numpy.where(near, 1 - weight, numpy.sin((1 - weight) * theta) / sin)
+    wb = numpy.where(near, weight, numpy.sin(weight * theta) / sin)
+    result = start * wa[..., None] + end * wb[..., None]
+    length = numpy.where(near, numpy.sqrt(_dot(result, result)), 1.0)
+    return numpy.true_divide(result, length[..., None], out=out)
+
+
+def _quaternion_rows(q):
+    # The (N, 3, 3) rotation rows of quaternions of any length
+    x, y, z, w = numpy.moveaxis(q, -1, 0)
+    s = 2.0 / _dot(q, q)
+    rows = numpy.empty(numpy.shape(q)[:-1] + (3, 3))
+    rows[..., 0, 0] = 1 - s * (y * y + z * z)
+    rows[..., 0, 1] = s * (x * y + z * w)
+    rows[..., 0, 2] = s * (x * z - y * w)
+    rows[..., 1, 0] = s * (x * y - z * w)
+    rows[..., 1, 1] = 1 - s * (x * x + z * z)
+    rows[..., 1, 2] = s * (y * z + x * w)
+    rows[..., 2, 0] = s * (x * z + y * w)
+    rows[..., 2, 1] = s * (y * z - x * w)
+    rows[..., 2, 2] = 1 - s * (x * x + y * y)
+    return rows
+
+
+@kernel(QuaternionRotation)
+def _quaternion_rotation(expression, q, out=None):
+    rows = _quaternion_rows(q)
+    if out is None:
+        out = numpy.empty(rows.shape[:-2] + (4, 4))
+    out[..., :3, :3] = rows
+    out[..., :3, 3] = 0.0
+    out[..., 3, :3] = 0.0
+    out[..., 3, 3] = 1.0
+    return out
+
+
+@kernel(QuaternionFromRotation)
+def _quaternion_from_rotation(expression, m, out=None):
+    # Each candidate is 4 q_k q for one component k, with 4 q_k^2 on the
+    # diagonal. The one with the largest diagonal is the most accurate.
+    m00, m11, m22 = m[..., 0, 0], m[..., 1, 1], m[..., 2, 2]
+    a = m[..., 1, 2] - m[..., 2, 1]
+    b = m[..., 2, 0] - m[..., 0, 2]
+    c = m[..., 0, 1] - m[..., 1, 0]
+    d = m[..., 0, 1] + m[..., 1, 0]
+    e = m[..., 0, 2] + m[..., 2, 0]
+    f = m[..., 1, 2] + m[..., 2, 1]
+    diagonal = (
+        1 + m00 - m11 - m22,
+        1 - m00 + m11 - m22,
+        1 - m00 - m11 + m22,
+        1 + m00 + m11 + m22,
+    )
+    best = numpy.argmax(numpy.stack(diagonal, axis=-1), axis=-1)
+    if out is None:
+        out = numpy.empty(best.shape + (4,))
+    out[..., 0] = numpy.choose(best, (diagonal[0], d, e, a))
+    out[..., 1] = numpy.choose(best, (d, diagonal[1], f, b))
+    out[..., 2] = numpy.choose(best, (e, f, diagonal[2], c))
+    out[..., 3] = numpy.choose(best, (a, b, c, diagonal[3]))
+    return numpy.true_divide(out, numpy.sqrt(_dot(out, out))[..., None], out=out)
+
+
+@kernel(EulerFromQuaternion)
+def _euler_from_quaternion(expression, q, out=None):
+    # As constant folding: at gimbal lock the third angle is zero
+    rows = _quaternion_rows(q)
+    i, j, k = RotateOrder.sort(0, 1, 2, expression.order)
+    sign = 1 if (j - i) % 3 == 1 else -1
+    r = lambda a, b: rows[..., b, a]
+    s = numpy.clip(-sign * r(k, i), -1.0, 1.0)
+    locked = numpy.abs(s) >= 1 - 1e-12
+    if out is None:
+        out = numpy.empty(rows.shape[:-2] + (3,))
+    out[..., i] = numpy.where(
+        locked,
+        numpy.arctan2(-sign * r(j, k), r(j, j)),
+        numpy.arctan2(sign * r(k, j), r(k, k)),
+    )
+    out[..., j] = numpy.arcsin(s)
+    out[..., k] = numpy.where(locked, 0.0, numpy.arctan2(sign * r(j, i), r(i, i)))
+    return numpy.degrees(out, out=out)
@@ -0,0 +1,4 @@
+from __future__ import absolute_import
+
+from .context import PythonCompileContext, python_compiler, compile_expression
+from . import math as _math
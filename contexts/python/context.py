@@ -0,0 +1,108 @@
+from __future__ import absolute_import, division
+
+import re
+import math
+import itertools
+
+from ...context import Context, ContextHandler
+from ...expressions.math import Vector, Matrix
+from ..constant_folding import ConstantFoldingContext
+
+
+python_compiler = ContextHandler()
+
+_IDENTIFIER = re.compile(r"^[A-Za-z][A-Za-z0-9_]*$")
+
+
+@python_compiler.default()
+def _unsupported_handler(context, expression):
+    raise NotImplementedError(
+        "Cannot compile {!r}, it is not a parameter".format(expression)
+    )
+
+
+def _width(expression):
+    if isinstance(expression, Vector):
+        return 3
+    elif isinstance(expression, Matrix):
+        return 16
+    return None
+
+
+# Generates the body of a Python function computing an expression. Each
+# handler returns the source of its expression's value: a local name or a
+# literal for booleans, integers and scalars, and a tuple of them for the
+# components of vectors (3) and matrices (16, row by row). Every node gets
+# its own locals, so shared sub-expressions are computed once.
+class PythonCompileContext(Context):
+
+    def __init__(self, parameters):
+        super(PythonCompileContext, self).__init__(
+            handler=python_compiler,
+            parent=ConstantFoldingContext(),
+        )
+        self.lines = []
+        self.parameters = {}
+        self.parameter_names = []
+        self._local_count = itertools.count()
+        for name, expression in parameters.items():
+            if not _IDENTIFIER.match(name):
+                raise ValueError("Invalid parameter name: {!r}".format(name))
+            self.parameter_names.append(name)
+            width = _width(expression)
+            if width is None:
+                value = name
+            else:
+                value = tuple("_{}_{}".format(name, i) for i in range(width))
+                self.lines.append("{}, = {}".format(", ".join(value), name))
+            self.parameters[self.parent.get(expression)] = value
+
+    def local(self, source):
+        name = "_v{}".format(next(self._local_count))
+        self.lines.append("{} = {}".format(name, source))
+        return name
+
+    def locals(self, sources):
+        return tuple(map(self.local, sources))
+
+    def _handle(self, value):
+        try:
+            return self.parameters[value]
+        except KeyError:
+            return self.handler(self, value)
+
+
+def literal(value):
+    if isinstance(value, float) and (math.isinf(value) or math.isnan(value)):
+        return "float({!r})".format(str(value))
+    # Negative literals are parenthesized, as -2.0 ** x is -(2.0 ** x)
+    if repr(value).startswith("-"):
+        return "({!r})".format(value)
+    return repr(value)
+
+
+def _format_result(value):
+    if isinstance(value, tuple):
+        return "({},)".format(", ".join(value))
+    return value
+
+
+def compile_expression(expression, parameters=None):
+    # Returns a function taking each leaf expression's value by the name it
+    # has in parameters. Vectors and matrices are passed and returned as
+    # flat sequences of 3 or 16 floats.
+    parameters = parameters or {}
+    context = PythonCompileContext(parameters)
+    result = context.get(expression)
+    source = "def compiled({}):\n{}\n".format(
+        ", ".join(context.parameter_names),
+        "\n".join(
+            "    " + line
+            for line in context.lines + ["return " + _format_result(result)]
+        ),
+    )
+    namespace = {"sqrt": math.sqrt}
+    exec(compile(source, "<compiled expression>", "exec"), namespace)
+    compiled = namespace["compiled"]
+    compiled.source = source
+    return compiled
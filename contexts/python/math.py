@@ -0,0 +1,318 @@
+from __future__ import absolute_import, division
+
+from ...expressions.math import *
+from .context import python_compiler, literal
+
+
+def _constant(context, expression):
+    return literal(expression.value)
+
+
+for expression_type in (BooleanConstant, IntegerConstant, ScalarConstant):
+    python_compiler.register_handler(expression_type, _constant)
+
+
+@python_compiler.handler(VectorConstant)
+@python_compiler.handler(MatrixConstant)
+def _constant_components(context, expression):
+    return tuple(map(literal, expression._values))
+
+
+def _unary_handler(template):
+    def handler(context, expression):
+        return context.local(template.format(context.get(expression.operand)))
+    return handler
+
+
+def _cast_handler(template):
+    def handler(context, expression):
+        return context.local(template.format(context.get(expression.value)))
+    return handler
+
+
+def _binary_handler(template):
+    def handler(context, expression):
+        return context.local(template.format(
+            context.get(expression.loperand), context.get(expression.roperand),
+        ))
+    return handler
+
+
+def _associative_handler(separator):
+    def handler(context, expression):
+        return context.local(separator.join(map(context.get, expression.operands)))
+    return handler
+
+
+python_compiler.register_handler(BooleanInverse, _unary_handler("not {}"))
+for expression_type, separator in (
+    (IntegerSum, " + "),
+    (IntegerProduct, " * "),
+    (ScalarSum, " + "),
+    (ScalarProduct, " * "),
+):
+    python_compiler.register_handler(expression_type, _associative_handler(separator))
+
+for expression_type, template in (
+    (ScalarFromInteger, "float({})"),
+    (ScalarFromBoolean, "float({})"),
+    (IntegerFromScalar, "int({})"),
+    (IntegerFromBoolean, "int({})"),
+    (BooleanFromScalar, "bool({})"),
+    (BooleanFromInteger, "bool({})"),
+):
+    python_compiler.register_handler(expression_type, _cast_handler(template))
+
+for expression_type, template in (
+    (BooleanAnd, "{} and {}"),
+    (BooleanOr, "{} or {}"),
+    (BooleanEquals, "{} == {}"),
+    (BooleanNotEquals, "{} != {}"),
+    (IntegerAdd, "{} + {}"),
+    (IntegerSubtract, "{} - {}"),
+    (IntegerMultiply, "{} * {}"),
+    # Constant folding divides and truncates the quotient towards zero
+    (IntegerDivide, "int({} / {})"),
+    (IntegerEquals, "{} == {}"),
+    (IntegerNotEquals, "{} != {}"),
+    (IntegerGreaterThan, "{} > {}"),
+    (IntegerGreaterThanEquals, "{} >= {}"),
+    (IntegerLessThan, "{} < {}"),
+    (IntegerLessThanEquals, "{} <= {}"),
+    (ScalarAdd, "{} + {}"),
+    (ScalarSubtract, "{} - {}"),
+    (ScalarMultiply, "{} * {}"),
+    (ScalarDivide, "{} / {}"),
+    (ScalarPower, "{} ** {}"),
+    (ScalarEquals, "{} == {}"),
+    (ScalarNotEquals, "{} != {}"),
+    (ScalarGreaterThan, "{} > {}"),
+    (ScalarGreaterThanEquals, "{} >= {}"),
+    (ScalarLessThan, "{} < {}"),
+    (ScalarLessThanEquals, "{} <= {}"),
+):
+    python_compiler.register_handler(expression_type, _binary_handler(template))
+
+
+@python_compiler.handler(VectorComponent)
+def _vector_component(context, expression):
+    return context.get(expression.value)[expression.index]
+
+
+@python_compiler.handler(VectorFromScalar)
+def _vector_from_scalar(context, expression):
+    return tuple(map(context.get, expression._values))
+
+
+def _componentwise_handler(template):
+    def handler(context, expression):
+        left = context.get(expression.loperand)
+        right = context.get(expression.roperand)
+        return context.locals(template.format(a, b) for a, b in zip(left, right))
+    return handler
+
+
+def _scaled_handler(template):
+    def handler(context, expression):
+        components = context.get(expression.loperand)
+        scalar = context.get(expression.roperand)
+        return context.locals(template.format(a, scalar) for a in components)
+    return handler
+
+
+@python_compiler.handler(VectorSum)
+def _vector_sum(context, expression):
+    operands = [context.get(operand) for operand in expression.operands]
+    return context.locals(" + ".join(components) for components in zip(*operands))
+
+
+for expression_type, handler in (
+    (VectorAdd, _componentwise_handler("{} + {}")),
+    (VectorSubtract, _componentwise_handler("{} - {}")),
+    (VectorMultiply, _scaled_handler("{} * {}")),
+    (VectorDivide, _scaled_handler("{} / {}")),
+    (MatrixAdd, _componentwise_handler("{} + {}")),
+    (MatrixSubtract, _componentwise_handler("{} - {}")),
+    (MatrixScalarMultiply, _scaled_handler("{} * {}")),
+    (MatrixDivide, _scaled_handler("{} / {}")),
+):
+    python_compiler.register_handler(expression_type, handler)
+
+
+_ZERO = literal(0.0)
+_ONE = literal(1.0)
+
+
+def _product(x, y):
+    if x == _ONE:
+        return y
+    elif y == _ONE:
+        return x
+    return "{} * {}".format(x, y)
+
+
+def _dot(a, b):
+    # Terms with a constant zero factor are left out, which is common with
+    # rotation, scale and translation matrices.
+    terms = [
+        _product(x, y) for x, y in zip(a, b) if _ZERO not in (x, y)
+    ]
+    return " + ".join(terms) or _ZERO
+
+
+@python_compiler.handler(VectorDotProduct)
+def _vector_dot_product(context, expression):
+    left = context.get(expression.loperand)
+    right = context.get(expression.roperand)
+    return context.local(_dot(left, right))
+
+
+@python_compiler.handler(VectorCrossProduct)
+def _vector_cross_product(context, expression):
+    (ax, ay, az) = context.get(expression.loperand)
+    (bx, by, bz) = context.get(expression.roperand)
+    return context.locals((
+        "{} * {} - {} * {}".format(ay, bz, az, by),
+        "{} * {} - {} * {}".format(az, bx, ax, bz),
+        "{} * {} - {} * {}".format(ax, by, ay, bx),
+    ))
+
+
+@python_compiler.handler(VectorLength)
+def _vector_length(context, expression):
+    vector = context.get(expression.operand)
+    return context.local("sqrt({})".format(_dot(vector, vector)))
+
+
+@python_compiler.handler(VectorNormalize)
+def _vector_normalize(context, expression):
+    vector = context.get(expression.operand)
+    length = context.local("sqrt({})".format(_dot(vector, vector)))
+    return context.locals("{} / {}".format(a, length) for a in vector)
+
+
+@python_compiler.handler(MatrixFromScalar)
+def _matrix_from_scalar(context, expression):
+    return tuple(map(context.get, expression._values))
+
+
+@python_compiler.handler(MatrixComponent)
+def _matrix_component(context, expression):
+    return context.get(expression.value)[expression.row * 4 + expression.column]
+
+
+@python_compiler.handler(MatrixTranspose)
+def _matrix_transpose(context, expression):
+    m = context.get(expression.operand)
+    return tuple(m[j * 4 + i] for i in range(4) for j in range(4))
+
+
+@python_compiler.handler(MatrixMultiply)
+def _matrix_multiply(context, expression):
+    left = context.get(expression.loperand)
+    right = context.get(expression.roperand)
+    return context.locals(
+        _dot(left[i * 4:i * 4 + 4], right[j::4])
+        for i in range(4) for j in range(4)
+    )
+
+
+@python_compiler.handler(VectorMatrixMultiply)
+def _vector_matrix_multiply(context, expression):
+    vector = context.get(expression.loperand)
+    m = context.get(expression.roperand)
+    return context.locals(_dot(vector, m[j:12:4]) for j in range(3))
+
+
+@python_compiler.handler(MatrixVectorMultiply)
+def _matrix_vector_multiply(context, expression):
+    m = context.get(expression.loperand)
+    vector = context.get(expression.roperand)
+    return context.locals(_dot(m[i * 4:i * 4 + 3], vector) for i in range(3))
+
+
+def _affine_inverse(context, m):
+    # Inverse of the linear part from its adjugate, and the translation
+    # moved back through it
+    (a00, a01, a02, _,
+     a10, a11, a12, _,
+     a20, a21, a22, _,
+     t0, t1, t2, _) = m
+    c = context.locals("{} * {} - {} * {}".format(*args) for args in (
+        (a11, a22, a12, a21),
+        (a02, a21, a01, a22),
+        (a01, a12, a02, a11),
+        (a12, a20, a10, a22),
+        (a00, a22, a02, a20),
+        (a02, a10, a00, a12),
+        (a10, a21, a11, a20),
+        (a01, a20, a00, a21),
+        (a00, a11, a01, a10),
+    ))
+    det = context.local("1.0 / ({})".format(_dot((a00, a01, a02), c[0::3])))
+    i = context.locals("{} * {}".format(x, det) for x in c)
+    t = context.locals("-({})".format(_dot((t0, t1, t2), i[j::3])) for j in range(3))
+    return (
+        i[0], i[1], i[2], _ZERO,
+        i[3], i[4], i[5], _ZERO,
+        i[6], i[7], i[8], _ZERO,
+        t[0], t[1], t[2], _ONE,
+    )
+
+
+@python_compiler.handler(MatrixInverse)
+def _matrix_inverse(context, expression):
+    m = context.get(expression.operand)
+    # Checked when compiling: only a last column of the literals 0, 0, 0, 1
+    # is known to be affine. One computed from parameters is inverted in
+    # general, whatever its values.
+    if m[3::4] == (_ZERO, _ZERO, _ZERO, _ONE):
+        return _affine_inverse(context, m)
+    # Inverse from the 2x2 sub-determinants of the top and bottom halves
+    (a00, a01, a02, a03,
+     a10, a11, a12, a13,
+     a20, a21, a22, a23,
+     a30, a31, a32, a33) = m
+    b = context.locals("{} * {} - {} * {}".format(*args) for args in (
+        (a00, a11, a01, a10),
+        (a00, a12, a02, a10),
+        (a00, a13, a03, a10),
+        (a01, a12, a02, a11),
+        (a01, a13, a03, a11),
+        (a02, a13, a03, a12),
+        (a20, a31, a21, a30),
+        (a20, a32, a22, a30),
+        (a20, a33, a23, a30),
+        (a21, a32, a22, a31),
+        (a21, a33, a23, a31),
+        (a22, a33, a23, a32),
+    ))
+    det = context.local(
+        "1.0 / ({} * {} - {} * {} + {} * {} + {} * {} - {} * {} + {} * {})".format(
+            b[0], b[11], b[1], b[10], b[2], b[9],
+            b[3], b[8], b[4], b[7], b[5], b[6],
+        )
+    )
+    return context.locals(
+        "({} * {} {} {} * {} {} {} * {}) * {}".format(
+            x, bx, s1, y, by, s2, z, bz, det,
+        )
+        for x, bx, s1, y, by, s2, z, bz in (
+            (a11, b[11], "-", a12, b[10], "+", a13, b[9]),
+            (a02, b[10], "-", a01, b[11], "-", a03, b[9]),
+            (a31, b[5], "-", a32, b[4], "+", a33, b[3]),
+            (a22, b[4], "-", a21, b[5], "-", a23, b[3]),
+            (a12, b[8], "-", a10, b[11], "-", a13, b[7]),
+            (a00, b[11], "-", a02, b[8], "+", a03, b[7]),
+            (a32, b[2], "-", a30, b[5], "-", a33, b[1]),
+            (a20, b[5], "-", a22, b[2], "+", a23, b[1]),
+            (a10, b[10], "-", a11, b[8], "+", a13, b[6]),
+            (a01, b[8], "-", a00, b[10], "-", a03, b[6]),
+            (a30, b[4], "-", a31, b[2], "+", a33, b[0]),
+            (a21, b[2], "-", a20, b[4], "-", a23, b[0]),
+            (a11, b[7], "-", a10, b[9], "-", a12, b[6]),
+            (a00, b[9], "-", a01, b[7], "+", a02, b[6]),
+            (a31, b[1], "-", a30, b[3], "-", a32, b[0]),
+            (a20, b[3], "-", a21, b[1], "+", a22, b[0]),
+        )
+    )
@@ -71,6 +71,7 @@ class Output(object):
             }
             self._expression_type = _expression_type(
                 output_class_name, self.type, output_class_attrs,
+                module=self._self_type.__module__,
             )
         return self._expression_type
 
@@ -129,7 +130,12 @@ class ExpressionMeta(type):
         attrs["_outputs"] = tuple(outputs)
         attrs["_output_indices"] = { o: i for i, o in enumerate(outputs) }
 
-        attrs["__slots__"] = ("_values", "_hash")
+        # Slots are declared once, by the root class, so that expression
+        # types can derive from several others
+        if any(isinstance(base, ExpressionMeta) for base in bases):
+            attrs.setdefault("__slots__", ())
+        else:
+            attrs["__slots__"] = ("_values", "_hash")
         attrs.setdefault("__isabstractexpression__", False)
 
         result = type.__new__(cls, name, bases, attrs)
@@ -165,6 +171,15 @@ class Expression(with_metaclass(ExpressionMeta)):
             self._values = args
             self._hash = None
 
+    @classmethod
+    def _from_values(cls, values):
+        # Construct from a tuple of already converted field values, skipping
+        # the per-field conversion done by __init__.
+        result = cls.__new__(cls)
+        result._values = values
+        result._hash = None
+        return result
+
     def __eq__(self, other):
         if id(self) == id(other):
             return True
@@ -187,12 +202,76 @@ class Expression(with_metaclass(ExpressionMeta)):
         )
 
 
+# Associative operations on any number of operands, such as sums. The
+# operands are the expression's values, so contexts find them as they do
+# fields. Operands of the same operation are spliced in at construction,
+# so chains of operators build one flat expression.
+#
+# The operands are kept in a list, of which the first _count are this
+# expression's. Adding to an expression whose list has not been extended
+# since extends the same list, so that sum() over many terms takes linear
+# time.
+@abstract_expression
+class AssociativeExpression(Expression):
+
+    __slots__ = ("_operands", "_count", "_tuple")
+
+    operand_type = Expression
+
+    def __init__(self, *operands):
+        if type(self).__isabstractexpression__:
+            raise TypeError("Cannot initialize abstract type")
+        try:
+            self._operands
+        except AttributeError:
+            values = None
+            for operand in operands:
+                if type(operand) is type(self):
+                    if values is None and operand._extendable():
+                        values = operand._operands
+                    elif values is None:
+                        values = list(operand._values)
+                    else:
+                        values.extend(operand._values)
+                else:
+                    if values is None:
+                        values = []
+                    values.append(type_conversions.convert(self.operand_type, operand))
+            if values is None or len(values) < 2:
+                raise TypeError("Expected at least 2 operands")
+            self._operands = values
+            self._count = len(values)
+            self._tuple = None
+            self._hash = None
+
+    def _extendable(self):
+        return type(self._operands) is list and len(self._operands) == self._count
+
+    @property
+    def _values(self):
+        if self._tuple is None:
+            self._tuple = tuple(self._operands[:self._count])
+        return self._tuple
+
+    @_values.setter
+    def _values(self, values):
+        self._tuple = tuple(values)
+        self._operands = self._tuple
+        self._count = len(self._tuple)
+
+    @property
+    def operands(self):
+        return self._values
+
+
 def expr(arg, type=Expression):
     return type_conversions.convert(type, arg)
 
 
-def _expression_type(name, base, attrs, module=None, depth=2):
-    result = type(base)(name, (base,), attrs)
+def _expression_type(name, bases, attrs, module=None, depth=2):
+    if not isinstance(bases, tuple):
+        bases = (bases,)
+    result = type(bases[-1])(name, bases, attrs)
     if module is None:
         try:
             module = sys._getframe(depth).f_globals.get('__name__', '__main__')
@@ -224,11 +303,23 @@ def binary_expression(name, result_type, left_type=None, right_type=None):
     return _expression_type(name, result_type, class_namespace)
 
 
-def cast_expression(name, result_type, from_type):
+def associative_expression(name, result_type, operand_type=None):
+    if operand_type is None:
+        operand_type = result_type
+    class_namespace = {
+        "operand_type": operand_type,
+    }
+    return _expression_type(
+        name, (AssociativeExpression, result_type), class_namespace,
+    )
+
+
+def cast_expression(name, result_type, from_type, cost=1):
     class_namespace = {
         "value": Field(from_type),
     }
     result = _expression_type(name, result_type, class_namespace)
-    type_conversions.register_conversion(result, from_type)
-    type_conversions.register_conversion(from_type, result, lambda c: c.value)
+    with type_conversions.bulk_registration():
+        type_conversions.register_conversion(result, from_type, cost=cost)
+        type_conversions.register_conversion(from_type, result, lambda c: c.value)
     return result
@@ -0,0 +1,148 @@
+from __future__ import absolute_import, division
+
+import bisect
+
+from .. import type_conversions
+from ..expression import Expression, Field, abstract_expression
+from .math import Scalar
+
+
+# Keys of an animation curve: times in increasing order, with the value and
+# the incoming and outgoing slopes (change in value per unit of time) at
+# each. Held as tuples of floats, so curves can be hashed and compared like
+# any other field value.
+class Keyframes(object):
+
+    __slots__ = ("times", "values", "in_slopes", "out_slopes", "_hash", "_arrays")
+
+    def __init__(self, times, values, in_slopes=None, out_slopes=None):
+        times = tuple(float(t) for t in times)
+        values = tuple(float(v) for v in values)
+        if not times:
+            raise ValueError("Keyframes need at least one key")
+        if len(values) != len(times):
+            raise ValueError("Expected {} values, got {}".format(len(times), len(values)))
+        if any(t1 >= t2 for t1, t2 in zip(times, times[1:])):
+            raise ValueError("Key times must be increasing")
+        if in_slopes is None:
+            in_slopes = _auto_slopes(times, values)
+        if out_slopes is None:
+            out_slopes = in_slopes
+        in_slopes = tuple(float(s) for s in in_slopes)
+        out_slopes = tuple(float(s) for s in out_slopes)
+        if len(in_slopes) != len(times) or len(out_slopes) != len(times):
+            raise ValueError("Expected {} slopes".format(len(times)))
+        self.times = times
+        self.values = values
+        self.in_slopes = in_slopes
+        self.out_slopes = out_slopes
+        self._hash = None
+        # Cache for evaluators, such as the numpy kernel's arrays
+        self._arrays = None
+
+    def __eq__(self, other):
+        return (
+            type(self) == type(other)
+            and self.times == other.times
+            and self.values == other.values
+            and self.in_slopes == other.in_slopes
+            and self.out_slopes == other.out_slopes
+        )
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash((self.times, self.values, self.in_slopes, self.out_slopes))
+        return self._hash
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getstate__(self):
+        return (self.times, self.values, self.in_slopes, self.out_slopes)
+
+    def __setstate__(self, state):
+        self.times, self.values, self.in_slopes, self.out_slopes = state
+        self._hash = None
+        self._arrays = None
+
+    def __repr__(self):
+        return "Keyframes({!r}, {!r}, {!r}, {!r})".format(
+            self.times, self.values, self.in_slopes, self.out_slopes,
+        )
+
+    def sample(self, time):
+        # Cubic Hermite interpolation between the keys either side of time,
+        # holding the first and last values outside of the keys.
+        times = self.times
+        if time <= times[0]:
+            return self.values[0]
+        if time >= times[-1]:
+            return self.values[-1]
+        i = bisect.bisect_right(times, time) - 1
+        return _hermite(
+            times[i], times[i + 1],
+            self.values[i], self.values[i + 1],
+            self.out_slopes[i], self.in_slopes[i + 1],
+            time,
+        )
+
+
+def _auto_slopes(times, values):
+    # Catmull-Rom style slopes from the neighbouring keys, one sided at the
+    # ends
+    if len(times) == 1:
+        return (0.0,)
+    slopes = []
+    for i in range(len(times)):
+        j = max(i - 1, 0)
+        k = min(i + 1, len(times) - 1)
+        slopes.append((values[k] - values[j]) / (times[k] - times[j]))
+    return tuple(slopes)
+
+
+def _hermite(t0, t1, v0, v1, m0, m1, time):
+    # The numpy kernel evaluates the same cubic, expanded in powers of s
+    h = t1 - t0
+    s = (time - t0) / h
+    s2 = s * s
+    s3 = s2 * s
+    return (
+        (2 * s3 - 3 * s2 + 1) * v0
+        + (s3 - 2 * s2 + s) * h * m0
+        + (-2 * s3 + 3 * s2) * v1
+        + (s3 - s2) * h * m1
+    )
+
+
+@type_conversions.conversion(Keyframes, tuple)
+@type_conversions.conversion(Keyframes, list)
+def _keyframes_from_pairs(keys):
+    # [(time, value), ...] with automatic slopes, or
+    # [(time, value, in_slope, out_slope), ...]
+    columns = list(zip(*keys))
+    if len(columns) not in (2, 4):
+        raise TypeError("Keys must be (time, value) or (time, value, in, out)")
+    return Keyframes(*columns)
+
+
+# The scene's current time. A leaf, bound to the times to sample when
+# evaluating in batches.
+class CurrentTime(Scalar): pass
+CURRENT_TIME = CurrentTime()
+
+
+# Curves sampled at a time, by default the current time
+@abstract_expression
+class AnimCurve(Expression):
+    keys = Field(Keyframes)
+    time = Field(Scalar, default=CURRENT_TIME)
+
+
+class ScalarAnimCurve(AnimCurve, Scalar): pass
+
+
+def anim_curve(keys, time=CURRENT_TIME):
+    return ScalarAnimCurve(keys, time)
@@ -0,0 +1,266 @@
+from __future__ import absolute_import, division
+
+import itertools
+
+from ..expression import (
+    Expression,
+    Field,
+    abstract_expression,
+    unary_expression,
+    binary_expression,
+    cast_expression,
+    expr,
+)
+from .math import Scalar, Vector, Matrix
+
+
+# Arrays of scalars, vectors and matrices, for applying the same operation
+# to every element at once, such as every joint of a chain. Element-wise
+# operations take arrays of the same length. Scalars, vectors and matrices
+# convert to arrays that broadcast against an array of any length.
+@abstract_expression
+class ScalarArray(Expression):
+
+    def __neg__(self):
+        return self * -1
+
+    def __pos__(self):
+        return self
+
+    def __add__(self, other):
+        return ScalarArrayAdd(self, other)
+
+    def __radd__(self, other):
+        return ScalarArrayAdd(other, self)
+
+    def __sub__(self, other):
+        return ScalarArraySubtract(self, other)
+
+    def __rsub__(self, other):
+        return ScalarArraySubtract(other, self)
+
+    def __mul__(self, other):
+        other = expr(other)
+        if isinstance(other, (Vector, VectorArray)):
+            return VectorArrayMultiply(other, self)
+        elif isinstance(other, (Matrix, MatrixArray)):
+            return MatrixArrayScalarMultiply(other, self)
+        return ScalarArrayMultiply(self, other)
+
+    def __rmul__(self, other):
+        other = expr(other)
+        if isinstance(other, (Vector, VectorArray)):
+            return VectorArrayMultiply(other, self)
+        elif isinstance(other, (Matrix, MatrixArray)):
+            return MatrixArrayScalarMultiply(other, self)
+        return ScalarArrayMultiply(other, self)
+
+    def __truediv__(self, other):
+        return ScalarArrayDivide(self, other)
+
+    def __rtruediv__(self, other):
+        return ScalarArrayDivide(other, self)
+
+    __div__ = __truediv__
+    __rdiv__ = __rtruediv__
+
+    def __pow__(self, other):
+        return ScalarArrayPower(self, other)
+
+    def __rpow__(self, other):
+        return ScalarArrayPower(other, self)
+
+    def __getitem__(self, index):
+        return ScalarArrayElement(self, index)
+
+
+class ScalarArrayConstant(ScalarArray):
+    values = Field(tuple)
+
+    def __len__(self):
+        return len(self.values)
+
+
+def scalar_array(values):
+    return ScalarArrayConstant(tuple(float(value) for value in values))
+
+
+ScalarArrayFromScalar = cast_expression("ScalarArrayFromScalar", ScalarArray, Scalar)
+ScalarArrayAdd = binary_expression("ScalarArrayAdd", ScalarArray)
+ScalarArraySubtract = binary_expression("ScalarArraySubtract", ScalarArray)
+ScalarArrayMultiply = binary_expression("ScalarArrayMultiply", ScalarArray)
+ScalarArrayDivide = binary_expression("ScalarArrayDivide", ScalarArray)
+ScalarArrayPower = binary_expression("ScalarArrayPower", ScalarArray)
+
+
+class ScalarArrayElement(Scalar):
+    array = Field(ScalarArray)
+    index = Field(int)
+
+
+@abstract_expression
+class VectorArray(Expression):
+
+    def __neg__(self):
+        return self * -1
+
+    def __pos__(self):
+        return self
+
+    def __add__(self, other):
+        return VectorArrayAdd(self, other)
+
+    def __radd__(self, other):
+        return VectorArrayAdd(other, self)
+
+    def __sub__(self, other):
+        return VectorArraySubtract(self, other)
+
+    def __rsub__(self, other):
+        return VectorArraySubtract(other, self)
+
+    def __mul__(self, other):
+        other = expr(other)
+        if isinstance(other, (Matrix, MatrixArray)):
+            return VectorArrayMatrixMultiply(self, other)
+        return VectorArrayMultiply(self, other)
+
+    def __rmul__(self, other):
+        # M * v is v * M^T, as for single vectors
+        other = expr(other)
+        if isinstance(other, (Matrix, MatrixArray)):
+            return VectorArrayMatrixMultiply(self, other.transpose())
+        return VectorArrayMultiply(self, other)
+
+    def __truediv__(self, other):
+        return VectorArrayDivide(self, other)
+
+    __div__ = __truediv__
+
+    def __xor__(self, other):
+        return self.cross(other)
+
+    def __getitem__(self, index):
+        return VectorArrayElement(self, index)
+
+    def dot(self, other):
+        return VectorArrayDotProduct(self, other)
+
+    def cross(self, other):
+        return VectorArrayCrossProduct(self, other)
+
+    def length(self):
+        return VectorArrayLength(self)
+
+    def normalized(self):
+        return VectorArrayNormalize(self)
+
+
+class VectorArrayConstant(VectorArray):
+    values = Field(tuple)
+
+    def __len__(self):
+        return len(self.values)
+
+
+def vector_array(values):
+    values = tuple(tuple(float(c) for c in value) for value in values)
+    if any(len(value) != 3 for value in values):
+        raise TypeError("Vector array elements must have 3 components")
+    return VectorArrayConstant(values)
+
+
+VectorArrayFromVector = cast_expression("VectorArrayFromVector", VectorArray, Vector)
+VectorArrayAdd = binary_expression("VectorArrayAdd", VectorArray)
+VectorArraySubtract = binary_expression("VectorArraySubtract", VectorArray)
+VectorArrayMultiply = binary_expression("VectorArrayMultiply", VectorArray, VectorArray, ScalarArray)
+VectorArrayDivide = binary_expression("VectorArrayDivide", VectorArray, VectorArray, ScalarArray)
+VectorArrayDotProduct = binary_expression("VectorArrayDotProduct", ScalarArray, VectorArray)
+VectorArrayCrossProduct = binary_expression("VectorArrayCrossProduct", VectorArray)
+VectorArrayLength = unary_expression("VectorArrayLength", ScalarArray, VectorArray)
+VectorArrayNormalize = unary_expression("VectorArrayNormalize", VectorArray)
+
+
+class VectorArrayElement(Vector):
+    array = Field(VectorArray)
+    index = Field(int)
+
+
+@abstract_expression
+class MatrixArray(Expression):
+
+    def __neg__(self):
+        return self * -1
+
+    def __add__(self, other):
+        return MatrixArrayAdd(self, other)
+
+    def __radd__(self, other):
+        return MatrixArrayAdd(other, self)
+
+    def __sub__(self, other):
+        return MatrixArraySubtract(self, other)
+
+    def __rsub__(self, other):
+        return MatrixArraySubtract(other, self)
+
+    def __mul__(self, other):
+        other = expr(other)
+        if isinstance(other, (Matrix, MatrixArray)):
+            return MatrixArrayMultiply(self, other)
+        elif isinstance(other, (Vector, VectorArray)):
+            # M * v is v * M^T, as for single vectors
+            return VectorArrayMatrixMultiply(other, self.transpose())
+        return MatrixArrayScalarMultiply(self, other)
+
+    def __rmul__(self, other):
+        other = expr(other)
+        if isinstance(other, (Matrix, MatrixArray)):
+            return MatrixArrayMultiply(other, self)
+        elif isinstance(other, (Vector, VectorArray)):
+            return VectorArrayMatrixMultiply(other, self)
+        return MatrixArrayScalarMultiply(self, other)
+
+    def __getitem__(self, index):
+        return MatrixArrayElement(self, index)
+
+    def inverse(self):
+        return MatrixArrayInverse(self)
+
+    def transpose(self):
+        return MatrixArrayTranspose(self)
+
+
+class MatrixArrayConstant(MatrixArray):
+    values = Field(tuple)
+
+    def __len__(self):
+        return len(self.values)
+
+
+def matrix_array(values):
+    # Elements are 16 numbers, or 4 rows of 4
+    elements = []
+    for value in values:
+        value = list(value)
+        if len(value) == 4:
+            value = list(itertools.chain.from_iterable(value))
+        if len(value) != 16:
+            raise TypeError("Matrix array elements must have 16 components")
+        elements.append(tuple(float(c) for c in value))
+    return MatrixArrayConstant(tuple(elements))
+
+
+MatrixArrayFromMatrix = cast_expression("MatrixArrayFromMatrix", MatrixArray, Matrix)
+MatrixArrayAdd = binary_expression("MatrixArrayAdd", MatrixArray)
+MatrixArraySubtract = binary_expression("MatrixArraySubtract", MatrixArray)
+MatrixArrayMultiply = binary_expression("MatrixArrayMultiply", MatrixArray)
+MatrixArrayScalarMultiply = binary_expression("MatrixArrayScalarMultiply", MatrixArray, MatrixArray, ScalarArray)
+MatrixArrayInverse = unary_expression("MatrixArrayInverse", MatrixArray)
+MatrixArrayTranspose = unary_expression("MatrixArrayTranspose", MatrixArray)
+VectorArrayMatrixMultiply = binary_expression("VectorArrayMatrixMultiply", VectorArray, VectorArray, MatrixArray)
+
+
+class MatrixArrayElement(Matrix):
+    array = Field(MatrixArray)
+    index = Field(int)
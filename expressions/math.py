@@ -1,5 +1,7 @@
 from __future__ import division
+import functools
 import operator
+import itertools
 
 from ..expression import (
     Expression,
@@ -7,18 +9,32 @@ from ..expression import (
     abstract_expression,
     unary_expression,
     binary_expression,
+    associative_expression,
     cast_expression,
     expr,
 )
 from .. import type_conversions
 
 
-type_conversions.register_conversion(float, int)
-type_conversions.register_conversion(float, bool)
-type_conversions.register_conversion(int, float)
-type_conversions.register_conversion(int, bool)
-type_conversions.register_conversion(bool, float)
-type_conversions.register_conversion(bool, int)
+with type_conversions.bulk_registration():
+    type_conversions.register_conversion(float, int)
+    type_conversions.register_conversion(float, bool)
+    type_conversions.register_conversion(int, float)
+    type_conversions.register_conversion(int, bool)
+    type_conversions.register_conversion(bool, float)
+    type_conversions.register_conversion(bool, int)
+
+
+def _reflectable(method):
+    # Operands that don't convert are left to the other operand's reflected
+    # method, so that arrays on the right broadcast the single value
+    @functools.wraps(method)
+    def wrapper(self, other):
+        try:
+            return method(self, other)
+        except TypeError:
+            return NotImplemented
+    return wrapper
 
 
 @abstract_expression
@@ -67,18 +83,20 @@ class Integer(Expression):
     def __pos__(self):
         return self
 
+    @_reflectable
     def __add__(self, other):
         other = expr(other)
         if isinstance(other, Scalar):
-            return ScalarAdd(self, other)
-        return IntegerAdd(self, other)
+            return ScalarSum(self, other)
+        return IntegerSum(self, other)
 
     def __radd__(self, other):
         other = expr(other)
         if isinstance(other, Scalar):
-            return ScalarAdd(other, self)
-        return IntegerAdd(other, self)
+            return ScalarSum(other, self)
+        return IntegerSum(other, self)
 
+    @_reflectable
     def __sub__(self, other):
         other = expr(other)
         if isinstance(other, Scalar):
@@ -91,26 +109,28 @@ class Integer(Expression):
             return ScalarSubtract(other, self)
         return IntegerSubtract(other, self)
 
+    @_reflectable
     def __mul__(self, other):
         other = expr(other)
         if isinstance(other, Scalar):
-            return ScalarMultiply(self, other)
+            return ScalarProduct(self, other)
         if isinstance(other, Vector):
             return VectorMultiply(other, self)
         elif isinstance(other, Matrix):
             return MatrixScalarMultiply(other, self)
-        return IntegerMultiply(self, other)
+        return IntegerProduct(self, other)
 
     def __rmul__(self, other):
         other = expr(other)
         if isinstance(other, Scalar):
-            return ScalarMultiply(other, self)
+            return ScalarProduct(other, self)
         if isinstance(other, Vector):
             return VectorMultiply(other, self)
         elif isinstance(other, Matrix):
             return MatrixScalarMultiply(other, self)
-        return IntegerMultiply(other, self)
+        return IntegerProduct(other, self)
 
+    @_reflectable
     def __truediv__(self, other):
         return ScalarDivide(self, other)
 
@@ -155,6 +175,8 @@ IntegerAdd = binary_expression("IntegerAdd", Integer)
 IntegerSubtract = binary_expression("IntegerSubtract", Integer)
 IntegerMultiply = binary_expression("IntegerMultiply", Integer)
 IntegerDivide = binary_expression("IntegerDivide", Integer)
+IntegerSum = associative_expression("IntegerSum", Integer)
+IntegerProduct = associative_expression("IntegerProduct", Integer)
 IntegerEquals = binary_expression("IntegerEquals", Boolean, Integer)
 IntegerNotEquals = binary_expression("IntegerNotEquals", Boolean, Integer)
 IntegerGreaterThan = binary_expression("IntegerGreaterThan", Boolean, Integer)
@@ -172,25 +194,28 @@ class Scalar(Expression):
     def __pos__(self):
         return self
 
+    @_reflectable
     def __add__(self, other):
-        return ScalarAdd(self, other)
+        return ScalarSum(self, other)
 
     def __radd__(self, other):
-        return ScalarAdd(other, self)
+        return ScalarSum(other, self)
 
+    @_reflectable
     def __sub__(self, other):
         return ScalarSubtract(self, other)
 
     def __rsub__(self, other):
         return ScalarSubtract(other, self)
 
+    @_reflectable
     def __mul__(self, other):
         other = expr(other)
         if isinstance(other, Vector):
             return VectorMultiply(other, self)
         elif isinstance(other, Matrix):
             return MatrixScalarMultiply(other, self)
-        return ScalarMultiply(self, other)
+        return ScalarProduct(self, other)
 
     def __rmul__(self, other):
         other = expr(other)
@@ -198,8 +223,9 @@ class Scalar(Expression):
             return VectorMultiply(other, self)
         elif isinstance(other, Matrix):
             return MatrixScalarMultiply(other, self)
-        return ScalarMultiply(other, self)
+        return ScalarProduct(other, self)
 
+    @_reflectable
     def __truediv__(self, other):
         return ScalarDivide(self, other)
 
@@ -244,6 +270,8 @@ ScalarSubtract = binary_expression("ScalarSubtract", Scalar)
 ScalarMultiply = binary_expression("ScalarMultiply", Scalar)
 ScalarDivide = binary_expression("ScalarDivide", Scalar)
 ScalarPower = binary_expression("ScalarPower", Scalar)
+ScalarSum = associative_expression("ScalarSum", Scalar)
+ScalarProduct = associative_expression("ScalarProduct", Scalar)
 ScalarEquals = binary_expression("ScalarEquals", Boolean, Scalar)
 ScalarNotEquals = binary_expression("ScalarNotEquals", Boolean, Scalar)
 ScalarGreaterThan = binary_expression("ScalarGreaterThan", Boolean, Scalar)
@@ -268,12 +296,18 @@ class Vector(Expression):
     def __pos__(self):
         return self
 
+    @_reflectable
     def __add__(self, other):
-        return VectorAdd(other, self)
+        return VectorSum(self, other)
+
+    def __radd__(self, other):
+        return VectorSum(other, self)
 
+    @_reflectable
     def __sub__(self, other):
         return VectorSubtract(self, other)
 
+    @_reflectable
     def __mul__(self, other):
         other = expr(other)
         if isinstance(other, Matrix):
@@ -286,6 +320,7 @@ class Vector(Expression):
             return VectorMatrixMultiply(self, other)
         return VectorMultiply(self, other)
 
+    @_reflectable
     def __truediv__(self, other):
         return VectorDivide(self, other)
 
@@ -336,6 +371,10 @@ class VectorConstant(Vector):
     def z(self):
         return ScalarConstant(self.zvalue)
 
+    def to_numpy(self):
+        import numpy
+        return numpy.array(self._values)
+
 
 Vector.ZERO = VectorConstant(0.0, 0.0, 0.0)
 Vector.X = VectorConstant(1.0, 0.0, 0.0)
@@ -361,6 +400,70 @@ def _vector_from_args(value):
         return VectorFromScalar(*value)
 
 
+_NUMBER_TYPES = frozenset((float, int, bool))
+_NUMERIC_ARRAY_KINDS = "biuf"
+
+
+def _constants_from_rows(constant_type, rows, width):
+    # rows must be sequences of numbers adding up to a multiple of width.
+    # Tuples of floats are stored as is, anything else is converted and
+    # regrouped in one pass.
+    component_types = set(map(type, itertools.chain.from_iterable(rows)))
+    if not component_types <= _NUMBER_TYPES:
+        return None
+    components = itertools.chain.from_iterable(rows)
+    if component_types <= {float}:
+        if set(map(type, rows)) == {tuple} and set(map(len, rows)) == {width}:
+            return list(map(constant_type._from_values, rows))
+    else:
+        components = map(float, components)
+    return list(map(constant_type._from_values, zip(*[components] * width)))
+
+
+def _constants_from_array(constant_type, array, width):
+    components = iter(array.astype(float, copy=False).ravel().tolist())
+    return list(map(constant_type._from_values, zip(*[components] * width)))
+
+
+@type_conversions.bulk_conversion(Vector, tuple)
+@type_conversions.bulk_conversion(Vector, list)
+def _vectors_from_args(values):
+    if set(map(len, values)) == {3}:
+        return _constants_from_rows(VectorConstant, values, 3)
+    return None
+
+
+@type_conversions.array_conversion(Vector, "numpy.ndarray")
+def _vectors_from_array(array):
+    if (
+        array.ndim == 2 and array.shape[1] == 3
+        and array.dtype.kind in _NUMERIC_ARRAY_KINDS
+    ):
+        return _constants_from_array(VectorConstant, array, 3)
+    return None
+
+
+@type_conversions.conversion(Vector, "numpy.ndarray")
+def _vector_from_array(array):
+    if array.shape != (3,):
+        raise TypeError("Cannot convert array of shape {} to Vector".format(array.shape))
+    if array.dtype.kind in _NUMERIC_ARRAY_KINDS:
+        return _constants_from_array(VectorConstant, array, 3)[0]
+    return _vector_from_args(array.tolist())
+
+
+def vectors_from_numpy(array):
+    return type_conversions.convert_many(Vector, array)
+
+
+def vectors_to_numpy(vectors):
+    import numpy
+    vectors = list(vectors)
+    if not set(map(type, vectors)) <= {VectorConstant}:
+        raise TypeError("Only constant vectors can be converted to an array")
+    return numpy.array([v._values for v in vectors], dtype=float).reshape(-1, 3)
+
+
 class VectorComponent(Scalar):
     value = Field(Vector)
     index = Field(int)
@@ -374,6 +477,7 @@ class VectorFromScalar(Vector):
 
 VectorAdd = binary_expression("VectorAdd", Vector)
 VectorSubtract = binary_expression("VectorSubtract", Vector)
+VectorSum = associative_expression("VectorSum", Vector)
 VectorMultiply = binary_expression("VectorMultiply", Vector, Vector, Scalar)
 VectorDivide = binary_expression("VectorDivide", Vector, Vector, Scalar)
 VectorDotProduct = binary_expression("VectorDotProduct", Scalar, Vector)
@@ -388,18 +492,21 @@ class Matrix(Expression):
     def __neg__(self):
         return self * -1
 
+    @_reflectable
     def __add__(self, other):
         return MatrixAdd(self, other)
 
     def __radd__(self, other):
         return MatrixAdd(other, self)
 
+    @_reflectable
     def __sub__(self, other):
         return MatrixSubtract(self, other)
 
     def __rsub__(self, other):
         return MatrixSubtract(other, self)
 
+    @_reflectable
     def __mul__(self, other):
         other = expr(other)
         if isinstance(other, Matrix):
@@ -416,6 +523,7 @@ class Matrix(Expression):
             return MatrixVectorMultiply(self, other)
         return MatrixScalarMultiply(self, other)
 
+    @_reflectable
     def __truediv__(self, other):
         return MatrixDivide(self, other)
 
@@ -453,6 +561,10 @@ class MatrixConstant(Matrix):
     def __getitem__(self, ij):
         return ScalarConstant(getattr(self, "a{}{}".format(*ij)))
 
+    def to_numpy(self):
+        import numpy
+        return numpy.array(self._values).reshape(4, 4)
+
 
 Matrix.ZERO = MatrixConstant(0,0,0,0, 0,0,0,0, 0,0,0,0, 0,0,0,0)
 Matrix.IDENTITY = MatrixConstant(1,0,0,0, 0,1,0,0, 0,0,1,0, 0,0,0,1)
@@ -477,6 +589,55 @@ def _matrix_from_args(value):
         return MatrixFromScalar(*value)
 
 
+@type_conversions.bulk_conversion(Matrix, tuple)
+@type_conversions.bulk_conversion(Matrix, list)
+def _matrices_from_args(values):
+    if set(map(len, values)) == {4}:
+        rows = list(itertools.chain.from_iterable(values))
+        if (
+            set(map(type, rows)) <= {tuple, list}
+            and set(map(len, rows)) == {4}
+        ):
+            return _constants_from_rows(MatrixConstant, rows, 16)
+        return None
+    if set(map(len, values)) == {16}:
+        return _constants_from_rows(MatrixConstant, values, 16)
+    return None
+
+
+@type_conversions.array_conversion(Matrix, "numpy.ndarray")
+def _matrices_from_array(array):
+    if array.dtype.kind not in _NUMERIC_ARRAY_KINDS:
+        return None
+    if (
+        array.ndim == 3 and array.shape[1:] == (4, 4)
+        or array.ndim == 2 and array.shape[1] == 16
+    ):
+        return _constants_from_array(MatrixConstant, array, 16)
+    return None
+
+
+@type_conversions.conversion(Matrix, "numpy.ndarray")
+def _matrix_from_array(array):
+    if array.shape not in ((4, 4), (16,)):
+        raise TypeError("Cannot convert array of shape {} to Matrix".format(array.shape))
+    if array.dtype.kind in _NUMERIC_ARRAY_KINDS:
+        return _constants_from_array(MatrixConstant, array, 16)[0]
+    return _matrix_from_args(array.tolist())
+
+
+def matrices_from_numpy(array):
+    return type_conversions.convert_many(Matrix, array)
+
+
+def matrices_to_numpy(matrices):
+    import numpy
+    matrices = list(matrices)
+    if not set(map(type, matrices)) <= {MatrixConstant}:
+        raise TypeError("Only constant matrices can be converted to an array")
+    return numpy.array([m._values for m in matrices], dtype=float).reshape(-1, 4, 4)
+
+
 class MatrixFromScalar(Matrix):
     a00 = Field(Scalar, default=1.0)
     a01 = Field(Scalar, default=0.0)
@@ -51,7 +51,7 @@ class RotateOrder(Enum):
 @abstract_expression
 class Rotation(Expression):
     def to_euler(self, order=RotateOrder.XYZ):
-        return EulerFromRotation(self, order)
+        return QuaternionFromRotation(self).to_euler(order)
 
 
 class RotationIdentity(Rotation): pass
@@ -76,6 +76,79 @@ def euler(*args, **kwargs):
     return EulerRotation(*args, **kwargs)
 
 
+# Unit quaternions (x, y, z, w), for composing and blending rotations
+# without going through matrices or Euler angles. Products compose in the
+# same order as rotation matrices: a * b rotates by a, then by b.
+@abstract_expression
+class Quaternion(Expression):
+
+    def __mul__(self, other):
+        return QuaternionMultiply(self, other)
+
+    def inverse(self):
+        return QuaternionInverse(self)
+
+    def normalized(self):
+        return QuaternionNormalize(self)
+
+    def slerp(self, other, weight):
+        return QuaternionSlerp(self, other, weight)
+
+    def to_euler(self, order=RotateOrder.XYZ):
+        angles = EulerFromQuaternion(self, order)
+        return EulerRotation(angles.x, angles.y, angles.z, order)
+
+
+class QuaternionConstant(Quaternion):
+    xvalue = Field(float)
+    yvalue = Field(float)
+    zvalue = Field(float)
+    wvalue = Field(float)
+
+
+Quaternion.IDENTITY = QuaternionConstant(0.0, 0.0, 0.0, 1.0)
+
+
+class QuaternionFromScalar(Quaternion):
+    x = Field(Scalar, default=0.0)
+    y = Field(Scalar, default=0.0)
+    z = Field(Scalar, default=0.0)
+    w = Field(Scalar, default=1.0)
+
+
+def quaternion(*args):
+    # From x, y, z and w, or from a rotation
+    if len(args) == 0:
+        return Quaternion.IDENTITY
+    elif len(args) == 1:
+        return type_conversions.convert(Quaternion, args[0])
+    try:
+        return QuaternionConstant(*args)
+    except TypeError:
+        return QuaternionFromScalar(*args)
+
+
+QuaternionMultiply = binary_expression("QuaternionMultiply", Quaternion)
+QuaternionInverse = unary_expression("QuaternionInverse", Quaternion)
+QuaternionNormalize = unary_expression("QuaternionNormalize", Quaternion)
+
+
+class QuaternionSlerp(Quaternion):
+    start = Field(Quaternion)
+    end = Field(Quaternion)
+    weight = Field(Scalar)
+
+
+# Euler angles in degrees, for the given rotate order
+class EulerFromQuaternion(Vector):
+    value = Field(Quaternion)
+    order = Field(RotateOrder, default=RotateOrder.XYZ)
+
+
+QuaternionRotation = cast_expression("QuaternionRotation", Rotation, Quaternion)
+QuaternionFromRotation = cast_expression("QuaternionFromRotation", Quaternion, Rotation)
+
+
 @abstract_expression
 class Transform(Expression):
     translation = Output(Vector)
@@ -128,5 +201,13 @@ class ComposeTransform(Transform):
     scale = Field(Vector, default=Vector.ONES)
 
 
-TransformFromMatrix = cast_expression("TransformFromMatrix", Transform, Matrix)
-MatrixFromTransform = cast_expression("MatrixFromTransform", Matrix, Transform)
+# Implicit casts between matrices and transforms build decomposeMatrix and
+# composeMatrix nodes, so prefer any cheaper conversion path.
+TRANSFORM_MATRIX_CAST_COST = 10
+
+TransformFromMatrix = cast_expression(
+    "TransformFromMatrix", Transform, Matrix, cost=TRANSFORM_MATRIX_CAST_COST,
+)
+MatrixFromTransform = cast_expression(
+    "MatrixFromTransform", Matrix, Transform, cost=TRANSFORM_MATRIX_CAST_COST,
+)
@@ -7,10 +7,22 @@ except ImportError:
     include_maya_tests = False
 
 from .test_expression import *
+from .test_type_conversions import TestTypeConversions
+from .test_context_patterns import *
+from .test_imports import *
 from .test_builder import *
 from .test_math_expressions import *
 from .test_constant_folding_math import *
 from .test_constant_folding_transform import *
+from .test_numpy_context import *
+from .test_batch_plan import *
+from .test_streaming import *
+from .test_bake import *
+from .test_incremental import *
+from .test_parallel import *
+from .test_python_compiler import *
+from .test_animation import *
+from .test_array_expressions import *
 
 if include_maya_tests:
     from .maya import *
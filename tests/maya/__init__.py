@@ -0,0 +1,5 @@
+from __future__ import absolute_import
+
+# Run inside Maya (mayapy), where pymel is available
+
+from .test_quaternions import *
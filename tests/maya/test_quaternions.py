@@ -0,0 +1,66 @@
+from __future__ import division
+
+import unittest
+
+try:
+    import pymel.core as pm
+    from expy.contexts.maya import MayaBuildContext
+except ImportError:
+    pm = None
+
+from expy import type_conversions
+from expy.expressions.math import Scalar
+from expy.expressions.transform import *
+from expy.expressions.scene import null
+from expy.contexts.constant_folding import ConstantFoldingContext
+
+
+@unittest.skipIf(pm is None, "pymel is not available")
+class TestMayaQuaternions(unittest.TestCase):
+
+    def setUp(self):
+        pm.newFile(force=True)
+        self.driver = pm.createNode("transform", name="driver")
+        self.driver.addAttr("weight", attributeType="double", keyable=True)
+        self.angles = [
+            type_conversions.convert(Scalar, self.driver.attr(name))
+            for name in ("rotateX", "rotateY", "rotateZ", "weight")
+        ]
+
+    def assertMatchesFolding(self, build, samples=((10, 20, 30, 0.25), (-45, 80, 12, 0.75))):
+        obj = MayaBuildContext().get(null("result", rotation=build(*self.angles)))
+        for x, y, z, weight in samples:
+            self.driver.rotate.set(x, y, z)
+            self.driver.weight.set(weight)
+            expected = ConstantFoldingContext().get(
+                transform(rotation=build(x, y, z, weight)).matrix
+            )
+            result = obj.getMatrix()
+            for i in range(4):
+                for j in range(4):
+                    self.assertAlmostEqual(result[i][j], expected._values[4 * i + j], places=5)
+
+    def test_rotation(self):
+        turn = QuaternionConstant(0.0, 0.0, 0.382683432365, 0.923879532511)
+        def build(x, y, z, weight):
+            q = QuaternionFromRotation(EulerRotation(x, y, z, RotateOrder.ZXY))
+            return QuaternionRotation((q * turn.inverse()).normalized())
+        self.assertMatchesFolding(build)
+
+    def test_slerp(self):
+        def build(x, y, z, weight):
+            start = QuaternionFromRotation(EulerRotation(x, 0, z))
+            end = QuaternionFromRotation(EulerRotation(0, y, 0, RotateOrder.YZX))
+            return QuaternionRotation(start.slerp(end, weight))
+        self.assertMatchesFolding(build)
+
+    def test_euler(self):
+        for order in RotateOrder:
+            def build(x, y, z, weight):
+                q = QuaternionFromRotation(EulerRotation(x, y, z))
+                return q.to_euler(order)
+            self.assertMatchesFolding(build)
+
+
+if __name__ == '__main__':
+    unittest.main()
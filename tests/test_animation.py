@@ -0,0 +1,75 @@
+import pickle
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from expy.expressions.math import *
+from expy.expressions.animation import *
+from expy.contexts.constant_folding import ConstantFoldingContext
+if numpy is not None:
+    from expy.contexts.numeric import NumpyContext, sample_keyframes
+
+
+class TestAnimCurve(unittest.TestCase):
+
+    def setUp(self):
+        self.keys = Keyframes((0, 1, 3), (0, 2, 1), (0, 1, -1), (1, 0, 0))
+
+    def fold(self, expression):
+        return ConstantFoldingContext().get(expression)
+
+    def test_keyframes(self):
+        self.assertEqual(self.keys.sample(-1), 0.0)
+        self.assertEqual(self.keys.sample(0), 0.0)
+        self.assertEqual(self.keys.sample(1), 2.0)
+        self.assertEqual(self.keys.sample(5), 1.0)
+        # Hermite basis at s = 0.5
+        self.assertAlmostEqual(self.keys.sample(0.5), 0.5 * 0 + 0.125 * 1 + 0.5 * 2 - 0.125 * 1)
+        self.assertAlmostEqual(self.keys.sample(2), 0.5 * 2 + 0.5 * 1 - 0.125 * 2 * -1)
+        self.assertEqual(Keyframes((0, 1), (1, 3)).in_slopes, (2.0, 2.0))
+        self.assertEqual(Keyframes((1,), (4,)).sample(0), 4.0)
+        copy = pickle.loads(pickle.dumps(self.keys))
+        self.assertEqual(copy, self.keys)
+        self.assertEqual(hash(copy), hash(self.keys))
+        self.assertRaises(ValueError, lambda: Keyframes((1, 0), (0, 0)))
+        self.assertRaises(ValueError, lambda: Keyframes((0, 1), (0,)))
+
+    def test_construct(self):
+        curve = anim_curve([(0, 0, 0, 1), (1, 2, 1, 0), (3, 1, -1, 0)], 2.0)
+        self.assertEqual(curve.keys, self.keys)
+        self.assertEqual(curve.time, ScalarConstant(2.0))
+        self.assertEqual(anim_curve(self.keys).time, CurrentTime())
+        self.assertEqual(pickle.loads(pickle.dumps(curve)), curve)
+
+    def test_constant_folding(self):
+        self.assertEqual(
+            self.fold(anim_curve(self.keys, scalar(1.0) + 1)),
+            ScalarConstant(self.keys.sample(2.0)),
+        )
+        self.assertEqual(self.fold(anim_curve(self.keys)), anim_curve(self.keys))
+        self.assertEqual(
+            self.fold(anim_curve([(0, 3), (1, 3), (5, 3)])), ScalarConstant(3.0),
+        )
+
+    @unittest.skipIf(numpy is None, "numpy is not available")
+    def test_numpy(self):
+        times = numpy.linspace(-1, 4, 101)
+        expected = [self.keys.sample(t) for t in times.tolist()]
+        numpy.testing.assert_allclose(sample_keyframes(self.keys, times), expected)
+        context = NumpyContext({CURRENT_TIME: times})
+        numpy.testing.assert_allclose(
+            context.get(anim_curve(self.keys) * 2), numpy.multiply(expected, 2),
+        )
+        # A single time
+        self.assertAlmostEqual(sample_keyframes(self.keys, 2), self.keys.sample(2))
+        context = NumpyContext({CURRENT_TIME: 1.5})
+        self.assertAlmostEqual(
+            context.get(anim_curve(self.keys) * 2), self.keys.sample(1.5) * 2,
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
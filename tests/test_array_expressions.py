@@ -0,0 +1,166 @@
+from __future__ import division
+
+import unittest
+
+from expy.expressions.math import *
+from expy.expressions.arrays import *
+from expy.contexts.constant_folding import ConstantFoldingContext
+from .variables import ScalarVar, ScalarArrayVar
+
+
+class TestArrayExpressions(unittest.TestCase):
+
+    def fold(self, expression):
+        return ConstantFoldingContext().get(expression)
+
+    def test_operators(self):
+        a = scalar_array([1, 2, 3])
+        v = vector_array([(1, 0, 0), (0, 1, 0)])
+        m = matrix_array([Matrix.IDENTITY._values])
+        self.assertIsInstance(a + 1, ScalarArrayAdd)
+        self.assertIsInstance(2 * a, ScalarArrayMultiply)
+        self.assertIsInstance(a * scalar(2), ScalarArrayMultiply)
+        self.assertEqual((a + scalar(1)).roperand, ScalarArrayFromScalar(ScalarConstant(1.0)))
+        self.assertIsInstance(a * v, VectorArrayMultiply)
+        self.assertIsInstance(v * 2, VectorArrayMultiply)
+        self.assertIsInstance(v * m, VectorArrayMatrixMultiply)
+        self.assertIsInstance(v * Matrix.IDENTITY, VectorArrayMatrixMultiply)
+        self.assertIsInstance(v ^ v, VectorArrayCrossProduct)
+        self.assertIsInstance(m * Matrix.IDENTITY, MatrixArrayMultiply)
+        self.assertIsInstance(m * a, MatrixArrayScalarMultiply)
+        self.assertIsInstance(a[1], Scalar)
+        self.assertIsInstance(v[0], Vector)
+        self.assertIsInstance(m[0], Matrix)
+        # Scalars and matrices on the left
+        self.assertEqual(scalar(2) * v, VectorArrayMultiply(v, ScalarArrayFromScalar(scalar(2))))
+        self.assertEqual(scalar_array([1, 2]) * v, v * scalar_array([1, 2]))
+        self.assertEqual(
+            Matrix.IDENTITY * v, VectorArrayMatrixMultiply(v, Matrix.IDENTITY.transpose()),
+        )
+        self.assertEqual(m * v, VectorArrayMatrixMultiply(v, m.transpose()))
+        self.assertRaises(TypeError, lambda: vector_array([(1, 2)]))
+        self.assertRaises(TypeError, lambda: matrix_array([(1, 2, 3)]))
+
+    def test_single_on_the_left(self):
+        # Single values broadcast against arrays on either side
+        a = scalar_array([1, 2])
+        v = vector_array([(1, 0, 0), (0, 2, 0)])
+        m = matrix_array([Matrix.IDENTITY._values, [2, 0, 0, 0, 0, 2, 0, 0, 0, 0, 2, 0, 1, 0, 0, 1]])
+        s = scalar(3)
+        u = vector(1, 2, 3)
+        M = MatrixConstant(0, 1, 0, 0, -1, 0, 0, 0, 0, 0, 1, 0, 1, 2, 3, 1)
+        self.assertEqual(self.fold(s + a), scalar_array([4, 5]))
+        self.assertEqual(self.fold(s - a), scalar_array([2, 1]))
+        self.assertEqual(self.fold(s * a), scalar_array([3, 6]))
+        self.assertEqual(self.fold(u + v), vector_array([(2, 2, 3), (1, 4, 3)]))
+        self.assertEqual(self.fold(u - v), vector_array([(0, 2, 3), (1, 0, 3)]))
+        self.assertEqual(self.fold(u * a), vector_array([(1, 2, 3), (2, 4, 6)]))
+        self.assertEqual(self.fold(s * v), self.fold(v * 3))
+        self.assertEqual(self.fold(M + m), self.fold(m + M))
+        self.assertEqual(self.fold(M - m), self.fold(m * -1 + M))
+        self.assertEqual(
+            self.fold(M * m),
+            matrix_array([self.fold(M * m[i])._values for i in range(2)]),
+        )
+        self.assertEqual(
+            self.fold(u * m),
+            vector_array([self.fold(u * m[i])._values for i in range(2)]),
+        )
+        self.assertEqual(
+            self.fold(m * u),
+            vector_array([self.fold(m[i] * u)._values for i in range(2)]),
+        )
+
+    def test_fold_scalars(self):
+        a = scalar_array([1, 2, 3])
+        b = scalar_array([4, 5, 6])
+        self.assertEqual(self.fold(a + b), scalar_array([5, 7, 9]))
+        self.assertEqual(self.fold(a * 2 - 1), scalar_array([1, 3, 5]))
+        self.assertEqual(self.fold(1 / a), scalar_array([1, 0.5, 1 / 3]))
+        self.assertEqual(self.fold(a ** 2), scalar_array([1, 4, 9]))
+        self.assertEqual(self.fold((a + b)[2]), ScalarConstant(9))
+        self.assertRaises(ValueError, lambda: self.fold(a + scalar_array([1, 2])))
+        self.assertRaises(ZeroDivisionError, lambda: self.fold(a / scalar_array([1, 0, 1])))
+
+    def test_fold_broadcasts(self):
+        x = ScalarAdd(ScalarConstant(1), ScalarConstant(2))
+        self.assertEqual(
+            self.fold(ScalarArrayFromScalar(x) * 2),
+            ScalarArrayFromScalar(ScalarConstant(6)),
+        )
+        # Broadcasts of non-constant values fold to one broadcast
+        x = ScalarVar("x")
+        self.assertEqual(
+            self.fold(ScalarArrayFromScalar(x) + ScalarArrayFromScalar(x * 1)),
+            ScalarArrayFromScalar(ScalarSum(x, x)),
+        )
+        # Mixed with non-constant arrays they stay as they are
+        a = ScalarArrayVar("a")
+        self.assertEqual(self.fold(a + (x + 0)), ScalarArrayAdd(a, ScalarArrayFromScalar(x)))
+
+    def test_fold_vectors(self):
+        v = vector_array([(3, 0, 0), (0, 4, 0), (1, 2, 2)])
+        self.assertEqual(self.fold(v.length()), scalar_array([3, 4, 3]))
+        self.assertEqual(
+            self.fold(v.normalized()),
+            vector_array([(1, 0, 0), (0, 1, 0), (1 / 3, 2 / 3, 2 / 3)]),
+        )
+        self.assertEqual(self.fold(v.dot(vector(1, 1, 1))), scalar_array([3, 4, 5]))
+        self.assertEqual(
+            self.fold(v ^ vector(1, 0, 0)),
+            vector_array([(0, 0, 0), (0, 0, -4), (0, 2, -2)]),
+        )
+        self.assertEqual(
+            self.fold(v * scalar_array([1, 2, 3]) - v),
+            vector_array([(0, 0, 0), (0, 4, 0), (2, 4, 4)]),
+        )
+        self.assertEqual(self.fold(v[1]), VectorConstant(0, 4, 0))
+        m = MatrixConstant(0, 1, 0, 0, -1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1)
+        self.assertEqual(
+            self.fold(v * m),
+            vector_array([(0, 3, 0), (-4, 0, 0), (-2, 1, 2)]),
+        )
+        # M * v, as for single vectors
+        self.assertEqual(
+            self.fold(m * v),
+            vector_array([self.fold(m * v[i])._values for i in range(3)]),
+        )
+        self.assertEqual(self.fold(scalar(2) * v), self.fold(v * 2))
+
+    def test_fold_matrices(self):
+        folding = ConstantFoldingContext()
+        matrices = [
+            MatrixConstant(2, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 3, 4, 5, 1),
+            MatrixConstant(0, 1, 0, 0, -1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1),
+        ]
+        m = matrix_array([matrix._values for matrix in matrices])
+        other = MatrixConstant(1, 0, 0, 0, 0, 2, 0, 0, 0, 0, 3, 0, 1, 1, 1, 1)
+        self.assertEqual(
+            self.fold(m * other),
+            matrix_array([folding.get(matrix * other)._values for matrix in matrices]),
+        )
+        self.assertEqual(
+            self.fold(m.inverse()),
+            matrix_array([folding.get(matrix.inverse())._values for matrix in matrices]),
+        )
+        self.assertEqual(
+            self.fold(m.transpose()),
+            matrix_array([folding.get(matrix.transpose())._values for matrix in matrices]),
+        )
+        self.assertEqual(self.fold(m * m.inverse()), matrix_array([Matrix.IDENTITY._values] * 2))
+        self.assertEqual(self.fold((m * 2)[0]), folding.get(matrices[0] * 2))
+
+    def test_fold_elements(self):
+        # An element of an element-wise operation on a non-constant array is
+        # the operation on that element
+        a = ScalarArrayVar("a")
+        x = ScalarVar("x")
+        self.assertEqual(
+            self.fold((a * 2 + x)[1]),
+            self.fold(ScalarSum(ScalarProduct(ScalarArrayElement(a, 1), ScalarConstant(2)), x)),
+        )
+        self.assertEqual(
+            self.fold((scalar_array([1, 2]) * x)[1]),
+            self.fold(ScalarProduct(ScalarConstant(2), x)),
+        )
+        self.assertEqual(self.fold(a[0]), ScalarArrayElement(a, 0))
@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from expy.expressions.math import *
+from expy.expressions.transform import *
+from expy.expressions.animation import *
+from .variables import ScalarVar
+if numpy is not None:
+    from expy.contexts.numeric import NumpyContext, bake, ChannelCache
+
+
+@unittest.skipIf(numpy is None, "numpy is not available")
+class TestBake(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "cache.bin")
+        self.a = ScalarVar('a')
+        height = anim_curve([(0, 0), (10, 5), (20, 0)])
+        self.roots = {
+            "height": height,
+            "point": vector(1, height, self.a),
+            "transform": transform(translation=vector(0, height, 0), rotation=euler(0, height * 9, 0)),
+            "above": height > self.a,
+        }
+        self.frames = numpy.arange(25.0)
+        self.a_values = numpy.linspace(0, 5, 25)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assertMatchesContext(self, cache):
+        self.assertEqual(len(cache), 25)
+        self.assertEqual(sorted(cache.names), sorted(self.roots))
+        numpy.testing.assert_array_equal(cache.frames, self.frames)
+        context = NumpyContext({CURRENT_TIME: self.frames, self.a: self.a_values})
+        for name, root in self.roots.items():
+            numpy.testing.assert_allclose(cache[name], context.get(root))
+            numpy.testing.assert_allclose(cache.read(name, 3, 13), context.get(root)[3:13])
+        values = cache.frame(12.0)
+        numpy.testing.assert_allclose(values["point"], context.get(self.roots["point"])[12])
+        self.assertRaises(KeyError, lambda: cache.frame(12.5))
+        self.assertRaises(KeyError, lambda: cache["missing"])
+
+    def test_uncompressed(self):
+        bake(self.path, self.roots, self.frames, {self.a: self.a_values}, chunk_size=4)
+        cache = ChannelCache(self.path)
+        self.assertFalse(cache.compressed)
+        self.assertIsInstance(cache["height"], numpy.memmap)
+        self.assertMatchesContext(cache)
+
+    def test_compressed(self):
+        bake(self.path, self.roots, self.frames, {self.a: self.a_values}, chunk_size=4, compress=True)
+        cache = ChannelCache(self.path)
+        self.assertTrue(cache.compressed)
+        self.assertMatchesContext(cache)
+
+    def test_errors(self):
+        self.assertRaises(ValueError, lambda: bake(self.path, self.roots, [2, 1], {self.a: [0, 0]}))
+        self.assertRaises(ValueError, lambda: bake(self.path, self.roots, [1, 2], {self.a: [0]}))
+        with open(self.path, "wb") as f:
+            f.write(b"not a cache" * 4)
+        self.assertRaises(ValueError, lambda: ChannelCache(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
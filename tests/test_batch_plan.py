@@ -0,0 +1,103 @@
+from __future__ import division
+
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from expy.expressions.math import *
+from expy.expressions.transform import *
+from .variables import ScalarVar, VectorVar
+if numpy is not None:
+    from expy.contexts.numeric import NumpyContext, BatchPlan
+
+
+@unittest.skipIf(numpy is None, "numpy is not available")
+class TestBatchPlan(unittest.TestCase):
+
+    def assertMatchesContext(self, *outputs):
+        a = ScalarVar('a')
+        b = ScalarVar('b')
+        bindings = {a: numpy.linspace(0.5, 2.0, 5), b: numpy.linspace(-3.0, 2.0, 5)}
+        outputs = [output(a, b) for output in outputs]
+        plan = BatchPlan(outputs, [a, b], 5)
+        context = NumpyContext(bindings)
+        for result, output in zip(plan.evaluate(bindings), outputs):
+            numpy.testing.assert_allclose(result, context.get(output), atol=1e-9)
+
+    def test_math(self):
+        self.assertMatchesContext(
+            lambda a, b: (a + b * 2) / (a ** 2 - 7),
+            lambda a, b: (a < b) | (a * b).eq(1),
+            lambda a, b: IntegerFromScalar(b) * 3 + 1,
+            lambda a, b: (vector(a, b, 1) ^ vector(1, a, 2)).normalized() * b,
+            lambda a, b: vector(a, b, 1).dot(vector(b, 2, a)) + vector(a, 0, b).length(),
+        )
+
+    def test_matrix(self):
+        def build(a, b):
+            m = matrix(
+                a, 0, b, 0,
+                0, 1, 0, 0,
+                -b, 0, a, 0,
+                1, 2, 3, 1,
+            )
+            return (m * m.inverse().transpose() * 2 - Matrix.IDENTITY) * vector(a, b, 1)
+        self.assertMatchesContext(build)
+
+    def test_transform(self):
+        def build(a, b):
+            return transform(
+                translation=vector(a, b, 1),
+                rotation=EulerRotation(a * 10, b, 30, RotateOrder.ZXY),
+                scale=vector(1, 2, a),
+            )
+        self.assertMatchesContext(
+            lambda a, b: build(a, b).matrix * build(b, a).matrix,
+            lambda a, b: build(a, b).world_to_local(build(b, a)).matrix,
+            lambda a, b: TransformFromMatrix(build(a, b).matrix).scale,
+            lambda a, b: TransformFromMatrix(build(a, b).matrix).rotation,
+        )
+
+    def test_buffer_reuse(self):
+        a = ScalarVar('a')
+        result = a
+        for i in range(100):
+            result = (result + a) * 0.5
+        plan = BatchPlan([result], [a], 1000)
+        self.assertEqual(len(plan._steps), 200)
+        self.assertLessEqual(plan.buffer_count, 2)
+        self.assertEqual(plan.peak_bytes, 3 * 1000 * 8)
+        self.assertEqual(plan.unplanned_bytes, 200 * 1000 * 8)
+        values = numpy.linspace(0.0, 1.0, 1000)
+        numpy.testing.assert_allclose(plan.evaluate({a: values})[0], values)
+
+    def test_outputs(self):
+        a = ScalarVar('a')
+        v = VectorVar('v')
+        length = (v * a).length()
+        plan = BatchPlan([length, v, length * 2, vector(1, 2, 3)], [a, v], 3)
+        points = numpy.arange(9.0).reshape(3, 3)
+        out = [numpy.zeros(3), numpy.zeros((3, 3)), numpy.zeros(3), numpy.zeros((3, 3))]
+        results = plan.evaluate({a: [1.0, 2.0, 3.0], v: points}, out=out)
+        for result, array in zip(results, out):
+            self.assertIs(result, array)
+        expected = numpy.linalg.norm(points, axis=1) * [1, 2, 3]
+        numpy.testing.assert_allclose(out[0], expected)
+        numpy.testing.assert_allclose(out[1], points)
+        numpy.testing.assert_allclose(out[2], expected * 2)
+        numpy.testing.assert_allclose(out[3], [[1, 2, 3]] * 3)
+
+    def test_bindings(self):
+        a = ScalarVar('a')
+        b = ScalarVar('b')
+        plan = BatchPlan([a + 1], [a], 4)
+        self.assertRaises(KeyError, lambda: plan.evaluate({}))
+        self.assertRaises(ValueError, lambda: plan.evaluate({a: [1.0, 2.0]}))
+        self.assertRaises(KeyError, lambda: BatchPlan([a + b], [a], 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,16 +5,7 @@ import unittest
 from expy import type_conversions
 from expy.expressions.math import *
 from expy.contexts.constant_folding import ConstantFoldingContext
-
-
-def _var_type(name, base):
-    return type(base)(name, (base,), {"tag": Field(str)})
-
-BooleanVar = _var_type("BooleanVar", Boolean)
-IntegerVar = _var_type("IntegerVar", Integer)
-ScalarVar = _var_type("ScalarVar", Scalar)
-VectorVar = _var_type("VectorVar", Vector)
-MatrixVar = _var_type("MatrixVar", Matrix)
+from .variables import BooleanVar, IntegerVar, ScalarVar, VectorVar, MatrixVar
 
 
 class TestConstantFoldingMath(unittest.TestCase):
@@ -373,6 +364,47 @@ class TestConstantFoldingMath(unittest.TestCase):
         ))
         self.assertRaises(ZeroDivisionError, lambda: ctx.get(zero.inverse()))
 
+    def test_affine_matrices(self):
+        M = MatrixConstant
+        a = M(
+            -1.47562898915, 7.73892261048, -0.636700193883, 0,
+            -9.13895323721, 7.73574129521, 0.973591335962, 0,
+            -4.91771153978, 5.60402612802, 2.96411112361, 0,
+            -6.42222719512, 3.00731946438, 3.73596052196, 1,
+        )
+        b = M(
+            -7.71598902963, -5.24995175379, 3.50941987372, 0,
+            9.78184029315, 1.03546950178, 3.23483519687, 0,
+            -9.12516377997, -6.51115202518, 9.42557887812, 0,
+            -0.988702568204, 3.89587352648, -2.11375664001, 1,
+        )
+        ctx = ConstantFoldingContext()
+        self._assert_matrix_equal(ctx.get(a * b), M(*(
+            sum(a._values[4 * i + k] * b._values[4 * k + j] for k in range(4))
+            for i in range(4) for j in range(4)
+        )))
+        self._assert_matrix_equal(ctx.get(a * a.inverse()), Matrix.IDENTITY)
+        self._assert_matrix_equal(ctx.get(b.inverse() * b), Matrix.IDENTITY)
+        self.assertEqual(
+            ctx.get(M(2, 0, 0, 0, 0, 4, 0, 0, 0, 0, 1, 0, 3, 4, 5, 1).inverse()),
+            M(0.5, 0, 0, 0, 0, 0.25, 0, 0, 0, 0, 1, 0, -1.5, -1, -5, 1),
+        )
+        singular = M(1, 0, 0, 0, 2, 0, 0, 0, 0, 0, 1, 0, 3, 4, 5, 1)
+        self.assertRaises(ZeroDivisionError, lambda: ctx.get(singular.inverse()))
+
+        # Nearly affine matrices are multiplied and inverted in general
+        values = list(a._values)
+        values[3], values[11], values[15] = 1e-7, -1e-7, 1 + 1e-7
+        c = M(*values)
+        c_inverse = ctx.get(c.inverse())
+        self.assertNotEqual(c_inverse._values[3::4], (0, 0, 0, 1))
+        self._assert_matrix_equal(ctx.get(c * c_inverse), Matrix.IDENTITY)
+        self._assert_matrix_equal(ctx.get(c_inverse * c), Matrix.IDENTITY)
+        self._assert_matrix_equal(ctx.get(c * b), M(*(
+            sum(c._values[4 * i + k] * b._values[4 * k + j] for k in range(4))
+            for i in range(4) for j in range(4)
+        )))
+
     def test_matrix_identities(self):
         S = ScalarConstant
         V = VectorConstant
@@ -448,6 +480,158 @@ class TestConstantFoldingMath(unittest.TestCase):
         # (a^-1)^-1 = a
         self.assertEqual(ctx.get(a.inverse().inverse()), a)
 
+    def test_associative_operations(self):
+        S = ScalarConstant
+        V = VectorConstant
+        a = ScalarVar('a')
+        b = ScalarVar('b')
+        v = VectorVar('v')
+        ctx = ConstantFoldingContext()
+        # Constants are combined, and the operands put in canonical order
+        self.assertEqual(ctx.get(a + 1 + b + 2), ctx.get(ScalarSum(a, b, S(3))))
+        self.assertEqual(set(ctx.get(a + 1 + b + 2).operands), {a, b, S(3)})
+        self.assertEqual(ctx.get(1 + a + 2), ctx.get(ScalarSum(S(3), a)))
+        self.assertEqual(ctx.get(a + 1 + -1), a)
+        self.assertEqual(ctx.get(S(1) + S(2) + S(3)), S(6))
+        self.assertEqual(set(ctx.get(2 * a * 3 * b).operands), {S(6), a, b})
+        self.assertEqual(ctx.get(2 * a * 0.5), a)
+        self.assertEqual(ctx.get(a * b * 0), S(0))
+        # Folded operands are spliced in
+        self.assertEqual(set(ctx.get(a + ScalarDivide(b + 1, 1)).operands), {a, b, S(1)})
+        self.assertEqual(
+            sorted(map(repr, ctx.get(v + V(1, 2, 3) + v + V(1, 1, 1)).operands)),
+            sorted(map(repr, (v, v, V(2, 3, 4)))),
+        )
+        self.assertEqual(ctx.get(v + Vector.ZERO), v)
+        # Thousands of terms fold in one step
+        terms = [ScalarVar(str(i)) for i in range(5000)]
+        self.assertEqual(set(ctx.get(sum(terms) + 1).operands), set([S(1)] + terms))
+        self.assertEqual(ctx.get(sum(map(S, range(5000)))), S(sum(range(5000))))
+
+    def test_reassociation(self):
+        S = ScalarConstant
+        I = IntegerConstant
+        V = VectorConstant
+        a = ScalarVar('a')
+        i = IntegerVar('i')
+        v = VectorVar('v')
+        x = MatrixVar('x')
+        ctx = ConstantFoldingContext()
+        self.assertEqual(ctx.get(ScalarAdd(ScalarAdd(a, 1), 2)), ctx.get(ScalarSum(a, S(3))))
+        self.assertEqual(set(ctx.get(ScalarAdd(ScalarAdd(a, 1), 2)).operands), {a, S(3)})
+        self.assertEqual(set(ctx.get(ScalarMultiply(2, ScalarMultiply(a, 3))).operands), {S(6), a})
+        self.assertEqual(ctx.get(ScalarMultiply(ScalarMultiply(a, 0.5), 2)), a)
+        self.assertEqual(set(ctx.get(IntegerAdd(1, IntegerAdd(i, 2))).operands), {I(3), i})
+        self.assertEqual(ctx.get(IntegerMultiply(IntegerMultiply(i, 2), 0)), I(0))
+        self.assertEqual(
+            set(ctx.get(VectorAdd(VectorAdd(v, V(1, 2, 3)), V(1, 1, 1))).operands),
+            {v, V(2, 3, 4)},
+        )
+
+        m1 = MatrixConstant(2, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 3, 4, 5, 1)
+        m2 = MatrixConstant(0, 1, 0, 0, -1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1)
+        m12 = ctx.get(m1 * m2)
+        self.assertEqual(ctx.get(MatrixMultiply(MatrixMultiply(x, m1), m2)), MatrixMultiply(x, m12))
+        self.assertEqual(ctx.get(MatrixMultiply(m1, MatrixMultiply(m2, x))), MatrixMultiply(m12, x))
+        self.assertEqual(
+            ctx.get((x * m1) * (m2 * x)), MatrixMultiply(MatrixMultiply(x, m12), x),
+        )
+        self.assertEqual(
+            ctx.get(MatrixMultiply(MatrixMultiply(x, m1), m1.inverse())), x,
+        )
+        # Constants separated by other factors do not commute past them
+        self.assertEqual(
+            ctx.get(MatrixMultiply(m1, MatrixMultiply(x, m2))),
+            MatrixMultiply(m1, MatrixMultiply(x, m2)),
+        )
+        # Products on either side are kept whole
+        parent = MatrixMultiply(x, x.inverse().transpose())
+        self.assertIs(ctx.get(MatrixMultiply(m1, parent)).roperand, ctx.get(parent))
+
+    def test_matrix_chains(self):
+        x = MatrixVar('x')
+        y = MatrixVar('y')
+        z = MatrixVar('z')
+        ctx = ConstantFoldingContext()
+        m1 = MatrixConstant(2, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 3, 4, 5, 1)
+        m2 = MatrixConstant(0, 1, 0, 0, -1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1)
+        m12 = ctx.get(m1 * m2)
+        # Inverses cancel anywhere in the chain, bringing constants together
+        self.assertEqual(ctx.get((m1 * x) * (x.inverse() * m2)), m12)
+        self.assertEqual(
+            ctx.get((y * m1 * x) * (x.inverse() * m2 * z)),
+            MatrixMultiply(MatrixMultiply(y, m12), z),
+        )
+        self.assertEqual(ctx.get((y * x.inverse()) * (x * z)), MatrixMultiply(y, z))
+        self.assertEqual(
+            ctx.get((y * m2 * x) * (x.inverse() * m2.inverse() * y.inverse())),
+            Matrix.IDENTITY,
+        )
+        self.assertEqual(ctx.get((y * x) * (x.inverse() * Matrix.ZERO)), Matrix.ZERO)
+        # Inverses of products cancel with the run of their factors
+        self.assertEqual(ctx.get((y * x * z) * (x * z).inverse()), y)
+        self.assertEqual(ctx.get((y * x).inverse() * (y * (x * z))), z)
+        self.assertEqual(ctx.get((m1 * y * x) * ((y * x).inverse() * m2)), m12)
+        # Inverses separated by other factors do not cancel
+        self.assertEqual(
+            ctx.get((x * y) * x.inverse()), MatrixMultiply(MatrixMultiply(x, y), x.inverse()),
+        )
+        # The factors left of a cancellation keep their products
+        world = ctx.get(y * z)
+        self.assertIs(ctx.get((world * x) * x.inverse()), world)
+
+    def test_sparse_matrix_products(self):
+        a = ScalarVar('a')
+        b = ScalarVar('b')
+        c = ScalarVar('c')
+        x = MatrixVar('x')
+        ctx = ConstantFoldingContext()
+        translate = MatrixFromScalar(a30=a, a31=b, a32=c)
+        scale = MatrixFromScalar(a00=a, a11=b, a22=c)
+        offset = MatrixConstant(2, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 3, 4, 5, 1)
+        self.assertEqual(
+            ctx.get(translate * translate),
+            ctx.get(MatrixFromScalar(a30=a + a, a31=b + b, a32=c + c)),
+        )
+        self.assertEqual(
+            ctx.get(scale * offset),
+            ctx.get(MatrixFromScalar(a00=a * 2, a11=b, a22=c, a30=3, a31=4, a32=5)),
+        )
+        self.assertEqual(
+            ctx.get(offset * translate),
+            ctx.get(MatrixFromScalar(a00=2, a30=a + 3, a31=b + 4, a32=c + 5)),
+        )
+        # Within chains, next to other factors
+        self.assertEqual(
+            ctx.get(x * translate * scale), MatrixMultiply(x, ctx.get(translate * scale)),
+        )
+        # Dense products stay whole
+        dense = MatrixFromScalar(*([a, b, c, 0] * 3 + [0, 0, 0, 1]))
+        self.assertEqual(ctx.get(dense * dense), MatrixMultiply(dense, dense))
+
+    def test_commutative_canonicalization(self):
+        a = ScalarVar('a')
+        b = ScalarVar('b')
+        p = BooleanVar('p')
+        q = BooleanVar('q')
+        m = MatrixVar('m')
+        ctx = ConstantFoldingContext()
+        self.assertEqual(ctx.get(a + b), ctx.get(b + a))
+        self.assertEqual(ctx.get(ScalarMultiply(a, b)), ctx.get(b * a))
+        self.assertEqual(ctx.get(BooleanAnd(p, q)), ctx.get(BooleanAnd(q, p)))
+        self.assertEqual(ctx.get((a + b).eq(a * b)), ctx.get((b * a).eq(b + a)))
+        self.assertEqual(ctx.get(m + m.transpose()), ctx.get(m.transpose() + m))
+        self.assertNotEqual(ctx.get(a - b), ctx.get(b - a))
+        self.assertEqual(ctx.duplicates_eliminated, 5)
+        # The same form again is a cache hit, not a duplicate
+        ctx.get(b + a)
+        self.assertEqual(ctx.duplicates_eliminated, 5)
+        # Digests depend on structure only
+        other = ConstantFoldingContext()
+        self.assertEqual(other.digest(a + b * 2), ctx.digest(a + b * 2))
+        self.assertNotEqual(ctx.digest(a + b), ctx.digest(a - b))
+        self.assertNotEqual(ctx.digest(ScalarConstant(1)), ctx.digest(ScalarConstant(2)))
+
     def test_examples(self):
         S = ScalarConstant
         ctx = ConstantFoldingContext()
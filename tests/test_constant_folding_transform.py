@@ -6,14 +6,7 @@ from expy import type_conversions
 from expy.expressions.math import Matrix
 from expy.expressions.transform import *
 from expy.contexts.constant_folding import ConstantFoldingContext
-
-
-def _var_type(name, base):
-    return type(base)(name, (base,), {"tag": Field(str)})
-
-TransformVar = _var_type("TransformVar", Transform)
-MatrixVar = _var_type("MatrixVar", Matrix)
-RotationVar = _var_type("RotationVar", Rotation)
+from .variables import TransformVar, MatrixVar, RotationVar, QuaternionVar, ScalarVar
 
 
 class TestConstantFoldingTransform(unittest.TestCase):
@@ -51,7 +44,6 @@ class TestConstantFoldingTransform(unittest.TestCase):
         self.assertEqual(ctx.get(MatrixFromTransform(TransformFromMatrix(M))), M)
 
 
-
     def test_transform_composition(self):
         ctx = ConstantFoldingContext()
 
@@ -129,6 +121,67 @@ class TestConstantFoldingTransform(unittest.TestCase):
             ctx.get(T.scale), VectorConstant(1, 2, -3),
         )
 
+    def test_quaternions(self):
+        ctx = ConstantFoldingContext()
+        angles = [(10, 20, 30), (-45, 90, 12), (170, -30, 80), (0, -90, 5)]
+        for order in RotateOrder:
+            for x, y, z in angles:
+                rotation = EulerRotation(x, y, z, order)
+                q = ctx.get(QuaternionFromRotation(rotation))
+                self.assertIsInstance(q, QuaternionConstant)
+                # The same rotation as the Euler angles'
+                self._assert_const_almost_equal(
+                    ctx.get(transform(rotation=QuaternionRotation(q)).matrix),
+                    ctx.get(transform(rotation=rotation).matrix),
+                )
+                # And the same again from its own Euler angles
+                round_trip = ctx.get(QuaternionFromRotation(q.to_euler(order)))
+                dot = sum(a * b for a, b in zip(q._values, round_trip._values))
+                self.assertAlmostEqual(abs(dot), 1)
+
+        a = QuaternionConstant(0, 0, 0.479425538604, 0.87758256189)
+        self._assert_const_almost_equal(
+            ctx.get(a.slerp(Quaternion.IDENTITY, 0.5)),
+            QuaternionConstant(0, 0, 0.247403959255, 0.968912421711),
+        )
+        self._assert_const_almost_equal(
+            ctx.get(a * a.inverse()), Quaternion.IDENTITY,
+        )
+        self._assert_const_almost_equal(
+            ctx.get(quaternion(0, 0, 0, 2).normalized()), Quaternion.IDENTITY,
+        )
+
+        Q = QuaternionVar("Q")
+        R = RotationVar("R")
+        self.assertEqual(ctx.get(Q * Quaternion.IDENTITY), Q)
+        self.assertEqual(ctx.get(Q.inverse() * Q), Quaternion.IDENTITY)
+        self.assertEqual(ctx.get(Q.inverse().inverse()), Q)
+        self.assertEqual(ctx.get(Q.slerp(a, 0)), Q)
+        self.assertEqual(ctx.get(Q.slerp(Q, 0.3)), Q)
+        self.assertEqual(
+            ctx.get(QuaternionFromRotation(QuaternionRotation(Q))), QuaternionNormalize(Q),
+        )
+        self.assertEqual(
+            ctx.get(QuaternionFromRotation(QuaternionRotation(Q.normalized()))),
+            QuaternionNormalize(Q),
+        )
+        self.assertEqual(
+            ctx.get(QuaternionFromRotation(QuaternionRotation(quaternion(0, 0, 0, 2)))),
+            Quaternion.IDENTITY,
+        )
+        self.assertEqual(ctx.get(QuaternionRotation(QuaternionFromRotation(R))), R)
+        self.assertEqual(
+            ctx.get(QuaternionFromRotation(Q.to_euler(RotateOrder.ZXY))), QuaternionNormalize(Q),
+        )
+        # Euler angles are canonical whether or not the rotation is constant
+        a = ScalarVar("a")
+        build = lambda a: EulerFromQuaternion(QuaternionFromRotation(euler(a, 100, 0)))
+        self.assertIsInstance(ctx.get(build(a)), EulerFromQuaternion)
+        self._assert_const_almost_equal(ctx.get(build(5)), VectorConstant(-175, 80, 180))
+        self.assertEqual(
+            ctx.get(QuaternionRotation(Quaternion.IDENTITY)), Rotation.IDENTITY,
+        )
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+from expy.expression import Expression, Field
+from expy.context import Context, ContextHandler, Pattern
+
+
+class Leaf(Expression):
+    value = Field(int)
+
+
+class Pair(Expression):
+    left = Field(Expression)
+    right = Field(Expression)
+
+
+class Wrap(Expression):
+    operand = Field(Expression)
+
+
+class SubPair(Pair): pass
+
+
+class TestContextPatterns(unittest.TestCase):
+
+    def test_fallback_to_type_handler(self):
+        handler = ContextHandler()
+        handler.register_handler(Pair, lambda ctx, e: "type")
+        handler.register_pattern(Pattern(Pair, left=Leaf(0)), lambda ctx, e: "zero")
+        ctx = Context(handler)
+        self.assertEqual(ctx.get(Pair(Leaf(0), Leaf(1))), "zero")
+        self.assertEqual(ctx.get(Pair(Leaf(1), Leaf(0))), "type")
+
+    def test_registration_order(self):
+        handler = ContextHandler()
+        handler.register_pattern(Pattern(Pair, left=Leaf(0)), lambda ctx, e: "left")
+        handler.register_pattern(Pattern(Pair, right=Leaf(0)), lambda ctx, e: "right")
+        handler.register_pattern(Pattern(Pair, left=Leaf(1)), lambda ctx, e: "one")
+        self.assertEqual(handler.match(Pair(Leaf(0), Leaf(0)))(None, None), "left")
+        self.assertEqual(handler.match(Pair(Leaf(1), Leaf(0)))(None, None), "right")
+        self.assertEqual(handler.match(Pair(Leaf(1), Leaf(2)))(None, None), "one")
+        self.assertEqual(handler.match(Pair(Leaf(2), Leaf(0)))(None, None), "right")
+        self.assertIsNone(handler.match(Pair(Leaf(2), Leaf(2))))
+
+    def test_nested_patterns(self):
+        handler = ContextHandler()
+        @handler.pattern(
+            Pair,
+            left=Pattern(Wrap, operand=Leaf),
+            where=lambda e: e.left.operand == e.right,
+        )
+        def cancel(ctx, e):
+            return "cancel"
+        @handler.pattern(Pair, left=Wrap)
+        def wrapped(ctx, e):
+            return "wrapped"
+        self.assertEqual(handler.match(Pair(Wrap(Leaf(1)), Leaf(1))), cancel)
+        self.assertEqual(handler.match(Pair(Wrap(Leaf(1)), Leaf(2))), wrapped)
+        self.assertEqual(handler.match(Pair(Wrap(Wrap(Leaf(1))), Leaf(2))), wrapped)
+        self.assertIsNone(handler.match(Pair(Leaf(1), Leaf(1))))
+
+    def test_subclass_patterns(self):
+        handler = ContextHandler()
+        handler.register_pattern(Pattern(Pair, left=Leaf(0)), lambda ctx, e: "pair")
+        handler.register_pattern(Pattern(SubPair), lambda ctx, e: "sub")
+        self.assertEqual(handler.match(SubPair(Leaf(0), Leaf(0)))(None, None), "pair")
+        self.assertEqual(handler.match(SubPair(Leaf(1), Leaf(0)))(None, None), "sub")
+        self.assertIsNone(handler.match(Pair(Leaf(1), Leaf(0))))
+
+    def test_field_predicates(self):
+        handler = ContextHandler()
+        handler.register_pattern(
+            Pattern(Leaf, value=lambda v: v < 0), lambda ctx, e: "negative"
+        )
+        handler.register_pattern(Pattern(Leaf, value=0), lambda ctx, e: "zero")
+        self.assertEqual(handler.match(Leaf(-1))(None, None), "negative")
+        self.assertEqual(handler.match(Leaf(0))(None, None), "zero")
+        self.assertIsNone(handler.match(Leaf(1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
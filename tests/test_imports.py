@@ -0,0 +1,63 @@
+import os
+import sys
+import json
+import unittest
+import subprocess
+
+
+def _run(code):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    output = subprocess.check_output([sys.executable, "-c", code], env=env)
+    return json.loads(output.decode("utf-8").splitlines()[-1])
+
+
+class TestImports(unittest.TestCase):
+
+    def test_lazy_imports(self):
+        loaded = _run(
+            "import sys, json\n"
+            "import expy.contexts.maya\n"
+            "from expy.expressions.math import ScalarConstant\n"
+            "from expy.contexts.constant_folding import ConstantFoldingContext\n"
+            "before = sorted(sys.modules)\n"
+            "ConstantFoldingContext().get(ScalarConstant(1.0) + 2.0)\n"
+            "print(json.dumps([before, sorted(sys.modules)]))\n"
+        )
+        before, after = map(set, loaded)
+        for module in (
+            "pymel.core",
+            "expy.contexts.maya.context",
+            "expy.expressions.transform",
+            "expy.expressions.scene",
+            "expy.contexts.constant_folding.math",
+        ):
+            self.assertNotIn(module, before)
+        self.assertIn("expy.contexts.constant_folding.math", after)
+        self.assertNotIn("expy.contexts.constant_folding.transform", after)
+        self.assertNotIn("expy.expressions.transform", after)
+
+    def test_lazy_output_handlers(self):
+        # Object.world is a Transform declared by the scene family
+        folded = _run(
+            "import json\n"
+            "from expy.expressions.scene import Object\n"
+            "from expy.contexts.constant_folding import ConstantFoldingContext\n"
+            "print(json.dumps(repr(ConstantFoldingContext().get(Object.ROOT.world))))\n"
+        )
+        self.assertEqual(folded, "TransformIdentity()")
+
+    def test_lazy_get_handler(self):
+        # Looking up a handler loads its family's handlers, as matching does
+        found = _run(
+            "import json\n"
+            "from expy.expression import Expression\n"
+            "from expy.expressions.math import VectorAdd\n"
+            "from expy.contexts.constant_folding import constant_folding\n"
+            "handler = constant_folding.get_handler(VectorAdd)\n"
+            "print(json.dumps(handler is not constant_folding.get_handler(Expression)))\n"
+        )
+        self.assertTrue(found)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from expy.expressions.math import *
+from expy.expressions.transform import *
+from expy.expressions.animation import *
+from .variables import ScalarVar, VectorVar
+if numpy is not None:
+    from expy.contexts.numeric import NumpyContext, IncrementalEvaluator
+
+
+@unittest.skipIf(numpy is None, "numpy is not available")
+class TestIncrementalEvaluator(unittest.TestCase):
+
+    def setUp(self):
+        self.a = ScalarVar('a')
+        self.b = ScalarVar('b')
+        self.v = VectorVar('v')
+        self.a_only = (self.a * 2 + 1) ** 2
+        self.b_only = vector(self.b, 0, 1).normalized()
+        self.outputs = [
+            self.a_only,
+            self.b_only,
+            transform(translation=self.v * self.a, rotation=euler(0, self.b, 0)).matrix,
+            vector(1, 2, 3),
+        ]
+        self.evaluator = IncrementalEvaluator(self.outputs, [self.a, self.b, self.v])
+
+    def assertMatchesContext(self, bindings):
+        self.evaluator.set_values(bindings)
+        results = self.evaluator.evaluate()
+        context = NumpyContext(bindings)
+        for result, output in zip(results, self.outputs):
+            numpy.testing.assert_allclose(result, context.get(output))
+
+    def test_evaluate(self):
+        bindings = {self.a: 1.0, self.b: 2.0, self.v: [1.0, 2.0, 3.0]}
+        self.assertMatchesContext(bindings)
+        total = self.evaluator.recomputed
+        bindings[self.a] = 3.0
+        self.assertMatchesContext(bindings)
+        a_count = self.evaluator.recomputed
+        self.assertLess(a_count, total)
+        bindings[self.b] = -1.0
+        self.assertMatchesContext(bindings)
+        self.assertLess(self.evaluator.recomputed, total)
+        self.evaluator.evaluate()
+        self.assertEqual(self.evaluator.recomputed, 0)
+        self.evaluator.set_value(self.a, 3.0)
+        self.evaluator.evaluate()
+        self.assertEqual(self.evaluator.recomputed, 0)
+        bindings[self.a] = 4.0
+        bindings[self.b] = 5.0
+        self.assertMatchesContext(bindings)
+        self.assertEqual(self.evaluator.recomputed, total)
+
+    def test_batches(self):
+        rng = numpy.random.RandomState(0)
+        self.assertMatchesContext({
+            self.a: rng.rand(5), self.b: rng.rand(5), self.v: rng.rand(5, 3),
+        })
+        self.assertMatchesContext({
+            self.a: rng.rand(5), self.b: rng.rand(5), self.v: rng.rand(5, 3),
+        })
+
+    def test_scrub(self):
+        # One frame at a time, as when scrubbing the time slider
+        keys = Keyframes((0, 1, 3), (0, 2, 1))
+        output = anim_curve(keys) * self.a
+        evaluator = IncrementalEvaluator([output], [CURRENT_TIME, self.a])
+        evaluator.set_value(self.a, 2.0)
+        for time in (0.0, 0.5, 1.0, 2.5, 4.0):
+            evaluator.set_value(CURRENT_TIME, time)
+            result, = evaluator.evaluate()
+            self.assertAlmostEqual(result, keys.sample(time) * 2)
+
+    def test_bindings(self):
+        self.assertRaises(KeyError, self.evaluator.evaluate)
+        self.assertRaises(KeyError, lambda: self.evaluator.set_value(ScalarVar('c'), 1.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,19 +1,11 @@
 from __future__ import division
 
+import pickle
 import unittest
 
 from expy import type_conversions
 from expy.expressions.math import *
-
-
-def _var_type(name, base):
-    return type(base)(name, (base,), {"tag": Field(str)})
-
-BooleanVar = _var_type("BooleanVar", Boolean)
-IntegerVar = _var_type("IntegerVar", Integer)
-ScalarVar = _var_type("ScalarVar", Scalar)
-VectorVar = _var_type("VectorVar", Vector)
-MatrixVar = _var_type("MatrixVar", Matrix)
+from .variables import BooleanVar, IntegerVar, ScalarVar, VectorVar, MatrixVar
 
 
 class TestMathTypes(unittest.TestCase):
@@ -85,6 +77,116 @@ class TestMathTypes(unittest.TestCase):
         )
         self.assertEqual(matrix(m), m)
 
+    def test_convert_many(self):
+        s = ScalarVar('s')
+        v = VectorVar('v')
+        vectors = type_conversions.convert_many(
+            Vector, [(1, 2, 3), [4.0, 5.0, 6.0], (s, 0, 0), v, (True, 0, 0)],
+        )
+        self.assertEqual(vectors, [
+            VectorConstant(1.0, 2.0, 3.0),
+            VectorConstant(4.0, 5.0, 6.0),
+            VectorFromScalar(s, 0.0, 0.0),
+            v,
+            VectorConstant(1.0, 0.0, 0.0),
+        ])
+        self.assertIsInstance(vectors[0].xvalue, float)
+        self.assertEqual(
+            type_conversions.convert_many(
+                Matrix, [tuple(range(16)), [[1, 0, 0, 0]] * 4, [s] + [0] * 15],
+            ),
+            [
+                MatrixConstant(*range(16)),
+                MatrixConstant(*([1, 0, 0, 0] * 4)),
+                MatrixFromScalar(*([s] + [0] * 15)),
+            ],
+        )
+        self.assertEqual(type_conversions.convert_many(Vector, []), [])
+        self.assertRaises(
+            TypeError, lambda: type_conversions.convert_many(Vector, [(1, 2)]),
+        )
+
+    def test_convert_many_numpy(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("numpy is not available")
+        vectors = type_conversions.convert_many(
+            Vector, numpy.arange(6).reshape(2, 3),
+        )
+        self.assertEqual(
+            vectors, [VectorConstant(0, 1, 2), VectorConstant(3, 4, 5)],
+        )
+        self.assertIsInstance(vectors[0].xvalue, float)
+        matrices = type_conversions.convert_many(
+            Matrix, numpy.arange(32.0).reshape(2, 4, 4),
+        )
+        self.assertEqual(
+            matrices,
+            [MatrixConstant(*range(16)), MatrixConstant(*range(16, 32))],
+        )
+
+    def test_numpy_interop(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("numpy is not available")
+        s = ScalarVar('s')
+        v = vector(numpy.array([1, 2, 3]))
+        self.assertEqual(v, VectorConstant(1, 2, 3))
+        self.assertIsInstance(v.xvalue, float)
+        self.assertEqual(
+            vector(numpy.array([s, 0.0, 0.0], dtype=object)),
+            VectorFromScalar(s, 0, 0),
+        )
+        self.assertTrue(numpy.array_equal(v.to_numpy(), [1.0, 2.0, 3.0]))
+        m = matrix(numpy.arange(16.0).reshape(4, 4))
+        self.assertEqual(m, MatrixConstant(*range(16)))
+        self.assertTrue(numpy.array_equal(
+            m.to_numpy(), numpy.arange(16.0).reshape(4, 4),
+        ))
+        self.assertRaises(TypeError, lambda: vector(numpy.zeros(4)))
+        self.assertRaises(TypeError, lambda: matrix(numpy.zeros((3, 3))))
+        points = numpy.arange(12.0).reshape(4, 3)
+        vectors = vectors_from_numpy(points)
+        self.assertEqual(vectors[1], VectorConstant(3, 4, 5))
+        self.assertTrue(numpy.array_equal(vectors_to_numpy(vectors), points))
+        self.assertEqual(vectors_to_numpy([]).shape, (0, 3))
+        transforms = numpy.arange(32.0).reshape(2, 4, 4)
+        matrices = matrices_from_numpy(transforms)
+        self.assertEqual(matrices[1], MatrixConstant(*range(16, 32)))
+        self.assertTrue(numpy.array_equal(matrices_to_numpy(matrices), transforms))
+        self.assertRaises(TypeError, lambda: vectors_to_numpy([VectorVar('v')]))
+
+    def test_associative_operators(self):
+        a = ScalarVar('a')
+        b = ScalarVar('b')
+        v = VectorVar('v')
+        self.assertEqual(a + b + 1, ScalarSum(a, b, 1.0))
+        self.assertEqual((a + b) + (b + a), ScalarSum(a, b, b, a))
+        self.assertEqual((a + b).operands, (a, b))
+        self.assertEqual(2.0 * a * b, ScalarProduct(2.0, a, b))
+        self.assertEqual(IntegerVar('i') + a, ScalarSum(ScalarFromInteger(IntegerVar('i')), a))
+        self.assertEqual(v + v + v, VectorSum(v, v, v))
+        self.assertEqual((a - b).loperand, a)
+        self.assertRaises(TypeError, lambda: ScalarSum(a))
+        # sum() builds one flat expression
+        terms = [ScalarVar(str(i)) for i in range(5000)]
+        total = sum(terms)
+        self.assertIsInstance(total, ScalarSum)
+        self.assertEqual(total.operands, (ScalarConstant(0),) + tuple(terms))
+        # Sums built from the same sum are independent
+        base = a + b
+        left = base + a
+        right = base + 2.0
+        self.assertEqual(base.operands, (a, b))
+        self.assertEqual(left.operands, (a, b, a))
+        self.assertEqual(right.operands, (a, b, ScalarConstant(2)))
+        constants = scalar(1) + 2.0 + 3.0
+        self.assertEqual(pickle.loads(pickle.dumps(constants)), constants)
+        self.assertEqual(pickle.loads(pickle.dumps(constants)) + 4.0, constants + 4.0)
+        self.assertEqual(hash(ScalarSum._from_values((a, b))), hash(base))
+
     def test_boolean_type_identities(self):
         b = BooleanVar('b')
         i = IntegerVar('i')
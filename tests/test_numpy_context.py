@@ -0,0 +1,168 @@
+from __future__ import division
+
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from expy.expressions.math import *
+from expy.expressions.transform import *
+from expy.contexts.constant_folding import ConstantFoldingContext
+from .variables import ScalarVar, VectorVar, MatrixVar
+if numpy is not None:
+    from expy.contexts.numeric import NumpyContext
+
+
+def _folded(value):
+    value = ConstantFoldingContext().get(value)
+    if isinstance(value, (VectorConstant, MatrixConstant)):
+        return value.to_numpy()
+    if isinstance(value, QuaternionConstant):
+        return numpy.array(value._values)
+    return value.value
+
+
+@unittest.skipIf(numpy is None, "numpy is not available")
+class TestNumpyContext(unittest.TestCase):
+
+    def assertMatchesFolding(self, build, count=4):
+        a = ScalarVar('a')
+        b = ScalarVar('b')
+        a_values = numpy.linspace(0.5, 2.0, count)
+        b_values = numpy.linspace(-3.0, 3.0, count)
+        result = NumpyContext({a: a_values, b: b_values}).get(build(a, b))
+        for i in range(count):
+            expected = _folded(build(scalar(float(a_values[i])), scalar(float(b_values[i]))))
+            numpy.testing.assert_allclose(result[i], expected, atol=1e-9)
+
+    def test_scalar(self):
+        self.assertMatchesFolding(lambda a, b: (a + b * 2) / (a ** 2 - 7))
+        self.assertMatchesFolding(lambda a, b: (a < b) | (a * b).eq(1))
+        self.assertMatchesFolding(lambda a, b: IntegerFromScalar(b) * 3 + 1)
+
+    def test_associative(self):
+        self.assertMatchesFolding(lambda a, b: 1 + a + b + 2 * a * b * 3)
+        self.assertMatchesFolding(lambda a, b: vector(1, 2, 3) + vector(a, b, 1) + vector(b, 0, a))
+        a = ScalarVar('a')
+        result = NumpyContext({a: numpy.arange(3.0)}).get(ScalarSum(1, 2, a, a))
+        numpy.testing.assert_allclose(result, [3, 5, 7])
+        # Single values, not batches
+        x, y, z = ScalarVar('x'), ScalarVar('y'), ScalarVar('z')
+        context = NumpyContext({x: 1.0, y: 2.0, z: 3.0})
+        self.assertEqual(context.get(x + y + z), 6.0)
+        self.assertEqual(context.get(x * y * z * 4), 24.0)
+
+    def test_vector(self):
+        self.assertMatchesFolding(
+            lambda a, b: (vector(a, b, 1) ^ vector(1, a, 2)).normalized() * b
+        )
+        self.assertMatchesFolding(
+            lambda a, b: vector(a, b, 1).dot(vector(b, 2, a)) + vector(a, 0, b).length()
+        )
+        self.assertMatchesFolding(lambda a, b: (vector(a, b, 1) / a).y)
+
+    def test_matrix(self):
+        def build(a, b):
+            m = matrix(
+                a, 0, b, 0,
+                0, 1, 0, 0,
+                -b, 0, a, 0,
+                1, 2, 3, 1,
+            )
+            return (m * m.inverse().transpose() * 2 - Matrix.IDENTITY) * vector(a, b, 1)
+        self.assertMatchesFolding(build)
+
+    def test_affine_inverse(self):
+        m = MatrixVar('m')
+        rng = numpy.random.RandomState(0)
+        matrices = numpy.zeros((5, 4, 4))
+        matrices[:, :3, :3] = rng.rand(5, 3, 3) + numpy.eye(3)
+        matrices[:, 3, :3] = rng.rand(5, 3)
+        matrices[:, 3, 3] = 1
+        numpy.testing.assert_allclose(
+            NumpyContext({m: matrices}).get(m.inverse()), numpy.linalg.inv(matrices),
+        )
+        # Batches with any other matrix are inverted in general
+        matrices[2, 0, 3] = 0.5
+        numpy.testing.assert_allclose(
+            NumpyContext({m: matrices}).get(m.inverse()), numpy.linalg.inv(matrices),
+        )
+        matrices[2, 0, 3] = 0
+        matrices[2, :3, :3] = 0
+        self.assertRaises(
+            numpy.linalg.LinAlgError, NumpyContext({m: matrices}).get, m.inverse(),
+        )
+
+    def test_transform(self):
+        def build(a, b):
+            return transform(
+                translation=vector(a, b, 1),
+                rotation=EulerRotation(a * 10, b, 30, RotateOrder.ZXY),
+                scale=vector(1, 2, a),
+            )
+        self.assertMatchesFolding(lambda a, b: build(a, b).matrix)
+        self.assertMatchesFolding(lambda a, b: build(a, b).matrix * build(b, a).matrix)
+        a = ScalarVar('a')
+        b = ScalarVar('b')
+        context = NumpyContext({a: [1.0, 2.0], b: [3.0, 4.0]})
+        numpy.testing.assert_allclose(
+            context.get(build(a, b).local_to_world(build(b, a)).matrix),
+            context.get(build(a, b).matrix * build(b, a).matrix),
+        )
+        numpy.testing.assert_allclose(
+            context.get(build(a, b).world_to_local(build(b, a)).matrix),
+            context.get(build(a, b).matrix * build(b, a).matrix.inverse()),
+        )
+
+    def test_quaternion(self):
+        def build(a, b):
+            return quaternion(a, b, 1, 2).normalized()
+        self.assertMatchesFolding(lambda a, b: build(a, b) * build(b, a).inverse())
+        self.assertMatchesFolding(lambda a, b: build(a, b).slerp(build(b, -a), a / 2))
+        self.assertMatchesFolding(lambda a, b: build(a, b).slerp(build(a, b * 1.0001), 0.5))
+        for order in RotateOrder:
+            self.assertMatchesFolding(lambda a, b: EulerFromQuaternion(build(a, b), order))
+            self.assertMatchesFolding(lambda a, b: EulerFromQuaternion(
+                QuaternionFromRotation(EulerRotation(a * 10, b, 30, order)), order,
+            ))
+            self.assertMatchesFolding(
+                lambda a, b: transform(rotation=QuaternionRotation(build(a, b))).matrix,
+            )
+        # Rotations evaluated as matrices convert back to the same rotation
+        a = ScalarVar('a')
+        rotation = euler(a * 90, 20, a * -170)
+        q = QuaternionFromRotation(rotation)
+        context = NumpyContext({a: numpy.linspace(-2.0, 2.0, 9)})
+        numpy.testing.assert_allclose(
+            context.get(QuaternionRotation(q)), context.get(rotation), atol=1e-9,
+        )
+
+    def test_decompose(self):
+        a = ScalarVar('a')
+        rotation = euler(a * 10, 20, a)
+        decomposed = TransformFromMatrix(MatrixFromTransform(
+            transform(translation=vector(a, 1, 2), rotation=rotation, scale=vector(2, a, -a)),
+        ))
+        context = NumpyContext({a: numpy.linspace(0.5, 2.0, 4)})
+        numpy.testing.assert_allclose(
+            context.get(decomposed.translation), context.get(vector(a, 1, 2)),
+        )
+        numpy.testing.assert_allclose(
+            context.get(decomposed.scale), context.get(vector(2, a, -a)),
+        )
+        numpy.testing.assert_allclose(
+            context.get(decomposed.rotation), context.get(rotation),
+        )
+
+    def test_bindings(self):
+        v = VectorVar('v')
+        points = numpy.random.RandomState(0).rand(100, 3)
+        result = NumpyContext({v: points}).get(v * 2 + Vector.X)
+        numpy.testing.assert_allclose(result, points * 2 + [1, 0, 0])
+        self.assertRaises(KeyError, lambda: NumpyContext().get(v * 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+try:
+    import numpy
+    from multiprocessing import shared_memory
+except ImportError:
+    numpy = shared_memory = None
+
+from expy.expressions.math import *
+from expy.expressions.transform import *
+from .variables import ScalarVar, VectorVar
+if shared_memory is not None:
+    from expy.contexts.numeric import NumpyContext, ParallelEvaluator
+
+
+@unittest.skipIf(shared_memory is None, "numpy or shared memory is not available")
+class TestParallelEvaluator(unittest.TestCase):
+
+    def test_evaluate(self):
+        a = ScalarVar('a')
+        v = VectorVar('v')
+        outputs = [
+            transform(translation=v, rotation=euler(a * 90, 0, a)).matrix,
+            (v * a).length() > 1,
+            vector(1, 2, 3),
+        ]
+        rng = numpy.random.RandomState(0)
+        with ParallelEvaluator(outputs, [a, v], processes=2, chunk_size=7) as evaluator:
+            for count in (30, 30, 5):
+                bindings = {a: rng.rand(count), v: rng.rand(count, 3)}
+                results = evaluator.evaluate(bindings)
+                context = NumpyContext(bindings)
+                numpy.testing.assert_allclose(results[0], context.get(outputs[0]))
+                numpy.testing.assert_array_equal(results[1], context.get(outputs[1]))
+                numpy.testing.assert_allclose(results[2], [[1, 2, 3]] * count)
+            self.assertRaises(KeyError, lambda: evaluator.evaluate({a: rng.rand(3)}))
+            self.assertRaises(
+                ValueError, lambda: evaluator.evaluate({a: rng.rand(3), v: rng.rand(4, 3)}),
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
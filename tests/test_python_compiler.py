@@ -0,0 +1,97 @@
+from __future__ import division
+
+import unittest
+
+from expy.expressions.math import *
+from expy.contexts.constant_folding import ConstantFoldingContext
+from expy.contexts.python import compile_expression
+from .variables import ScalarVar, VectorVar, MatrixVar
+
+
+def _folded(value):
+    value = ConstantFoldingContext().get(value)
+    if isinstance(value, (VectorConstant, MatrixConstant)):
+        return value._values
+    return value.value
+
+
+class TestPythonCompiler(unittest.TestCase):
+
+    def assertMatchesFolding(self, build, samples=((0.5, -3.0), (2.0, 1.5))):
+        a = ScalarVar('a')
+        b = ScalarVar('b')
+        compiled = compile_expression(build(a, b), {"a": a, "b": b})
+        for a_value, b_value in samples:
+            expected = _folded(build(scalar(a_value), scalar(b_value)))
+            result = compiled(a=a_value, b=b_value)
+            if isinstance(expected, tuple):
+                self.assertEqual(len(result), len(expected))
+                for x, y in zip(result, expected):
+                    self.assertAlmostEqual(x, y)
+            else:
+                self.assertAlmostEqual(result, expected)
+
+    def test_scalar(self):
+        self.assertMatchesFolding(lambda a, b: (a + b * 2) / (a ** 2 - 7))
+        self.assertMatchesFolding(lambda a, b: (a < b) | (a * b).eq(1))
+        self.assertMatchesFolding(lambda a, b: IntegerFromScalar(b) * 3 + 1)
+
+    def test_negative_literals(self):
+        self.assertMatchesFolding(lambda a, b: ScalarPower(-2, a * 4))
+        self.assertMatchesFolding(lambda a, b: -3 - a * -1.5)
+
+    def test_vector(self):
+        self.assertMatchesFolding(
+            lambda a, b: (vector(a, b, 1) ^ vector(1, a, 2)).normalized() * b
+        )
+        self.assertMatchesFolding(
+            lambda a, b: vector(a, b, 1).dot(vector(b, 2, a)) + vector(a, 0, b).length()
+        )
+        self.assertMatchesFolding(lambda a, b: (vector(a, b, 1) / a).y)
+
+    def test_matrix(self):
+        def m(a, b):
+            return matrix(
+                a, 0, b, 0,
+                0, 1, 0, 0,
+                -b, 0, a, 0,
+                1, 2, 3, 1,
+            )
+        self.assertMatchesFolding(lambda a, b: m(a, b).inverse())
+        self.assertMatchesFolding(lambda a, b: (m(a, b) + m(b, a).transpose()).inverse())
+        self.assertMatchesFolding(lambda a, b: m(a, b) * m(b, a).transpose() - m(a, a) / b)
+        self.assertMatchesFolding(lambda a, b: m(a, b) * vector(a, b, 1))
+        self.assertMatchesFolding(lambda a, b: vector(a, b, 1) * m(b, a) * 2)
+        self.assertMatchesFolding(lambda a, b: MatrixComponent(m(a, b) * m(b, a), 2, 0))
+
+    def test_parameters(self):
+        v = VectorVar('v')
+        m = MatrixVar('m')
+        s = ScalarVar('s')
+        compiled = compile_expression(v * m + v * s, {"v": v, "m": m, "s": s})
+        self.assertEqual(
+            compiled(v=(1.0, 2.0, 3.0), m=MatrixConstant()._values, s=2.0),
+            (3.0, 6.0, 9.0),
+        )
+        self.assertRaises(NotImplementedError, lambda: compile_expression(v * s, {"v": v}))
+        self.assertRaises(ValueError, lambda: compile_expression(v, {"_v0": v}))
+
+    def test_shared_nodes(self):
+        a = ScalarVar('a')
+        shared = (a + 1) * (a + 2)
+        compiled = compile_expression(shared / shared + shared, {"a": a})
+        self.assertEqual(
+            compiled.source.count("a + 1.0") + compiled.source.count("1.0 + a"), 1,
+        )
+        self.assertEqual(compiled(1.0), 7.0)
+
+    def test_commuted_nodes(self):
+        a = ScalarVar('a')
+        b = ScalarVar('b')
+        compiled = compile_expression((a + b) * (b + a), {"a": a, "b": b})
+        self.assertEqual(compiled.source.count("+"), 1)
+        self.assertEqual(compiled(1.0, 2.0), 9.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
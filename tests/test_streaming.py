@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from expy.expressions.math import *
+from expy.expressions.transform import *
+from .variables import ScalarVar, VectorVar
+if numpy is not None:
+    from expy.contexts.numeric import NumpyContext, evaluate_chunks, evaluate_to_files
+
+
+@unittest.skipIf(numpy is None, "numpy is not available")
+class TestStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        rng = numpy.random.RandomState(0)
+        self.a = ScalarVar('a')
+        self.v = VectorVar('v')
+        self.values = {self.a: rng.rand(10), self.v: rng.rand(10, 3)}
+        self.paths = {}
+        for expression, value in self.values.items():
+            path = os.path.join(self.directory, expression.tag + ".npy")
+            numpy.save(path, value)
+            self.paths[expression] = path
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_evaluate_chunks(self):
+        output = (self.v * self.a).length()
+        bindings = dict(
+            (expression, numpy.load(path, mmap_mode="r"))
+            for expression, path in self.paths.items()
+        )
+        chunks = [
+            (start, stop, values[0].copy())
+            for start, stop, values in evaluate_chunks([output], bindings, chunk_size=4)
+        ]
+        self.assertEqual([(start, stop) for start, stop, _ in chunks], [(0, 4), (4, 8), (8, 10)])
+        numpy.testing.assert_allclose(
+            numpy.concatenate([values for _, _, values in chunks]),
+            NumpyContext(self.values).get(output),
+        )
+
+    def test_evaluate_to_files(self):
+        outputs = [
+            transform(translation=self.v, rotation=euler(self.a * 90, 0, 0)).matrix,
+            self.v.x > self.a,
+            vector(1, 2, 3),
+        ]
+        paths = [os.path.join(self.directory, "out{}.npy".format(i)) for i in range(3)]
+        progress = list(evaluate_to_files(outputs, self.paths, paths, chunk_size=3))
+        self.assertEqual(progress, [(0, 3), (3, 6), (6, 9), (9, 10)])
+        context = NumpyContext(self.values)
+        numpy.testing.assert_allclose(numpy.load(paths[0]), context.get(outputs[0]))
+        numpy.testing.assert_array_equal(numpy.load(paths[1]), context.get(outputs[1]))
+        numpy.testing.assert_allclose(numpy.load(paths[2]), [[1, 2, 3]] * 10)
+
+    def test_bindings(self):
+        b = ScalarVar('b')
+        bindings = {self.a: numpy.zeros(10), b: numpy.zeros(5)}
+        self.assertRaises(ValueError, lambda: list(evaluate_chunks([self.a + b], bindings)))
+        self.assertRaises(ValueError, lambda: list(evaluate_chunks([self.a], {})))
+        self.assertRaises(ValueError, lambda: list(evaluate_to_files([self.a], self.paths, [])))
+
+
+if __name__ == '__main__':
+    unittest.main()
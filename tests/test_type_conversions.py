@@ -1,3 +1,5 @@
+import shutil
+import tempfile
 import unittest
 
 from expy.type_conversions import TypeConversions
@@ -76,6 +78,100 @@ class TestTypeConversions(unittest.TestCase):
         conv.register_conversion(D, E)
         self.assertEqual(conv.convert(A, E()), A(D(E())))
 
+    def test_cheapest_path(self):
+        A, B, C, D = gen_test_classes(4)
+        conv = TypeConversions()
+        conv.register_conversion(A, B, cost=5)
+        conv.register_conversion(B, C)
+        conv.register_conversion(A, D)
+        conv.register_conversion(D, B, cost=2)
+        self.assertEqual(conv.convert(A, B()), A(D(B())))
+        self.assertEqual(conv.convert(A, C()), A(D(B(C()))))
+        conv.register_conversion(A, C, cost=3)
+        self.assertEqual(conv.convert(A, C()), A(C()))
+        self.assertRaises(ValueError, lambda: conv.register_conversion(A, D, cost=-1))
+
+    def test_incremental_invalidation(self):
+        A, B, C, D, E = gen_test_classes(5)
+        conv = TypeConversions()
+        conv.register_conversion(A, B)
+        conv.register_conversion(B, C)
+        conv.register_conversion(D, E)
+        self.assertEqual(conv.convert(A, C()), A(B(C())))
+        self.assertEqual(conv.convert(D, E()), D(E()))
+        # Conversions from types the search for A <- C did not explore keep
+        # the cached path.
+        conv.register_conversion(C, D)
+        self.assertIn((A, C), conv._path_cache)
+        self.assertNotIn((D, E), conv._path_cache)
+        self.assertEqual(conv.convert(A, E()), A(B(C(D(E())))))
+        # A shorter path from an explored type replaces the cached one.
+        conv.register_conversion(A, C, lambda c: A(c))
+        self.assertNotIn((A, C), conv._path_cache)
+        self.assertEqual(conv.convert(A, C()), A(C()))
+        self.assertEqual(conv.convert(A, E()), A(C(D(E()))))
+
+    def test_unreachable_invalidation(self):
+        A, B, C = gen_test_classes(3)
+        conv = TypeConversions()
+        conv.register_conversion(B, C)
+        self.assertFalse(conv.is_convertible(A, C))
+        conv.register_conversion(A, B)
+        self.assertTrue(conv.is_convertible(A, C))
+        self.assertEqual(conv.convert(A, C()), A(B(C())))
+
+    def test_bulk_registration(self):
+        A, B, C = gen_test_classes(3)
+        conv = TypeConversions()
+        with conv.bulk_registration():
+            conv.register_conversion(B, C)
+            self.assertFalse(conv.is_convertible(A, C))
+            conv.register_conversion(A, B)
+            with conv.bulk_registration():
+                conv.register_conversion(A, C)
+            self.assertEqual(conv.convert(A, C()), A(C()))
+        self.assertEqual(conv.convert(A, B()), A(B()))
+
+    def test_converter(self):
+        A, B, C = gen_test_classes(3)
+        class ASub(A): pass
+        conv = TypeConversions()
+        conv.register_conversion(A, B)
+        conv.register_conversion(B, C)
+        a = ASub()
+        self.assertIs(conv.converter(A, ASub)(a), a)
+        self.assertIs(conv.converter(A, B), A)
+        self.assertEqual(conv.converter(A, C)(C()), A(B(C())))
+        self.assertRaises(TypeError, lambda: conv.converter(C, A))
+
+    def test_convert_many(self):
+        A, B, C = gen_test_classes(3)
+        conv = TypeConversions()
+        conv.register_conversion(A, B)
+        conv.register_conversion(A, C)
+        groups = []
+        @conv.bulk_conversion(A, C)
+        def convert_c(values):
+            groups.append(values)
+            if len(values) > 1:
+                return [A(("bulk", v.arg)) for v in values]
+            return None
+        self.assertEqual(
+            conv.convert_many(A, [B(1), C(2), A(3), C(4)]),
+            [A(B(1)), A(("bulk", 2)), A(3), A(("bulk", 4))],
+        )
+        self.assertEqual(groups, [[C(2), C(4)]])
+        self.assertEqual(conv.convert_many(A, (C(5),)), [A(C(5))])
+
+    def test_array_conversion(self):
+        A = test_class("A")
+        class Array(list): pass
+        conv = TypeConversions()
+        conv.register_conversion(A, int)
+        conv.register_array_conversion(A, Array, lambda values: [A(-1)] * len(values))
+        self.assertEqual(conv.convert_many(A, [1, 2]), [A(1), A(2)])
+        self.assertEqual(conv.convert_many(A, Array([1, 2])), [A(-1), A(-1)])
+
     def test_type_hook(self):
         Base = test_class("Base")
         class A(Base): pass
@@ -104,6 +200,52 @@ class TestTypeConversions(unittest.TestCase):
         self.assertEqual(conv.convert(Base, "b"), B("b"))
         self.assertEqual(conv.convert(Base, "c"), C("c"))
 
+    def test_type_hook_registered_late(self):
+        A, B = gen_test_classes(2)
+        class Tag(object): pass
+        conv = TypeConversions()
+        conv.register_conversion(A, Tag)
+        conv.register_conversion(B, str)
+        self.assertEqual(conv.convert(B, "b"), B("b"))
+        self.assertRaises(TypeError, lambda: conv.convert(A, "a"))
+        conv.register_type_hook(str, lambda value: Tag)
+        self.assertEqual(conv.convert(A, "a"), A("a"))
+
+    def test_named_conversion(self):
+        A, B = gen_test_classes(2)
+        class SubB(B): pass
+        conv = TypeConversions()
+        conv.register_conversion(A, "{}.{}".format(B.__module__, B.__name__))
+        self.assertEqual(conv.convert(A, SubB(1)), A(SubB(1)))
+        self.assertEqual(conv.convert(A, B()), A(B()))
+        self.assertEqual(conv.is_convertible(B, A), False)
+
+    def test_snapshot(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        def registry(cost):
+            A, B, C, D = gen_test_classes(4)
+            conv = TypeConversions()
+            conv.register_conversion(A, B)
+            conv.register_conversion(B, C)
+            conv.register_conversion(A, C, cost=cost)
+            return conv, A, B, C, D
+        conv, A, B, C, D = registry(3)
+        conv.save_snapshot(directory)
+        conv, A, B, C, D = registry(3)
+        conv.set_snapshot_directory(directory)
+        conv._search = lambda *args: self.fail("Snapshot was not used")
+        self.assertEqual(conv.convert(A, C()), A(B(C())))
+        self.assertRaises(TypeError, lambda: conv.convert(C, A()))
+        del conv._search
+        conv.register_conversion(D, A)
+        self.assertEqual(conv.convert(D, C()), D(A(B(C()))))
+        self.assertEqual(conv.convert(A, C()), A(B(C())))
+        conv, A, B, C, D = registry(1)
+        conv.set_snapshot_directory(directory)
+        self.assertEqual(conv.convert(A, C()), A(C()))
+        self.assertRaises(ValueError, lambda: TypeConversions().save_snapshot())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,20 @@
+from expy.expression import Field
+from expy.expressions.math import Boolean, Integer, Scalar, Vector, Matrix
+from expy.expressions.transform import Rotation, Transform, Quaternion
+from expy.expressions.arrays import ScalarArray
+
+
+# Leaf expressions of each type, told apart by a tag, that fold to
+# themselves and are bound to values when evaluated
+def var_type(name, base):
+    return type(base)(name, (base,), {"tag": Field(str)})
+
+BooleanVar = var_type("BooleanVar", Boolean)
+IntegerVar = var_type("IntegerVar", Integer)
+ScalarVar = var_type("ScalarVar", Scalar)
+VectorVar = var_type("VectorVar", Vector)
+MatrixVar = var_type("MatrixVar", Matrix)
+RotationVar = var_type("RotationVar", Rotation)
+TransformVar = var_type("TransformVar", Transform)
+QuaternionVar = var_type("QuaternionVar", Quaternion)
+ScalarArrayVar = var_type("ScalarArrayVar", ScalarArray)
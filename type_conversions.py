@@ -1,4 +1,10 @@
-from collections import OrderedDict, deque
+import os
+import heapq
+import itertools
+import contextlib
+from collections import OrderedDict, namedtuple
+
+import six
 
 
 class TypeConversions(object):
@@ -6,29 +12,132 @@ class TypeConversions(object):
     def __init__(self):
         self._conversions = OrderedDict()
         self._path_cache = {}
+        # Maps each type explored by a cached search to the cache keys whose
+        # result could change if a conversion from that type is registered.
+        self._path_dependencies = {}
+        self._deferred_invalidations = None
         self._type_hooks = {}
+        self._type_hook_cache = {}
+        self._named_conversions = {}
+        self._bulk_conversions = {}
+        self._array_conversions = {}
+        self._snapshot_directory = None
+        # Snapshot matching the current registry, False if there is none,
+        # or None if not looked up since the registry last changed.
+        self._snapshot = None
+        self._snapshot_keys = set()
 
     def register_type_hook(self, hooked_type, func):
         self._type_hooks[hooked_type] = func
+        self._type_hook_cache = {}
 
-    def register_conversion(self, to_type, from_type, func=None):
+    def register_conversion(self, to_type, from_type, func=None, cost=1):
         if func is None:
             func = to_type
-        self._conversions.setdefault(from_type, OrderedDict())[to_type] = func
-        self._path_cache = {}
+        if cost < 0:
+            raise ValueError("Conversion cost must not be negative: {}".format(cost))
+        if isinstance(from_type, six.string_types):
+            # A type from an optional module given by its qualified name. It
+            # is registered once a value of that type is first converted.
+            self._named_conversions.setdefault(from_type, []).append(
+                (to_type, func, cost)
+            )
+            return
+        self._conversions.setdefault(from_type, OrderedDict())[to_type] = (func, cost)
+        self._snapshot = None
+        if self._deferred_invalidations is not None:
+            self._deferred_invalidations.add(from_type)
+        else:
+            self._invalidate_paths((from_type,))
+
+    def conversion(self, to_type, from_type, cost=1):
+        def conversion_decorator(func):
+            self.register_conversion(to_type, from_type, func, cost)
+            return func
+        return conversion_decorator
+
+    def register_bulk_conversion(self, to_type, from_type, func):
+        # func receives a list of values of from_type and returns a list of
+        # converted values, or None to fall back to converting one at a time.
+        self._bulk_conversions[(to_type, from_type)] = func
+
+    def bulk_conversion(self, to_type, from_type):
+        def conversion_decorator(func):
+            self.register_bulk_conversion(to_type, from_type, func)
+            return func
+        return conversion_decorator
+
+    def register_array_conversion(self, to_type, array_type, func):
+        # func receives a whole container (e.g. a NumPy array) and returns a
+        # list of converted values, or None if it cannot take the fast path.
+        # The array type may be given by its qualified name, so that the
+        # module defining it does not need to be imported.
+        self._array_conversions[(to_type, _type_name(array_type))] = func
 
-    def conversion(self, to_type, from_type):
+    def array_conversion(self, to_type, array_type):
         def conversion_decorator(func):
-            self.register_conversion(to_type, from_type, func)
+            self.register_array_conversion(to_type, array_type, func)
             return func
         return conversion_decorator
 
+    @contextlib.contextmanager
+    def bulk_registration(self):
+        if self._deferred_invalidations is not None:
+            yield
+            return
+        self._deferred_invalidations = set()
+        try:
+            yield
+        finally:
+            from_types = self._deferred_invalidations
+            self._deferred_invalidations = None
+            self._invalidate_paths(tuple(from_types))
+
     def convert(self, to_type, from_value):
-        result = from_value
-        for func in self._find_conversion(to_type, self._typeof(from_value)):
-            result = func(result)
+        return self._find_conversion(to_type, self._typeof(from_value))(from_value)
+
+    def convert_many(self, to_type, values):
+        if self._array_conversions:
+            for base in type(values).mro():
+                func = self._array_conversions.get((to_type, _type_name(base)))
+                if func is not None:
+                    result = func(values)
+                    if result is not None:
+                        return result
+                    break
+        values = list(values)
+        value_types = set(map(type, values))
+        if len(value_types) == 1:
+            value_type = value_types.pop()
+            if not self._hooks_for(value_type):
+                return self._convert_group(to_type, value_type, values)
+        from_types = list(map(self._typeof, values))
+        distinct_types = set(from_types)
+        if len(distinct_types) == 1:
+            return self._convert_group(to_type, from_types[0], values)
+        result = [None] * len(values)
+        for from_type in distinct_types:
+            indices = [i for i, t in enumerate(from_types) if t is from_type]
+            group = [values[i] for i in indices]
+            for i, value in zip(indices, self._convert_group(to_type, from_type, group)):
+                result[i] = value
         return result
 
+    def _convert_group(self, to_type, from_type, values):
+        # Converts values which all have the same type, looking up the
+        # conversion once for the whole group.
+        for base in from_type.mro():
+            func = self._bulk_conversions.get((to_type, base))
+            if func is not None:
+                result = func(values)
+                if result is not None:
+                    return result
+                break
+        return list(map(self._find_conversion(to_type, from_type), values))
+
+    def converter(self, to_type, from_type):
+        return self._find_conversion(to_type, from_type)
+
     def constructor(self, to_type):
         def convert(from_value):
             return self.convert(to_type, from_value)
@@ -42,62 +151,331 @@ class TypeConversions(object):
         else:
             return True
 
+    def _hooks_for(self, value_type):
+        try:
+            return self._type_hook_cache[value_type]
+        except KeyError:
+            hooks = tuple(
+                self._type_hooks[base] for base in value_type.mro()
+                if base in self._type_hooks
+            )
+            self._type_hook_cache[value_type] = hooks
+            return hooks
+
     def _typeof(self, value):
         result = type(value)
-        for base in result.mro():
+        for hook in self._hooks_for(result):
             try:
-                return self._type_hooks[base](value)
+                return hook(value)
             except KeyError:
                 continue
         return result
 
+    def _invalidate_paths(self, from_types):
+        # A new conversion can only change the result of a search which
+        # explored one of its source types (or a subclass). Types which were
+        # queued but never explored cost at least as much as the destination,
+        # so a conversion from them cannot produce a cheaper path.
+        if not from_types:
+            return
+        # Paths loaded from a snapshot have no recorded dependencies
+        stale = self._snapshot_keys
+        self._snapshot_keys = set()
+        for explored in list(self._path_dependencies):
+            if issubclass(explored, from_types):
+                stale.update(self._path_dependencies.pop(explored))
+        for key in stale:
+            self._path_cache.pop(key, None)
+
+    def set_snapshot_directory(self, directory):
+        # Snapshots saved to this directory are loaded on the first lookup
+        # which misses the path cache, if one matches the current registry.
+        self._snapshot_directory = directory
+        self._snapshot = None
+
+    def save_snapshot(self, directory=None):
+        # Precomputes the path between every registered destination type
+        # (and its bases) and every registered source type (and its
+        # subclasses) and writes it to a file named after the registry digest.
+        import json
+        if directory is None:
+            directory = self._snapshot_directory
+        if directory is None:
+            raise ValueError("No snapshot directory given")
+        sources, destinations = self._snapshot_types()
+        types = _types_by_name(sources | destinations)
+        registered = self._registered_types()
+        for name in set(map(_type_name, registered)):
+            if types.get(name) is None:
+                raise ValueError(
+                    "Cannot snapshot conversions, several types are named {}".format(name)
+                )
+        sources = [t for t in sources if types.get(_type_name(t)) is t]
+        destinations = [t for t in destinations if types.get(_type_name(t)) is t]
+        paths = {}
+        for to_type in destinations:
+            to_paths = paths[_type_name(to_type)] = {}
+            for from_type in sources:
+                if to_type == from_type:
+                    continue
+                edges, _ = self._search(to_type, from_type)
+                if edges is not None:
+                    to_paths[_type_name(from_type)] = [
+                        [_type_name(base), _type_name(neighbor)]
+                        for base, neighbor in edges
+                    ]
+        snapshot = {
+            "digest": self._registry_digest(),
+            "types": dict(
+                (_type_name(t), _mro_names(t)) for t in sources + destinations
+            ),
+            "sources": sorted(map(_type_name, sources)),
+            "destinations": sorted(map(_type_name, destinations)),
+            "paths": paths,
+        }
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        filename = os.path.join(directory, snapshot["digest"] + ".json")
+        # Write to a temporary file first so that concurrent jobs never
+        # read a partial snapshot.
+        temp_filename = "{}.{}.tmp".format(filename, os.getpid())
+        with open(temp_filename, "w") as f:
+            json.dump(snapshot, f, sort_keys=True)
+        getattr(os, "replace", os.rename)(temp_filename, filename)
+        self._snapshot = None
+        return filename
+
+    def _registered_types(self):
+        result = set(self._conversions)
+        for conversions in self._conversions.values():
+            result.update(conversions)
+        return result
+
+    def _snapshot_types(self):
+        registered = self._registered_types()
+        destinations = set()
+        for registered_type in registered:
+            destinations.update(registered_type.mro())
+        destinations.discard(object)
+        sources = set()
+        pending = [t for t in registered if t is not object]
+        while pending:
+            current = pending.pop()
+            if current not in sources:
+                sources.add(current)
+                pending.extend(type.__subclasses__(current))
+        return sources, destinations
+
+    def _registry_digest(self):
+        # Paths only depend on the registered conversions, their order and
+        # costs, and the class hierarchy of the types involved. json and
+        # hashlib are only imported when snapshots are used, as they are
+        # slow to import.
+        import json
+        import hashlib
+        registry = []
+        for from_type, conversions in self._conversions.items():
+            for to_type, (func, cost) in conversions.items():
+                registry.append(
+                    [_mro_names(from_type), _mro_names(to_type), cost]
+                )
+        data = json.dumps([_SNAPSHOT_VERSION, registry])
+        return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+    def _load_snapshot(self):
+        if self._snapshot_directory is None:
+            return False
+        import json
+        filename = os.path.join(
+            self._snapshot_directory, self._registry_digest() + ".json",
+        )
+        try:
+            with open(filename) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return False
+        sources, destinations = self._snapshot_types()
+        types = _types_by_name(sources | destinations)
+        # Only keep types with the same class hierarchy as when saved
+        for name in list(types):
+            current = types[name]
+            if current is None or _mro_names(current) != data["types"].get(name):
+                del types[name]
+        return _Snapshot(
+            types,
+            frozenset(data["sources"]),
+            frozenset(data["destinations"]),
+            data["paths"],
+        )
+
+    def _snapshot_path(self, to_type, from_type):
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._snapshot = self._load_snapshot()
+        if not snapshot:
+            return _MISSING
+        to_name = _type_name(to_type)
+        from_name = _type_name(from_type)
+        if (
+            snapshot.types.get(to_name) is not to_type
+            or snapshot.types.get(from_name) is not from_type
+            or to_name not in snapshot.destinations
+            or from_name not in snapshot.sources
+        ):
+            return _MISSING
+        edges = snapshot.paths[to_name].get(from_name)
+        if edges is None:
+            return None
+        return [
+            (snapshot.types[base], snapshot.types[neighbor])
+            for base, neighbor in edges
+        ]
+
     def _find_conversion(self, to_type, from_type):
         if to_type == from_type:
-            return ()
+            return _identity
+        if self._deferred_invalidations:
+            self._invalidate_paths(tuple(self._deferred_invalidations))
+            self._deferred_invalidations.clear()
+        key = (to_type, from_type)
         try:
-            path = self._path_cache[(to_type, from_type)]
+            path = self._path_cache[key]
         except KeyError:
-            prev = {from_type: (None, None)}
-            q = deque([from_type])
-            tip = to_type
-            while q:
-                current = q.popleft()
-                bases = current.mro()
-                # If current type can be implicitly upcast to the destination,
-                # we are done. Upcasting is not part of the conversion sequence,
-                # just tweak the destination to the subclass we've arrived at.
-                if to_type in bases:
-                    tip = current
-                    break
-                # Explore conversions from any base class of the current type.
-                # Conceptually, this introduces 0-length edges from the current
-                # type to any of its bases.
-                for base in bases:
-                    conversions = self._conversions.get(base, {})
-                    for neighbor, func in conversions.items():
-                        if neighbor not in prev:
-                            q.append(neighbor)
-                            prev[neighbor] = (current, func)
-            if tip in prev:
-                reverse_path = []
-                while tip is not None:
-                    tip, func = prev[tip]
-                    if func is not None:
-                        reverse_path.append(func)
-                path = tuple(reversed(reverse_path))
+            if self._named_conversions:
+                self._resolve_named_conversions(from_type)
+            edges = self._snapshot_path(to_type, from_type)
+            if edges is _MISSING:
+                edges, explored = self._search(to_type, from_type)
+                for current in explored:
+                    self._path_dependencies.setdefault(current, set()).add(key)
             else:
+                self._snapshot_keys.add(key)
+            if edges is None:
                 # Destination type is unreachable
                 path = None
-            self._path_cache[(to_type, from_type)] = path
+            else:
+                path = _compose(tuple(
+                    self._conversions[base][neighbor][0]
+                    for base, neighbor in edges
+                ))
+            self._path_cache[key] = path
         if path is None:
             raise TypeError("Cannot convert to {} from {}".format(to_type, from_type))
         return path
 
+    def _resolve_named_conversions(self, from_type):
+        for base in from_type.mro():
+            conversions = self._named_conversions.pop(_type_name(base), ())
+            for to_type, func, cost in conversions:
+                self.register_conversion(to_type, base, func, cost)
+
+    def _search(self, to_type, from_type):
+        # Dijkstra's algorithm over the conversion graph. Ties are broken in
+        # discovery order, so with unit costs this is a breadth first search
+        # preferring conversions in registration order. Returns the path as a
+        # list of (from_type, to_type) registry keys, or None if the
+        # destination is unreachable, along with the types explored.
+        prev = {from_type: (None, None)}
+        costs = {from_type: 0}
+        order = itertools.count()
+        heap = [(0, next(order), from_type)]
+        tip = to_type
+        explored = []
+        while heap:
+            cost, _, current = heapq.heappop(heap)
+            if cost > costs[current]:
+                # Stale entry, a cheaper path was found since
+                continue
+            explored.append(current)
+            bases = current.mro()
+            # If current type can be implicitly upcast to the destination,
+            # we are done. Upcasting is not part of the conversion sequence,
+            # just tweak the destination to the subclass we've arrived at.
+            if to_type in bases:
+                tip = current
+                break
+            # Explore conversions from any base class of the current type.
+            # Conceptually, this introduces 0-cost edges from the current
+            # type to any of its bases.
+            for base in bases:
+                conversions = self._conversions.get(base, {})
+                for neighbor, (func, step_cost) in conversions.items():
+                    neighbor_cost = cost + step_cost
+                    if neighbor not in costs or neighbor_cost < costs[neighbor]:
+                        costs[neighbor] = neighbor_cost
+                        prev[neighbor] = (current, base)
+                        heapq.heappush(heap, (neighbor_cost, next(order), neighbor))
+        if tip not in prev:
+            return None, explored
+        edges = []
+        while tip is not None:
+            previous, base = prev[tip]
+            if base is not None:
+                edges.append((base, tip))
+            tip = previous
+        edges.reverse()
+        return edges, explored
+
+_MISSING = object()
+_SNAPSHOT_VERSION = 1
+_Snapshot = namedtuple("_Snapshot", "types sources destinations paths")
+
+
+def _mro_names(value_type):
+    return [_type_name(base) for base in value_type.mro()]
+
+
+def _types_by_name(types):
+    # Types sharing a qualified name cannot be told apart in a snapshot, so
+    # their name maps to None.
+    result = {}
+    for value_type in types:
+        name = _type_name(value_type)
+        result[name] = None if name in result else value_type
+    return result
+
+
+def _type_name(value_type):
+    if isinstance(value_type, six.string_types):
+        return value_type
+    return "{}.{}".format(value_type.__module__, value_type.__name__)
+
+
+def _identity(value):
+    return value
+
+
+def _compose(funcs):
+    if not funcs:
+        return _identity
+    elif len(funcs) == 1:
+        return funcs[0]
+    # Generate a single function calling each step in turn, rather than
+    # looping over the path on every conversion.
+    names = ["f{}".format(i) for i in range(len(funcs))]
+    call = "value"
+    for name in names:
+        call = "{}({})".format(name, call)
+    namespace = dict(zip(names, funcs))
+    exec("def converter(value):\n    return {}\n".format(call), namespace)
+    return namespace["converter"]
+
 
 _instance = TypeConversions()
 register_type_hook = _instance.register_type_hook
 register_conversion = _instance.register_conversion
 conversion = _instance.conversion
+bulk_registration = _instance.bulk_registration
+bulk_conversion = _instance.bulk_conversion
+register_bulk_conversion = _instance.register_bulk_conversion
+array_conversion = _instance.array_conversion
+register_array_conversion = _instance.register_array_conversion
 convert = _instance.convert
+convert_many = _instance.convert_many
 constructor = _instance.constructor
+converter = _instance.converter
 is_convertible = _instance.is_convertible
+set_snapshot_directory = _instance.set_snapshot_directory
+save_snapshot = _instance.save_snapshot
+
+_instance.set_snapshot_directory(os.environ.get("EXPY_CONVERSION_SNAPSHOTS"))